@@ -0,0 +1,50 @@
+"""
+Benchmark: process() (un acorde por llamada) frente a las versiones por lotes de batch_features.
+
+Se usa la escala cromática con intervalos 1..10 y acordes de tamaño k (12 * 10**k acordes).
+La versión por lotes recibe la tabla columnar de generate_chords_table; process() recibe la
+misma población como lista de diccionarios. También se comprueba que ambas coinciden.
+
+Uso:
+    python benchmarks/bench_batch_features.py [--size 4] [--batch-size 65536]
+"""
+import argparse
+import time
+
+from mathchords.constans import SCALES
+from mathchords.functions.batch_features import BATCH_FEATURES, compute_batched
+from mathchords.functions.characteristics import process
+from mathchords.functions.gen_chords import chords_from_table, generate_chords_table
+
+CHROMATIC = SCALES[-1]
+INTERVALS = list(range(1, 11))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=65536)
+    args = parser.parse_args()
+
+    table = generate_chords_table(CHROMATIC, [4], [args.size], INTERVALS)
+    chords = list(chords_from_table(table))
+    print(f"{len(chords)} acordes")
+    print(f"{'característica':>24} {'process (s)':>12} {'lotes (s)':>12} {'aceleración':>12}")
+    for feature in BATCH_FEATURES:
+        start = time.perf_counter()
+        results = process({"chords": chords}, feature)["results"]
+        t_process = time.perf_counter() - start
+
+        start = time.perf_counter()
+        features, lengths = compute_batched(table, feature, args.batch_size)
+        t_batch = time.perf_counter() - start
+
+        for i in range(0, len(chords), max(1, len(chords) // 1000)):
+            row = features[i] if lengths is None else features[i, :lengths[i]]
+            assert row.tolist() == results[f"chord_{i}"]["feature_vector"], feature.__name__
+
+        print(f"{feature.__name__:>24} {t_process:>12.3f} {t_batch:>12.4f} {t_process / t_batch:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
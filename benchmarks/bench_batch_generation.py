@@ -0,0 +1,43 @@
+"""
+Benchmark: generación por lotes de todas las escalas con 1, 2, 4 y 8 procesos.
+
+Cada ejecución escribe sus shards en una carpeta temporal y se reporta el tiempo total,
+la aceleración respecto a un proceso y la eficiencia por núcleo.
+
+Uso:
+    python benchmarks/bench_batch_generation.py [--workers 1 2 4 8] [--sizes 3 4]
+"""
+import argparse
+import os
+import tempfile
+
+from mathchords.functions.batch_generation import generate_all_scales
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 4])
+    args = parser.parse_args()
+
+    param_sets = [
+        {"octaves": [4], "sizes": args.sizes, "intervals": [1, 2, 3, 4]},
+        {"octaves": [3, 5], "sizes": args.sizes, "intervals": [2, 3]},
+    ]
+
+    print(f"núcleos disponibles: {os.cpu_count()}")
+    print(f"{'procesos':>9} {'tiempo (s)':>12} {'filas':>10} {'aceleración':>12} {'eficiencia':>11}")
+    baseline = None
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as base_path:
+            manifest = generate_all_scales(param_sets, base_path, workers=workers)
+        elapsed = manifest["wall_seconds"]
+        if baseline is None:
+            baseline = (elapsed, workers)
+        speedup = baseline[0] / elapsed
+        efficiency = speedup * baseline[1] / workers
+        print(f"{workers:>9} {elapsed:>12.2f} {manifest['total_rows']:>10} {speedup:>12.2f} {efficiency:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
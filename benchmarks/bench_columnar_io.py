@@ -0,0 +1,72 @@
+"""
+Benchmark: guardar/cargar un experimento en pickle frente al formato columnar de mathchords.io.
+
+Se construye un experimento sintético con la escala cromática (acordes + results con vectores
+de 12 dimensiones + un embedding 2D) y se mide:
+- el tiempo de guardado y el tamaño en disco,
+- el tiempo de apertura (pickle deserializa todo; columnar solo mapea los arreglos),
+- el tiempo de leer una sola columna (la matriz de características).
+
+Uso:
+    python benchmarks/bench_columnar_io.py [--sizes 3 4 5]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from mathchords.constans import SCALES
+from mathchords.functions.gen_chords import generate_chords
+from mathchords.io import load, save
+
+
+def synthetic_experiment(size):
+    chords = generate_chords(SCALES[-1], [4], [size], list(range(1, 11)))
+    features = np.random.default_rng(0).random((len(chords), 12))
+    results = {}
+    for i, (chord, vector) in enumerate(zip(chords, features.tolist())):
+        chord_id = f"chord_{i}"
+        results[chord_id] = {"chord": chord, "feature_vector": vector, "chord_id": chord_id}
+    return {"experiment_name": f"bench-{size}", "version": "1.0", "chords": chords,
+            "results": results, "embedding": features[:, :2].copy()}
+
+
+def disk_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3, 4, 5])
+    args = parser.parse_args()
+
+    print(f"{'acordes':>10} {'formato':>9} {'guardar (s)':>12} {'MB':>8} {'MB/s':>8} {'abrir (s)':>10} {'columna (s)':>12}")
+    for size in args.sizes:
+        data = synthetic_experiment(size)
+        n = len(data["chords"])
+        with tempfile.TemporaryDirectory() as base:
+            for label, addr in (("pickle", os.path.join(base, "exp.pkl")),
+                                ("columnar", os.path.join(base, "exp.columnar"))):
+                _, t_save = timed(save, data, addr)
+                mb = disk_size(addr) / 1e6
+                loaded, t_open = timed(load, addr)
+                if label == "pickle":
+                    _, t_column = timed(lambda: np.array([r["feature_vector"] for r in loaded["results"].values()]))
+                else:
+                    _, t_column = timed(lambda: np.array(loaded["results"].features))
+                del loaded
+                print(f"{n:>10} {label:>9} {t_save:>12.3f} {mb:>8.1f} {mb / t_save:>8.1f} {t_open:>10.4f} {t_column:>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
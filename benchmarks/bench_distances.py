@@ -0,0 +1,69 @@
+"""
+Benchmark: memoria máxima (RSS) al calcular la matriz de disimilitud según N.
+
+Cada medición se hace en un subproceso nuevo para que el pico de RSS sea el de esa ruta:
+- dense: squareform(pdist(X)) en float64, como hacía perform_mds2;
+- blocked: distances.pairwise_blocked en memoria (float64);
+- memmap32: pairwise_blocked en float32 hacia un .npy mapeado en memoria;
+- condensed32: pairwise_blocked en forma condensada, float32, mapeada en memoria.
+
+En las rutas mapeadas el RSS incluye las páginas del archivo que siguen en la caché de páginas;
+el sistema puede liberarlas, a diferencia de la memoria anónima de dense y blocked.
+
+Uso:
+    python benchmarks/bench_distances.py [--n 2000 5000 10000 20000] [--dim 12] [--metric euclidean]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+CHILD = r"""
+import resource, sys, time
+import numpy as np
+from scipy.spatial.distance import pdist, squareform
+from mathchords.functions.distances import pairwise_blocked
+
+mode, n, dim, metric, path = sys.argv[1], int(sys.argv[2]), int(sys.argv[3]), sys.argv[4], sys.argv[5]
+X = np.random.default_rng(0).integers(0, 4, (n, dim)).astype(np.float64)
+base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if mode == "dense":
+    D = squareform(pdist(X, metric=metric))
+elif mode == "blocked":
+    D = pairwise_blocked(X, metric)
+elif mode == "memmap32":
+    D = pairwise_blocked(X, metric, out=path, dtype=np.float32, max_bytes=64 * 1024 ** 2)
+else:
+    D = pairwise_blocked(X, metric, out=path, condensed=True, dtype=np.float32, max_bytes=64 * 1024 ** 2)
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(elapsed, (peak - base) / 1024)
+"""
+
+MODES = ("dense", "blocked", "memmap32", "condensed32")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, nargs="+", default=[2000, 5000, 10000, 20000])
+    parser.add_argument("--dim", type=int, default=12)
+    parser.add_argument("--metric", default="euclidean")
+    args = parser.parse_args()
+
+    print(f"{'N':>8} {'ruta':>12} {'tiempo (s)':>11} {'RSS extra (MB)':>15} {'N² float64 (MB)':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.n:
+            for mode in MODES:
+                path = os.path.join(tmp, f"{mode}_{n}.npy")
+                output = subprocess.run([sys.executable, "-c", CHILD, mode, str(n), str(args.dim), args.metric, path],
+                                        capture_output=True, text=True, check=True).stdout.split()
+                elapsed, rss = float(output[0]), float(output[1])
+                print(f"{n:>8} {mode:>12} {elapsed:>11.2f} {rss:>15.1f} {8 * n * n / 1e6:>16.1f}")
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
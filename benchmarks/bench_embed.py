@@ -0,0 +1,60 @@
+"""
+Benchmark: insertar acordes nuevos en una configuración de MDS frente a recalcularla.
+
+Las características son los interval_histogram de acordes de la escala cromática (tamaños 3 a 5,
+intervalos 1..10). Se calcula el MDS clásico de N acordes y después se insertan --new acordes
+más con embed_points ('gower' y 'stress'), comparando el tiempo y el stress-1 de Kruskal de la
+configuración conjunta con los de recalcular el MDS clásico de los N + new acordes.
+
+Uso:
+    python benchmarks/bench_embed.py [--n 2000 5000] [--new 10 100]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mathchords.constans import SCALES
+from mathchords.functions.batch_features import compute_batched
+from mathchords.functions.characteristics import interval_histogram, perform_mds2
+from mathchords.functions.distances import pairwise_blocked
+from mathchords.functions.gen_chords import generate_chords_table
+from mathchords.functions.mds import embed_points, stress
+
+CHROMATIC = SCALES[-1]
+INTERVALS = list(range(1, 11))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, nargs="+", default=[2000, 5000])
+    parser.add_argument("--new", type=int, nargs="+", default=[10, 100])
+    args = parser.parse_args()
+
+    table = generate_chords_table(CHROMATIC, [4], [3, 4, 5], INTERVALS)
+    features, _ = compute_batched(table, interval_histogram)
+    features = features.astype(np.float64)
+    rng = np.random.default_rng(0)
+
+    print(f"{'N':>6} {'nuevos':>6} {'método':>8} {'tiempo (s)':>11} {'stress-1':>10}")
+    for n in args.n:
+        for n_new in args.new:
+            data = features[rng.choice(len(features), size=n + n_new, replace=False)]
+            coords, _ = perform_mds2(data[:n], method="classical")
+            distances = pairwise_blocked(data, condensed=True)
+
+            for method in ("gower", "stress"):
+                start = time.perf_counter()
+                new_coords = embed_points(coords, data[:n], data[n:], method=method, random_state=0)
+                elapsed = time.perf_counter() - start
+                value = stress(distances, np.vstack([coords, new_coords]))
+                print(f"{n:>6} {n_new:>6} {method:>8} {elapsed:>11.3f} {value:>10.4f}")
+
+            start = time.perf_counter()
+            refit, _ = perform_mds2(data, method="classical")
+            elapsed = time.perf_counter() - start
+            print(f"{n:>6} {n_new:>6} {'refit':>8} {elapsed:>11.3f} {stress(distances, refit):>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: generate_chords (lista de diccionarios) frente a generate_chords_table (tabla columnar).
+
+Se usa la escala cromática con intervalos 1..10, de modo que el tamaño de acorde k produce
+12 * 10**k acordes por octava: k=4 -> 1.2e5, k=5 -> 1.2e6, k=6 -> 1.2e7.
+
+Uso:
+    python benchmarks/bench_gen_chords.py [--sizes 4 5 6] [--skip-dicts-above 2000000]
+"""
+import argparse
+import time
+import tracemalloc
+
+from mathchords.constans import SCALES
+from mathchords.functions.gen_chords import generate_chords, generate_chords_table
+
+CHROMATIC = SCALES[-1]
+INTERVALS = list(range(1, 11))
+
+
+def measure(func, *args, **kwargs):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 5, 6])
+    parser.add_argument("--skip-dicts-above", type=int, default=-1,
+                        help="No ejecuta la versión con diccionarios por encima de esta población (-1: siempre).")
+    args = parser.parse_args()
+
+    print(f"{'acordes':>12} {'ruta':>10} {'tiempo (s)':>12} {'pico (MB)':>12} {'bytes/acorde':>14}")
+    for size in args.sizes:
+        table, t_table, m_table = measure(generate_chords_table, CHROMATIC, [4], [size], INTERVALS)
+        n = len(table["length"])
+        del table
+        print(f"{n:>12} {'columnar':>10} {t_table:>12.3f} {m_table / 1e6:>12.1f} {m_table / n:>14.1f}")
+
+        if args.skip_dicts_above > 0 and n > args.skip_dicts_above:
+            print(f"{n:>12} {'dicts':>10} {'omitido':>12}")
+            continue
+        chords, t_dicts, m_dicts = measure(generate_chords, CHROMATIC, [4], [size], INTERVALS)
+        del chords
+        print(f"{n:>12} {'dicts':>10} {t_dicts:>12.3f} {m_dicts / 1e6:>12.1f} {m_dicts / n:>14.1f}"
+              f"   (x{t_dicts / t_table:.1f} más lento)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: tiempo y stress de los métodos de perform_mds2 según N.
+
+Las características son los interval_histogram de acordes de la escala cromática (tamaños 3 a 5,
+intervalos 1..10), submuestreados a N acordes. Para cada N se ejecutan:
+- smacof: el MDS métrico de sklearn de siempre (solo hasta --smacof-max);
+- smacof+classical: SMACOF partiendo del MDS clásico (solo hasta --smacof-max);
+- classical: MDS clásico de Torgerson (solo hasta --classical-max, necesita la matriz N x N);
+- landmark: MDS con --landmarks puntos de referencia (sin matriz N x N).
+
+El stress-1 de Kruskal se calcula sobre una muestra fija de hasta 2000 acordes.
+
+Uso:
+    python benchmarks/bench_mds.py [--n 1000 5000 20000 200000] [--smacof-max 2000] [--classical-max 20000]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+
+from mathchords.constans import SCALES
+from mathchords.functions.batch_features import compute_batched
+from mathchords.functions.characteristics import interval_histogram, perform_mds2
+from mathchords.functions.distances import pairwise_blocked
+from mathchords.functions.gen_chords import generate_chords_table
+from mathchords.functions.mds import stress
+
+CHROMATIC = SCALES[-1]
+INTERVALS = list(range(1, 11))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, nargs="+", default=[1000, 5000, 20000, 200000])
+    parser.add_argument("--smacof-max", type=int, default=2000)
+    parser.add_argument("--classical-max", type=int, default=20000)
+    parser.add_argument("--landmarks", type=int, default=1000)
+    args = parser.parse_args()
+
+    table = generate_chords_table(CHROMATIC, [4], [3, 4, 5], INTERVALS)
+    features, _ = compute_batched(table, interval_histogram)
+    features = features.astype(np.float64)
+    rng = np.random.default_rng(0)
+
+    print(f"{'N':>8} {'método':>18} {'tiempo (s)':>11} {'stress-1':>10}")
+    for n in args.n:
+        data = features[rng.choice(len(features), size=n, replace=n > len(features))]
+        sample = np.sort(rng.choice(n, size=min(n, 2000), replace=False))
+        sample_distances = pairwise_blocked(data[sample], condensed=True)
+
+        runs = [("landmark", dict(method="landmark", n_landmarks=args.landmarks, random_state=0))]
+        if n <= args.classical_max:
+            runs.insert(0, ("classical", dict(method="classical")))
+        if n <= args.smacof_max:
+            runs[:0] = [("smacof", dict(method="smacof")), ("smacof+classical", dict(method="smacof", init="classical"))]
+
+        for name, options in runs:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                coords, _ = perform_mds2(data, **options)
+            elapsed = time.perf_counter() - start
+            print(f"{n:>8} {name:>18} {elapsed:>11.2f} {stress(sample_distances, coords[sample]):>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
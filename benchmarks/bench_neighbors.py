@@ -0,0 +1,72 @@
+"""
+Benchmark: consultas de vecinos más cercanos con NeighborIndex frente a recorrer una fila.
+
+Las características son los interval_histogram de acordes de la escala cromática (tamaños 3 a 5,
+intervalos 1..10, --octaves octavas), con un poco de ruido para evitar empates masivos entre
+vectores idénticos (por eso las métricas por defecto son de Minkowski o coseno: hamming y jaccard
+solo tienen sentido sobre características discretas). Para cada métrica se mide:
+- build: construir el índice;
+- query: tiempo medio de index.query(chord_id, k) sobre --queries acordes al azar;
+- scan: tiempo medio de calcular la fila completa de distancias con cdist y ordenar (lo que
+  se hacía con la matriz de perform_mds2, sin contar el coste de construirla);
+- batch: tiempo medio por consulta de query_batch con todas las consultas a la vez.
+
+Uso:
+    python benchmarks/bench_neighbors.py [--octaves 1 2] [--metrics euclidean cityblock cosine]
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.spatial.distance import cdist
+
+from mathchords.constans import SCALES
+from mathchords.functions.batch_features import compute_batched
+from mathchords.functions.characteristics import interval_histogram
+from mathchords.functions.gen_chords import generate_chords_table
+from mathchords.functions.neighbors import NeighborIndex
+
+CHROMATIC = SCALES[-1]
+INTERVALS = list(range(1, 11))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--octaves", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--metrics", nargs="+", default=["euclidean", "cityblock", "cosine"])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    table = generate_chords_table(CHROMATIC, args.octaves, [3, 4, 5], INTERVALS)
+    features, _ = compute_batched(table, interval_histogram)
+    rng = np.random.default_rng(0)
+    features = features + rng.normal(scale=0.01, size=features.shape)
+    ids = [f"chord_{i}" for i in rng.choice(len(features), size=args.queries, replace=False)]
+    print(f"{len(features)} acordes, {features.shape[1]} dimensiones, k = {args.k}")
+
+    print(f"{'métrica':>10} {'build (s)':>10} {'query (ms)':>11} {'scan (ms)':>10} {'batch (ms)':>11}")
+    for metric in args.metrics:
+        start = time.perf_counter()
+        index = NeighborIndex(features, metric)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for chord_id in ids:
+            index.query(chord_id, args.k)
+        query = (time.perf_counter() - start) / len(ids) * 1000
+
+        start = time.perf_counter()
+        for chord_id in ids[:20]:
+            row = cdist(features[index.position(chord_id)][None, :], features, metric=metric)[0]
+            np.argpartition(row, args.k)[:args.k]
+        scan = (time.perf_counter() - start) / 20 * 1000
+
+        start = time.perf_counter()
+        index.query_batch(ids, args.k)
+        batch = (time.perf_counter() - start) / len(ids) * 1000
+        print(f"{metric:>10} {build:>10.2f} {query:>11.3f} {scan:>10.2f} {batch:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: escalado de process() con workers procesos.
+
+Ejecuta un extractor costoso (por defecto interval_histogram_with_dissmeasure_weighted) sobre
+la misma población con 1, 2, 4, 8 y 16 procesos, comprueba que el resultado serializado es
+idéntico al de la ejecución secuencial y muestra el tiempo, la aceleración y la duración de
+los bloques.
+
+Uso:
+    python benchmarks/bench_process_workers.py [--workers 1 2 4 8 16] [--sizes 2 3 4] [--chunk-size N]
+"""
+import argparse
+import pickle
+import time
+
+from mathchords.constans import SCALES
+from mathchords.functions import characteristics
+from mathchords.functions.gen_chords import Simula_inversiones, generate_chords
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--feature", default="interval_histogram_with_dissmeasure_weighted")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    func = getattr(characteristics, args.feature)
+    chords = Simula_inversiones(generate_chords(SCALES[0], [3, 4], args.sizes, [1, 2, 3, 4, 5, 6]))
+    data = {"chords": chords}
+    print(f"{len(chords)} acordes, {args.feature}")
+
+    start = time.perf_counter()
+    reference = pickle.dumps(characteristics.process(data, func))
+    sequential = time.perf_counter() - start
+    print(f"{'procesos':>9} {'tiempo (s)':>12} {'aceleración':>12} {'bloques':>8} {'bloque medio (s)':>17}")
+    print(f"{'-':>9} {sequential:>12.2f} {1.0:>11.2f}x")
+
+    for workers in args.workers:
+        timings = []
+        start = time.perf_counter()
+        result = characteristics.process(data, func, workers=workers, chunk_size=args.chunk_size, timings=timings)
+        elapsed = time.perf_counter() - start
+        assert pickle.dumps(result) == reference, "el resultado difiere de la ejecución secuencial"
+        mean = sum(timing["seconds"] for timing in timings) / max(len(timings), 1)
+        print(f"{workers:>9} {elapsed:>12.2f} {sequential / elapsed:>11.2f}x {len(timings):>8} {mean:>17.3f}")
+
+
+if __name__ == "__main__":
+    main()
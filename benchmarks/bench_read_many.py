@@ -0,0 +1,61 @@
+"""
+Benchmark: lectura secuencial de experimentos frente a ExperimentHandler.read_many.
+
+Se crea una carpeta temporal con experimentos sintéticos (pickle) y se leen todos con
+read() en un bucle, con read_many en hilos y con read_many en procesos, sin caché para
+que cada lectura vaya al disco. También se mide read_many con una proyección que solo
+devuelve experiment_params.
+
+Uso:
+    python benchmarks/bench_read_many.py [--files 200] [--size 3] [--workers 8]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from mathchords.constans import SCALES
+from mathchords.functions.gen_chords import create_experiment_data, generate_chords
+from mathchords.io import ExperimentHandler
+
+
+def params_only(data):
+    return data["experiment_params"]
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base:
+        handler = ExperimentHandler(base, cache=None)
+        for i in range(args.files):
+            scale = SCALES[i % len(SCALES)]
+            chords = generate_chords(scale, [4], [args.size], [1, 2, 3, 4, 5])
+            handler.write(create_experiment_data(scale, [4], [args.size], [1, 2, 3, 4, 5], chords,
+                                                 experiment_name=f"bench-{i}"), f"bench-{i:04d}.pkl")
+        names = sorted(name for name in handler.get_files() if name.endswith(".pkl"))
+        total_mb = sum(os.path.getsize(os.path.join(base, name)) for name in names) / 1e6
+        print(f"{len(names)} archivos, {total_mb:.1f} MB, {os.cpu_count()} núcleos")
+
+        _, sequential = timed(lambda: [handler.read(name) for name in names])
+        print(f"{'secuencial':>28}: {sequential:8.3f} s")
+        for executor in ("thread", "process"):
+            (_, errors), elapsed = timed(handler.read_many, names, workers=args.workers, executor=executor)
+            print(f"{'read_many ' + executor:>28}: {elapsed:8.3f} s  (x{sequential / elapsed:.2f}, errores: {len(errors)})")
+            _, elapsed = timed(handler.read_many, names, workers=args.workers, executor=executor,
+                               projection=params_only)
+            print(f"{'read_many ' + executor + ' + proyección':>28}: {elapsed:8.3f} s  (x{sequential / elapsed:.2f})")
+
+
+if __name__ == "__main__":
+    main()
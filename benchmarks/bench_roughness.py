@@ -0,0 +1,80 @@
+"""
+Benchmark: disonancia de Sethares por pares de notas.
+
+Compara tres formas de obtener el vector de 13 posiciones de interval_histogram_with_dissmeasure:
+- por pares: dissmeasure_fixed_amp llamada una vez por par de notas (la implementación anterior);
+- núcleo: roughness_histograms sobre la matriz de frecuencias (exponenciales vectorizadas);
+- tabla: midi_histograms, que indexa la tabla 128x128 de pares de notas MIDI.
+
+Las tres dan exactamente el mismo resultado; el benchmark lo comprueba sobre la población.
+
+Uso:
+    python benchmarks/bench_roughness.py [--size 4] [--pairs-sample 5000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mathchords.constans import SCALES
+from mathchords.functions.batch_features import _bass_sequence, _midi_matrix
+from mathchords.functions.characteristics import dissmeasure_fixed_amp
+from mathchords.functions.gen_chords import generate_chords_table
+from mathchords.functions.roughness import get_pair_table, midi_frequency, midi_histograms, roughness_histograms
+
+CHROMATIC = SCALES[-1]
+INTERVALS = list(range(1, 11))
+
+
+def per_pair(frequencies, sequence, length):
+    """Vector de 13 posiciones con una llamada a dissmeasure_fixed_amp por par (ruta anterior)."""
+    dissmeasures = [0] * 11
+    for i in range(length - 1):
+        for j in range(i + 1, length):
+            interval = (sequence[j] - sequence[i]) % 12
+            if interval > 0:
+                dissmeasures[interval - 1] += dissmeasure_fixed_amp([frequencies[i], frequencies[j]], 1)
+    return dissmeasures + [sum(dissmeasures), sum(dissmeasures) / len(dissmeasures)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=4)
+    parser.add_argument("--pairs-sample", type=int, default=5000,
+                        help="Acordes evaluados con la ruta por pares (se extrapola al total).")
+    args = parser.parse_args()
+
+    table = generate_chords_table(CHROMATIC, [4], [args.size], INTERVALS)
+    sequence, lengths = _bass_sequence(table)
+    notes = _midi_matrix(table, sequence, lengths)
+    frequencies = np.vectorize(midi_frequency)(notes)
+    n_chords = len(lengths)
+    print(f"{n_chords} acordes de {args.size + 1} notas")
+
+    start = time.perf_counter()
+    get_pair_table()
+    print(f"{'construir tabla':>16} {time.perf_counter() - start:>10.4f} s")
+
+    start = time.perf_counter()
+    with_table = midi_histograms(notes, sequence, lengths)
+    t_table = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with_kernel = roughness_histograms(frequencies, sequence, lengths)
+    t_kernel = time.perf_counter() - start
+
+    sample = np.linspace(0, n_chords - 1, min(args.pairs_sample, n_chords)).astype(int)
+    start = time.perf_counter()
+    reference = [per_pair(frequencies[i].tolist(), sequence[i].tolist(), int(lengths[i])) for i in sample]
+    t_pairs = (time.perf_counter() - start) * n_chords / len(sample)
+
+    assert np.array_equal(with_table, with_kernel)
+    assert all(with_table[i].tolist() == vector for i, vector in zip(sample, reference))
+
+    print(f"{'por pares':>16} {t_pairs:>10.2f} s (extrapolado de {len(sample)} acordes)")
+    print(f"{'núcleo':>16} {t_kernel:>10.2f} s   x{t_pairs / t_kernel:.0f}")
+    print(f"{'tabla':>16} {t_table:>10.2f} s   x{t_pairs / t_table:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+Extracción de características por lotes.
+
+Cada extractor de characteristics.py trabaja sobre un único acorde y process() los llama en
+un bucle de Python. Aquí se definen sus equivalentes vectorizados: reciben una tabla columnar
+de acordes (las columnas 'root', 'bass', 'intervals' y 'length' de
+gen_chords.generate_chords_table) y devuelven de una sola vez la matriz (N, d) de
+características de todos los acordes, con los mismos valores que la versión por acorde.
+
+process_batched() usa la versión por lotes cuando existe en BATCH_FEATURES y, si no, recurre
+a process() con la función por acorde.
+"""
+import math
+
+import numpy as np
+
+from mathchords.functions.characteristics import (
+    process, pitch_classes_extractor, transpose_to_zero, interval_vector,
+    binary_pitch_class_set, polar_pitch_classes, interval_histogram,
+    normal_form, prime_form, rahn_normal_order,
+    interval_histogram_with_dissmeasure, interval_histogram_with_dissmeasure_weighted,
+)
+from mathchords.functions.gen_chords import chords_from_table
+from mathchords.functions.pcset_tables import SET_FEATURES, get_tables
+from mathchords.functions.roughness import N_MIDI, midi_frequency, midi_histograms, roughness_histograms
+from mathchords.io.columnar import ColumnarChords, ColumnarResults, chords_to_table
+
+# Coordenadas de cada clase de tono en el círculo, calculadas con math como en polar_pitch_classes
+_POLAR = np.array([[math.cos(pc * (2 * math.pi / 12)), math.sin(pc * (2 * math.pi / 12))] for pc in range(12)])
+# Clases de tono presentes en cada máscara de 12 bits, como ceros y unos y como coordenadas polares
+_MASK_BITS = (np.arange(4096)[:, None] >> np.arange(12)) & 1
+_MASK_POLAR = (_MASK_BITS[:, :, None] * _POLAR).reshape(4096, 24)
+# Número de clases de tono de cada máscara de 12 bits
+_POPCOUNT = _MASK_BITS.sum(axis=1)
+# Los histogramas de pares se acumulan en un entero: _PAIR_BITS bits por casilla
+_PAIR_BITS = 5
+
+
+def _pitch_columns(table):
+    """
+    Alturas de cada acorde por columnas, como en pitch_classes_extractor.
+
+    Retorna:
+    - pcs: matriz (k+1, N); la primera fila es la raíz sin reducir y las demás se reducen módulo 12.
+    - lengths: arreglo con el número de notas válidas de cada acorde (intervalos + 1).
+    """
+    root = np.asarray(table["root"], dtype=np.int16)
+    # Se recorre por columnas: cumsum sobre el eje corto de una matriz (N, k) es mucho más lento
+    intervals = np.asarray(table["intervals"]).T.astype(np.int16)
+    pcs = np.empty((len(intervals) + 1, len(root)), dtype=np.int16)
+    pcs[0] = root
+    current = root % 12
+    for row, interval in zip(pcs[1:], intervals):
+        current += interval
+        np.remainder(current, 12, out=current)
+        row[:] = current
+    return pcs, np.asarray(table["length"], dtype=np.int16) + 1
+
+
+def _pitch_matrix(table):
+    """Como _pitch_columns, pero con una fila (k+1 columnas) por acorde."""
+    pcs, lengths = _pitch_columns(table)
+    return pcs.T, lengths
+
+
+def _pitch_mask(pcs, lengths):
+    """Máscara de 12 bits con las clases de tono 0-11 de cada acorde (la raíz se omite si no lo es)."""
+    root = pcs[0]
+    mask = np.where((root >= 0) & (root < 12), np.left_shift(1, root.clip(0, 11), dtype=np.int16), 0)
+    for position, row in enumerate(pcs[1:], 1):
+        mask |= np.where(position < lengths, np.left_shift(1, row, dtype=np.int16), 0)
+    return mask
+
+
+def _pair_codes(values):
+    """
+    Tabla de incrementos de un histograma empaquetado en un entero de 64 bits: cada casilla
+    ocupa _PAIR_BITS bits y values[d] es la casilla del par con diferencia d módulo 12 (-1 si no
+    se cuenta). La tabla se indexa con la diferencia + 12 (de -11 a 11); sus extremos valen 0.
+    """
+    codes = np.zeros(25, dtype=np.int64)
+    for difference in range(-11, 12):
+        value = values[difference % 12]
+        if value >= 0:
+            codes[difference + 12] = 1 << (value * _PAIR_BITS)
+    return codes
+
+
+def _unpack_histogram(packed, bins):
+    """Matriz (N, bins) de un histograma empaquetado con _pair_codes."""
+    shifts = np.arange(bins, dtype=np.int64) * _PAIR_BITS
+    return (packed[:, None] >> shifts) & ((1 << _PAIR_BITS) - 1)
+
+
+# interval_vector: casilla de cada diferencia (los unísonos se suman en intervals[-1])
+_INTERVAL_CLASS_CODES = _pair_codes([(min(d, 12 - d) - 1) % 6 for d in range(12)])
+# interval_histogram: casilla de cada diferencia (los unísonos no se cuentan)
+_INTERVAL_CODES = _pair_codes([d - 1 for d in range(12)])
+
+
+def _count_pairs(pcs, lengths, codes, bins, flipped=None):
+    """
+    Histograma (N, bins) de los pares de notas (i < j) válidos de cada acorde.
+
+    Cada par suma codes[pcs[j] - pcs[i] + 12]; si flipped(i, j) es un arreglo booleano, en esas
+    filas el par se cuenta al revés, con la diferencia pcs[i] - pcs[j]. Los pares se acumulan
+    empaquetados y se desempaquetan antes de que una casilla pueda desbordarse.
+    """
+    # La raíz puede no estar reducida; las diferencias solo dependen de su clase módulo 12.
+    # Las posiciones de relleno se llevan a 100, 200, ...: cualquier par con una de ellas queda
+    # fuera de la tabla y, con mode='clip', cae en un extremo (que no suma nada)
+    reduced = pcs.astype(np.int32)
+    reduced[0] %= 12
+    for position in range(1, len(reduced)):
+        reduced[position][position >= lengths] = 100 * position
+
+    histogram = None
+    packed = np.zeros(pcs.shape[1], dtype=np.int64)
+    pairs = [(i, j) for j in range(1, len(reduced)) for i in range(j)]
+    for count, (i, j) in enumerate(pairs, 1):
+        difference = reduced[j] - reduced[i]
+        if flipped is not None:
+            np.negative(difference, out=difference, where=flipped(i, j))
+        difference += 12
+        packed += np.take(codes, difference, mode='clip')
+        if count % ((1 << _PAIR_BITS) - 1) == 0 or count == len(pairs):
+            counts = _unpack_histogram(packed, bins)
+            histogram = counts if histogram is None else histogram + counts
+            packed[:] = 0
+    return histogram if histogram is not None else np.zeros((pcs.shape[1], bins), dtype=np.int64)
+
+
+def pitch_classes_batch(table):
+    """Versión por lotes de pitch_classes_extractor (filas de longitud variable)."""
+    return _pitch_matrix(table)
+
+
+def transpose_to_zero_batch(table):
+    """Versión por lotes de transpose_to_zero (filas de longitud variable)."""
+    pcs, lengths = _pitch_matrix(table)
+    return (pcs - pcs[:, :1]) % 12, lengths
+
+
+def interval_vector_batch(table):
+    """Versión por lotes de interval_vector: matriz (N, 6)."""
+    pcs, lengths = _pitch_columns(table)
+    return _count_pairs(pcs, lengths, _INTERVAL_CLASS_CODES, 6), None
+
+
+def binary_pitch_class_set_batch(table, out=None):
+    """
+    Versión por lotes de binary_pitch_class_set: matriz (N, 12) de ceros y unos.
+    Si se indica out (matriz (N, 12) int64), se escribe en ella (ver OUTPUT_SHAPES).
+    """
+    # Las máscaras están siempre en 0-4095: con mode='clip' np.take escribe en out sin búfer intermedio
+    return np.take(_MASK_BITS, _pitch_mask(*_pitch_columns(table)), axis=0, out=out, mode='clip'), None
+
+
+def polar_pitch_classes_batch(table, out=None):
+    """
+    Versión por lotes de polar_pitch_classes: matriz (N, 24) con (coseno, seno) de cada clase presente.
+
+    Es una lectura de tabla por acorde; como la salida ocupa 192 bytes por acorde, escribirla
+    domina el tiempo. Si se indica out (matriz (N, 24) float64), se escribe directamente en
+    ella: compute_batched la usa para no copiar cada lote a la matriz final (ver OUTPUT_SHAPES).
+    """
+    pcs, lengths = _pitch_columns(table)
+    if (pcs[0] >= 12).any():
+        # polar_pitch_classes falla con raíces sin reducir fuera del rango 0-11
+        raise IndexError("Clase de tono fuera del rango 0-11.")
+    return np.take(_MASK_POLAR, _pitch_mask(pcs, lengths), axis=0, out=out, mode='clip'), None
+
+
+def _bass_start(table, pcs, lengths):
+    """Posición de la primera aparición del bajo entre las notas de cada acorde (pcs por columnas)."""
+    bass = np.asarray(table["bass"], dtype=np.int16)
+    start = np.full(len(bass), -1, dtype=np.int16)
+    for position in range(len(pcs) - 1, -1, -1):
+        start[(pcs[position] == bass) & (position < lengths)] = position
+    if (start < 0).any():
+        raise ValueError("El bajo de algún acorde no pertenece a sus notas.")
+    return start
+
+
+def _bass_sequence(table):
+    """
+    Notas de cada acorde en el orden de inversion_from_bass: empezando en la primera aparición
+    del bajo y dando la vuelta. Retorna (secuencia, longitudes).
+    """
+    pcs, lengths = _pitch_columns(table)
+    start = _bass_start(table, pcs, lengths)
+    order = (start[:, None] + np.arange(len(pcs))[None, :]) % lengths[:, None]
+    return np.take_along_axis(pcs.T, order, axis=1), lengths
+
+
+def interval_histogram_batch(table):
+    """Versión por lotes de interval_histogram: matriz (N, 11)."""
+    pcs, lengths = _pitch_columns(table)
+    start = _bass_start(table, pcs, lengths)
+    # En la secuencia que empieza en el bajo, el par (i, j) de las notas originales cambia de
+    # orden cuando la rotación separa i (antes del bajo) de j (desde el bajo)
+    return _count_pairs(pcs, lengths, _INTERVAL_CODES, 11, lambda i, j: (i < start) & (start <= j)), None
+
+
+def _midi_matrix(table, sequence, lengths):
+    """Notas MIDI de cada nota de la secuencia, como inversion_to_midi (0 en las posiciones de relleno)."""
+    sequence = sequence.astype(np.int64)
+    bass = np.asarray(table["bass"], dtype=np.int64)
+    previous = np.concatenate([bass[:, None], sequence[:, :-1]], axis=1)
+    # La octava sube cada vez que una nota es menor que la anterior (empezando por el bajo)
+    octave = np.asarray(table["octave"], dtype=np.int64)[:, None] + np.cumsum(sequence < previous, axis=1)
+    valid = np.arange(sequence.shape[1])[None, :] < lengths[:, None]
+    return np.where(valid, sequence + (octave + 1) * 12, 0)
+
+
+def _dissonance_batch(weighted):
+    def batch(table):
+        sequence, lengths = _bass_sequence(table)
+        notes = _midi_matrix(table, sequence, lengths)
+        if notes.min(initial=0) >= 0 and notes.max(initial=0) < N_MIDI:
+            return midi_histograms(notes, sequence, lengths, weighted), None
+        # Fuera del rango MIDI se evalúa el modelo sobre las frecuencias, calculadas con la misma
+        # expresión de Python que inversion_to_frequencies para obtener exactamente los mismos valores
+        low = int(notes.min())
+        frequencies = np.array([midi_frequency(note) for note in range(low, int(notes.max()) + 1)])
+        return roughness_histograms(frequencies[notes - low], sequence, lengths, weighted), None
+    return batch
+
+
+interval_histogram_with_dissmeasure_batch = _dissonance_batch(weighted=False)
+interval_histogram_with_dissmeasure_weighted_batch = _dissonance_batch(weighted=True)
+
+
+def _set_feature_batch(func):
+    """
+    Versión por lotes de un extractor de pcset_tables.SET_FEATURES: una lectura de tabla por
+    acorde a partir de su máscara de 12 bits. Los acordes que la tabla no cubre (raíz fuera de
+    0-11, notas repetidas cuando el extractor depende de ellas, o conjuntos con los que el
+    extractor falla) se calculan con la función original.
+    """
+    name, distinct_only = SET_FEATURES[func]
+
+    def batch(table):
+        pcs, lengths = _pitch_matrix(table)
+        valid = np.arange(pcs.shape[1])[None, :] < lengths[:, None]
+        in_range = (pcs[:, 0] >= 0) & (pcs[:, 0] < 12)
+        bits = np.left_shift(1, np.where(valid & in_range[:, None], pcs, 0).astype(np.int64))
+        mask = np.bitwise_or.reduce(np.where(valid, bits, 0), axis=1)
+
+        lookup = get_tables()[name]
+        covered = in_range & (lookup["lengths"][mask] >= 0)
+        if distinct_only:
+            covered &= _POPCOUNT[mask] == lengths
+        features = lookup["matrix"][mask].astype(np.int64)
+        row_lengths = lookup["lengths"][mask].astype(np.int64)
+
+        missing = np.flatnonzero(~covered)
+        if len(missing):
+            # Estos extractores solo dependen del multiconjunto de notas: se calcula uno por multiconjunto
+            notes = np.sort(np.where(valid[missing], pcs[missing], np.iinfo(pcs.dtype).max), axis=1)
+            _, first, inverse = np.unique(notes, axis=0, return_index=True, return_inverse=True)
+            first = missing[first]
+            rows = {key: table[key][first] for key in ("octave", "bass", "root", "degree", "intervals", "length")}
+            values = [func(chord, f"chord_{i}")["feature_vector"] for i, chord in zip(first, chords_from_table(rows))]
+            width = max([features.shape[1]] + [len(value) for value in values])
+            group = np.zeros((len(values), width), dtype=np.int64)
+            for k, value in enumerate(values):
+                group[k, :len(value)] = value
+            features = np.pad(features, ((0, 0), (0, width - features.shape[1])))
+            features[missing] = group[inverse.ravel()]
+            row_lengths[missing] = np.array([len(value) for value in values])[inverse.ravel()]
+        return features, row_lengths
+
+    batch.__name__ = f"{func.__name__}_batch"
+    return batch
+
+
+# Extractor por acorde -> versión por lotes. Cada versión por lotes recibe una tabla columnar
+# y devuelve (matriz, longitudes); longitudes es None si todas las filas tienen la misma dimensión.
+BATCH_FEATURES = {
+    pitch_classes_extractor: pitch_classes_batch,
+    transpose_to_zero: transpose_to_zero_batch,
+    interval_vector: interval_vector_batch,
+    binary_pitch_class_set: binary_pitch_class_set_batch,
+    polar_pitch_classes: polar_pitch_classes_batch,
+    interval_histogram: interval_histogram_batch,
+    interval_histogram_with_dissmeasure: interval_histogram_with_dissmeasure_batch,
+    interval_histogram_with_dissmeasure_weighted: interval_histogram_with_dissmeasure_weighted_batch,
+    normal_form: _set_feature_batch(normal_form),
+    prime_form: _set_feature_batch(prime_form),
+    rahn_normal_order: _set_feature_batch(rahn_normal_order),
+}
+
+
+# Versiones por lotes de dimensión fija que aceptan out: compute_batched reserva la matriz
+# final una sola vez y cada lote se escribe en su tramo, en lugar de copiarlo después
+OUTPUT_SHAPES = {
+    binary_pitch_class_set_batch: (12, np.int64),
+    polar_pitch_classes_batch: (24, np.float64),
+}
+
+
+def register_batch(func, batch_func):
+    """Registra la versión por lotes de un extractor para que process_batched la use."""
+    BATCH_FEATURES[func] = batch_func
+
+
+def table_slices(chords, batch_size):
+    """Recorre la población en tablas columnares de hasta batch_size acordes, en orden."""
+    if isinstance(chords, ColumnarChords):
+        chords = chords.table
+    for start in range(0, len(chords["length"]) if isinstance(chords, dict) else len(chords), batch_size):
+        if isinstance(chords, dict):
+            yield {key: column[start:start + batch_size] for key, column in chords.items()}
+        else:
+            yield chords_to_table(chords[start:start + batch_size])[0]
+
+
+def compute_batched(chords, feature, batch_size=65536):
+    """
+    Calcula la matriz de características de toda la población con la versión por lotes de feature.
+
+    Parámetros:
+    - chords: lista de acordes, tabla columnar o ColumnarChords.
+    - feature: extractor por acorde registrado en BATCH_FEATURES.
+    - batch_size: número de acordes por lote (acota la memoria temporal).
+
+    Retorna:
+    - (matriz, longitudes): matriz (N, d) y, si las filas tienen longitud variable, el número
+      de columnas válidas de cada fila (si no, None).
+    """
+    batch_func = BATCH_FEATURES[feature]
+    if batch_func in OUTPUT_SHAPES:
+        width, dtype = OUTPUT_SHAPES[batch_func]
+        if isinstance(chords, ColumnarChords):
+            chords = chords.table
+        n_chords = len(chords["length"]) if isinstance(chords, dict) else len(chords)
+        features = np.empty((n_chords, width), dtype=dtype)
+        for start, table in zip(range(0, n_chords, batch_size), table_slices(chords, batch_size)):
+            batch_func(table, out=features[start:start + batch_size])
+        return features, None
+
+    blocks, lengths = [], []
+    for table in table_slices(chords, batch_size):
+        block, block_lengths = batch_func(table)
+        blocks.append(block)
+        lengths.append(block_lengths)
+
+    if not blocks:
+        return np.zeros((0, 0)), None
+    if len(blocks) == 1:
+        features = blocks[0]
+    else:
+        # Los lotes de longitud variable pueden tener anchos distintos: se rellenan con ceros.
+        # Se copian directamente en la matriz final (np.pad + np.concatenate copiaban dos veces)
+        width = max(block.shape[1] for block in blocks)
+        features = np.zeros((sum(map(len, blocks)), width), dtype=np.result_type(*blocks))
+        start = 0
+        for block in blocks:
+            features[start:start + len(block), :block.shape[1]] = block
+            start += len(block)
+    if lengths[0] is None:
+        return features, None
+    return features, np.concatenate(lengths)
+
+
+def process_batched(data: dict, feature, batch_size=65536):
+    """
+    Equivalente por lotes de process().
+
+    Si feature tiene versión por lotes, la matriz de características se calcula con operaciones
+    vectorizadas y results se devuelve como una vista ColumnarResults sobre esa matriz (con la
+    misma interfaz de diccionario chord_id -> {"chord", "feature_vector", "chord_id"} y la
+    matriz disponible en results.features). Si no, se usa process() con la función por acorde.
+
+    Parámetros:
+    - data: diccionario del experimento con la clave 'chords'.
+    - feature: extractor por acorde (por ejemplo interval_vector).
+    - batch_size: número de acordes por lote.
+
+    Retorna:
+    - Una copia de data con la clave 'results'.
+    """
+    if feature not in BATCH_FEATURES:
+        return process(data, feature)
+
+    chords = data["chords"]
+    features, lengths = compute_batched(chords, feature, batch_size)
+    if isinstance(chords, dict):
+        chords = ColumnarChords(chords)
+
+    new_data = data.copy()
+    new_data['results'] = ColumnarResults(features, chords, lengths=lengths)
+    return new_data
@@ -0,0 +1,140 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import product
+
+from mathchords.constans import SCALES
+from mathchords.functions.gen_chords import generate_chords, Simula_inversiones, create_experiment_data
+from mathchords.io import save
+
+MANIFEST_NAME = "manifest.json"
+
+
+def _shard_name(index, scale, params_index):
+    """Nombre del archivo de un shard: índice de tarea, escala y conjunto de parámetros."""
+    return f"{index:04d} - {scale['name']} - p{params_index}.pkl"
+
+
+def _run_task(task):
+    """
+    Ejecuta una tarea del lote: genera los acordes de una escala con un conjunto de
+    parámetros, simula sus inversiones, arma el experimento y lo guarda en su propio shard.
+
+    Se define a nivel de módulo para que el pool de procesos pueda serializarla.
+    """
+    index, scale, params_index, params, base_path, experiment_name, inversions = task
+    timings = {}
+
+    start = time.perf_counter()
+    chords = generate_chords(scale, params["octaves"], params["sizes"], params["intervals"],
+                             params.get("max_population", -1))
+    timings["generate"] = time.perf_counter() - start
+    n_chords = len(chords)
+
+    if inversions:
+        start = time.perf_counter()
+        chords = Simula_inversiones(chords)
+        timings["inversions"] = time.perf_counter() - start
+
+    experiment = create_experiment_data(scale, params["octaves"], params["sizes"], params["intervals"], chords,
+                                        experiment_name=f"{experiment_name} - {scale['name']} - p{params_index}")
+
+    file_name = _shard_name(index, scale, params_index)
+    file_path = os.path.join(base_path, file_name)
+    start = time.perf_counter()
+    save(experiment, file_path)
+    timings["save"] = time.perf_counter() - start
+
+    return {
+        "file": file_name,
+        "scale": scale["name"],
+        "params_index": params_index,
+        "params": params,
+        "n_chords": n_chords,
+        "n_rows": len(chords),
+        "bytes": os.path.getsize(file_path),
+        "seconds": timings,
+        "pid": os.getpid(),
+    }
+
+
+def _task_error(task, error):
+    """Entrada del manifiesto para una tarea que ha fallado."""
+    index, scale, params_index, params = task[:4]
+    return {
+        "file": _shard_name(index, scale, params_index),
+        "scale": scale["name"],
+        "params_index": params_index,
+        "params": params,
+        "error": f"{type(error).__name__}: {error}",
+    }
+
+
+def generate_all_scales(param_sets, base_path, scales=SCALES, workers=None,
+                        experiment_name="Experimento Musical", inversions=True):
+    """
+    Genera en paralelo las poblaciones de acordes de varias escalas y conjuntos de parámetros.
+
+    Cada par (escala, conjunto de parámetros) es una tarea independiente que se reparte en un
+    pool de procesos. Cada tarea ejecuta generate_chords, Simula_inversiones (opcional) y
+    create_experiment_data, y escribe su resultado como un shard con mathchords.io.save.
+    Al terminar se escribe en base_path un manifiesto JSON con el tamaño y los tiempos
+    de cada shard. Si una tarea falla, el resto del lote sigue adelante y el error se anota
+    en la lista 'errors' del manifiesto.
+
+    Parámetros:
+    - param_sets: lista de diccionarios con las claves 'octaves', 'sizes', 'intervals' y,
+      opcionalmente, 'max_population'.
+    - base_path: carpeta donde se guardan los shards y el manifiesto.
+    - scales: lista de escalas a generar. Por defecto todas las de mathchords.constans.SCALES.
+    - workers: número de procesos. Si es None se usa el número de núcleos; con 1 se ejecuta
+      todo en el proceso actual.
+    - experiment_name: prefijo del nombre de cada experimento.
+    - inversions: si es True, se añaden las inversiones de cada acorde.
+
+    Retorna:
+    - El manifiesto (diccionario) que también se guarda en base_path/manifest.json.
+    """
+    os.makedirs(base_path, exist_ok=True)
+    tasks = [
+        (index, scale, params_index, params, base_path, experiment_name, inversions)
+        for index, (scale, (params_index, params)) in enumerate(product(scales, enumerate(param_sets)))
+    ]
+
+    start = time.perf_counter()
+    shards, errors = [], []
+    if workers == 1:
+        for task in tasks:
+            try:
+                shards.append(_run_task(task))
+            except Exception as error:
+                errors.append(_task_error(task, error))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_run_task, task) for task in tasks]
+            # Se recorren en el orden de las tareas; un fallo no detiene el resto del lote
+            for task, future in zip(tasks, futures):
+                error = future.exception()
+                if error is None:
+                    shards.append(future.result())
+                else:
+                    errors.append(_task_error(task, error))
+    elapsed = time.perf_counter() - start
+
+    manifest = {
+        "experiment_name": experiment_name,
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "workers": workers or os.cpu_count(),
+        "wall_seconds": elapsed,
+        "total_chords": sum(shard["n_chords"] for shard in shards),
+        "total_rows": sum(shard["n_rows"] for shard in shards),
+        "total_bytes": sum(shard["bytes"] for shard in shards),
+        "shards": shards,
+        "errors": errors,
+    }
+    with open(os.path.join(base_path, MANIFEST_NAME), "w") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, ensure_ascii=False)
+
+    return manifest
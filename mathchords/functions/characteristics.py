@@ -3,10 +3,17 @@ import numpy as np
 import os
 import pickle
 from sklearn.manifold import MDS
-from scipy.spatial.distance import pdist, squareform
-from sklearn.metrics import pairwise_distances
 import math
+import sys
+import time
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from mathchords.io import Experiment
+from mathchords.functions.gen_chords import expand_orbits, orbit_chord, orbit_index
+from mathchords.functions.feature_cache import FeatureCache
+from mathchords.functions.distances import DEFAULT_MAX_BYTES, MAHALANOBIS_REG, pairwise_blocked
+from mathchords.functions.mds import DEFAULT_LANDMARKS, classical_mds, landmark_mds
+from mathchords.functions.roughness import roughness_histograms, midi_histograms
 
 def polar_pitch_classes(chord, chord_id):
     # Inicializar el vector de características con 0s
@@ -448,60 +455,271 @@ def only_six_intervals(chord, chord_id):
     return result
 
 
-def process(data: dict, func: Callable):
-    results = {}
-    chords = data["chords"]
-    for i, chord in enumerate(chords):
-        chord_id = f"chord_{i}"  # Generar un identificador único para el acorde
-        result = func(chord, chord_id)  # Llamamos a func en lugar de Experiment_pcset directamente
-        #print(result)
-        result['chord_id'] = chord_id  # Agregar el identificador único al resultado
-        results[chord_id] = result
+# Extractores cuyo feature_vector no cambia al transponer el acorde
+TRANSPOSITION_INVARIANT = (interval_vector, only_six_intervals, interval_histogram, transpose_to_zero)
+
+def _process_chunk(func: Callable, start: int, chords: list):
+    """
+    Ejecuta func sobre un bloque contiguo de acordes (en un proceso del pool de process()).
+
+    El acorde de cada resultado se sustituye por None cuando es el mismo objeto recibido, para
+    no enviarlo de vuelta; process() vuelve a colocar el acorde original en su lugar.
+    """
+    begin = time.perf_counter()
+    results = []
+    for i, chord in enumerate(chords, start=start):
+        chord_id = f"chord_{i}"
+        result = func(chord, chord_id)
+        result['chord_id'] = chord_id
+        shared = result.get('chord') is chord
+        if shared:
+            result['chord'] = None
+        results.append((result, shared))
+    return start, results, time.perf_counter() - begin
+
+def process(data: dict, func: Callable, cache: FeatureCache = None, workers: int = None,
+            chunk_size: int = None, progress: Callable = None, timings: list = None):
+    """
+    Aplica un extractor de características a todos los acordes de data['chords'].
+
+    Parámetros:
+    - data: diccionario del experimento con la clave 'chords'.
+    - func: extractor con firma func(chord, chord_id).
+    - cache: FeatureCache opcional. Si se indica, los resultados se recuperan de la caché en
+      disco cuando la población y el extractor no han cambiado, y solo se calculan los
+      bloques de acordes nuevos (con workers, chunk_size, progress y timings como sin caché;
+      progress y timings cuentan solo los acordes calculados).
+    - workers: número de procesos. Con más de uno, los acordes se reparten en bloques
+      contiguos que se procesan en un ProcessPoolExecutor (func debe poder serializarse con
+      pickle, es decir, estar definida a nivel de módulo). Los resultados se combinan en
+      orden y son idénticos a los de la ejecución secuencial.
+    - chunk_size: acordes por bloque; por defecto se reparten unos 4 bloques por proceso.
+    - progress: función opcional progress(acordes_procesados, total) llamada al terminar cada bloque.
+    - timings: lista opcional a la que se añade, por cada bloque, un diccionario con
+      'start', 'count' y 'seconds'.
+
+    Retorna:
+    - Una copia de data con la clave 'results' (chord_id -> resultado).
+    """
+    def compute(chords, ranges):
+        return _process_ranges(chords, ranges, func, workers, chunk_size, progress, timings)
+
+    if cache is not None:
+        results = cache.process(data["chords"], func, compute)
+    else:
+        chords = data["chords"]
+        if not hasattr(chords, "__len__"):
+            chords = list(chords)
+        results = compute(chords, [(0, len(chords))])
 
     # Actualizar el diccionario experiment_data con los resultados
     new_data = data.copy()
     new_data['results'] = results
 
     return new_data
+
+def _process_ranges(chords, ranges, func, workers, chunk_size, progress, timings):
+    """
+    Resultados de func (chord_id -> resultado) para los acordes de las posiciones [begin, end)
+    de cada rango, en un pool de procesos si workers > 1 y si no uno por uno.
+    """
+    total = sum(end - begin for begin, end in ranges)
+    if workers is not None and workers > 1 and total > 0:
+        return _process_parallel(chords, ranges, func, workers, chunk_size, progress, timings)
+
+    results = {}
+    done = 0
+    for first, last in ranges:
+        begin = time.perf_counter()
+        # Toda la población se recorre directamente (ColumnarChords la convierte por bloques)
+        block = chords if (first, last) == (0, len(chords)) else chords[first:last]
+        for i, chord in enumerate(block, start=first):
+            chord_id = f"chord_{i}"  # Generar un identificador único para el acorde
+            result = func(chord, chord_id)  # Llamamos a func en lugar de Experiment_pcset directamente
+            result['chord_id'] = chord_id  # Agregar el identificador único al resultado
+            results[chord_id] = result
+        done += last - first
+        if timings is not None:
+            timings.append({"start": first, "count": last - first, "seconds": time.perf_counter() - begin})
+        if progress is not None:
+            progress(done, total)
+    return results
+
+def _process_parallel(chords, ranges, func, workers, chunk_size, progress, timings):
+    total = sum(end - begin for begin, end in ranges)
+    chunk_size = chunk_size or -(-total // (workers * 4))
+    done = 0
+    chunks = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_process_chunk, func, start, list(chords[start:min(end, start + chunk_size)]))
+                   for begin, end in ranges for start in range(begin, end, chunk_size)]
+        for future in as_completed(futures):
+            start, chunk, seconds = future.result()
+            chunks[start] = chunk
+            done += len(chunk)
+            if timings is not None:
+                timings.append({"start": start, "count": len(chunk), "seconds": seconds})
+            if progress is not None:
+                progress(done, total)
+
+    results = {}
+    for start in sorted(chunks):
+        for i, (result, shared) in enumerate(chunks[start], start=start):
+            # Las claves llegan como cadenas nuevas; se internan para que compartan objeto como
+            # en la ejecución secuencial y el resultado serializado sea idéntico
+            result = {sys.intern(key): value for key, value in result.items()}
+            if shared:
+                result['chord'] = chords[i]
+            results[result['chord_id']] = result
+    return results
+
+class OrbitResults(Mapping):
+    """
+    Vista de solo lectura chord_id -> {"chord", "feature_vector", "chord_id"} de los resultados
+    de process_orbits, equivalente a results en process() pero sin un diccionario por acorde.
+
+    vectors guarda un feature_vector por órbita; cada acorde de la población (y su copia del
+    vector) se reconstruye al pedirlo. orbit_index() da la órbita de cada acorde y features()
+    la matriz (N, d) de la población completa, si hace falta.
+    """
+
+    def __init__(self, orbits, vectors):
+        self.orbits = orbits
+        self.vectors = vectors
+
+    def __len__(self):
+        return self.orbits["n_chords"]
+
+    def __iter__(self):
+        return (f"chord_{i}" for i in range(len(self)))
+
+    def __getitem__(self, chord_id):
+        prefix, _, number = chord_id.rpartition("_") if isinstance(chord_id, str) else ("", "", "")
+        if prefix != "chord" or not number.isdigit() or int(number) >= len(self):
+            raise KeyError(chord_id)
+        row = int(number)
+        return {
+            "chord": orbit_chord(self.orbits, row),
+            "feature_vector": list(self.vectors[orbit_index(self.orbits, row)]),
+            "chord_id": chord_id
+        }
+
+    def orbit_index(self):
+        """Índice en vectors de cada acorde de la población completa."""
+        return orbit_index(self.orbits)
+
+    def features(self):
+        """Matriz (N, d) con el feature_vector de cada acorde de la población completa."""
+        return np.asarray(self.vectors)[self.orbit_index()]
+
+
+def process_orbits(orbits: dict, func: Callable):
+    """
+    Calcula una característica sobre una población generada con gen_chords.generate_chord_orbits.
+
+    Si func no depende de la transposición (ver TRANSPOSITION_INVARIANT) se evalúa una sola vez
+    por órbita y se devuelve una vista OrbitResults que solo guarda un vector por órbita: los
+    resultados de cada acorde se construyen al pedirlos. Para cualquier otra función se evalúa
+    acorde por acorde sobre la población reconstruida. En ambos casos los identificadores
+    chord_{i} son los de la población completa.
+
+    Parámetros:
+    - orbits: diccionario devuelto por generate_chord_orbits.
+    - func: extractor de características con firma func(chord, chord_id).
+
+    Retorna:
+    - Mapping chord_id -> {"chord", "feature_vector", "chord_id"}, como results en process()
+      (dict(...) lo expande). Al compartir resultados solo se conserva feature_vector; claves
+      adicionales del extractor (como "withPCs" en only_six_intervals) no se copian.
+    """
+    if func not in TRANSPOSITION_INVARIANT:
+        return process({"chords": list(expand_orbits(orbits))}, func)["results"]
+
+    vectors = [func(chord, f"orbit_{k}")["feature_vector"] for k, chord in enumerate(orbits["chords"])]
+    return OrbitResults(orbits, vectors)
+
+def iter_process(chunks, func: Callable):
+    """
+    Versión por bloques de process() para poblaciones que no caben en memoria.
+
+    Recorre los bloques de acordes (por ejemplo los de gen_chords.iter_chords, opcionalmente
+    pasados por Simula_inversiones) y aplica func a cada acorde. Los identificadores
+    chord_{i} continúan de un bloque al siguiente, así que coinciden con los que process()
+    asignaría a la población completa.
+
+    Parámetros:
+    - chunks: iterable de listas de acordes.
+    - func: extractor de características con firma func(chord, chord_id).
+
+    Retorna:
+    - Un generador de diccionarios chord_id -> resultado, uno por bloque.
+    """
+    offset = 0
+    for chunk in chunks:
+        results = {}
+        for i, chord in enumerate(chunk, start=offset):
+            chord_id = f"chord_{i}"
+            result = func(chord, chord_id)
+            result['chord_id'] = chord_id
+            results[chord_id] = result
+        offset += len(chunk)
+        yield results
 #quiza esta funcion que esta abajo este mal ubicada en este modulo xd
-def perform_mds2(data, metric='euclidean', n_components=2, p=2):
+def perform_mds2(data, metric='euclidean', n_components=2, p=2, dtype=np.float64, dissimilarity_path=None,
+                 max_bytes=DEFAULT_MAX_BYTES, mahalanobis_reg=MAHALANOBIS_REG, method='smacof', init=None,
+                 n_landmarks=DEFAULT_LANDMARKS, random_state=None):
     """
     Realiza la reducción de dimensionalidad utilizando MDS, calculando la matriz de disimilitud
     basada en la métrica especificada.
 
     Parámetros:
-    - data (np.array): Conjunto de datos. vectores de caracterisitcas
+    - data (np.array): Conjunto de datos. vectores de caracterisitcas (por ejemplo una matriz de
+      feature_registry.compute_features, que se usa sin copiarla)
     - metric (str): La métrica de disimilitud a utilizar.
     - n_components (int): El número de dimensiones en el espacio de destino.
-    - p (int): El parámetro de la métrica Minkowski para `pdist`.
+    - p (int): El parámetro de la métrica Minkowski (no usado por las métricas soportadas).
+    - dtype: tipo de la matriz de disimilitud (np.float32 la reduce a la mitad).
+    - dissimilarity_path (str): archivo .npy opcional; si se indica, la matriz se escribe ahí
+      mapeada en memoria en lugar de ocupar RAM.
+    - max_bytes (int): memoria máxima de cada bloque al calcular la matriz (ver distances.pairwise_blocked).
+    - mahalanobis_reg (float): regularización de la covarianza para 'mahalanobis': los datos se
+      blanquean con pinv(cov + mahalanobis_reg·I) y se usa la distancia euclídea.
+    - method (str): 'smacof' (MDS métrico de sklearn, por defecto), 'classical' (MDS clásico de
+      Torgerson) o 'landmark' (MDS con puntos de referencia, sin matriz N x N). Ver mathchords.functions.mds.
+    - init: solo para 'smacof': configuración inicial (N, n_components) o 'classical' para
+      partir del resultado del MDS clásico.
+    - n_landmarks (int): número de puntos de referencia para 'landmark'.
+    - random_state: semilla para elegir los puntos de referencia de 'landmark'.
 
     Retorna:
     - np.array: Las coordenadas en el espacio de destino.
-    - np.array: La matriz de disimilitud utilizada.
+    - np.array: La matriz de disimilitud utilizada (None con method='landmark', que no la construye).
     """
-    data = np.array(data)
+    data = np.asarray(data)
+    if method not in ('smacof', 'classical', 'landmark'):
+        raise ValueError(f"Método de MDS no soportado: {method}")
+    if method == 'landmark':
+        val, _ = landmark_mds(data, metric, n_components, n_landmarks, random_state, max_bytes, mahalanobis_reg)
+        return val, None
+
     try:
-        # Calcular la matriz de disimilitud basada en la métrica especificada
-        if metric in ['euclidean', 'cityblock', 'cosine', 'chebyshev', 'jaccard', 'hamming']:
-            if metric in ['jaccard', 'hamming']:
-                # Para Jaccard y Hamming, usamos sklearn
-                dissimilarity_matrix = pairwise_distances(data, metric=metric)
-            else:
-                # Para el resto de las métricas, usamos scipy
-                dissimilarity_matrix = squareform(pdist(data, metric=metric))
-        elif metric == 'mahalanobis':
-            # Para Mahalanobis, necesitamos calcular la matriz de inversión de covarianza
-            # Añadimos una pequeña regularización para asegurar la inversión
-            cov_inv = np.linalg.pinv(np.cov(data.T) + np.eye(data.shape[1]) * 15)
-            dissimilarity_matrix = squareform(pdist(data, metric=lambda u, v: mahalanobis(u, v, cov_inv)))
-        else:
-            raise ValueError("Métrica no soportada.")
+        # Calcular la matriz de disimilitud por bloques (ver mathchords.functions.distances)
+        dissimilarity_matrix = pairwise_blocked(data, metric=metric, out=dissimilarity_path, dtype=dtype,
+                                                max_bytes=max_bytes, reg=mahalanobis_reg)
     except Exception as e:
         raise ValueError(f"Error al calcular la matriz de disimilitud: {e}")
 
+    if method == 'classical':
+        return classical_mds(dissimilarity_matrix, n_components), dissimilarity_matrix
+
     # Realizar MDS
-    mds = MDS(n_components=n_components, dissimilarity='precomputed', max_iter=30000, eps=1e-16)
-    val = mds.fit_transform(dissimilarity_matrix)
+    if isinstance(init, str) and init == 'classical':
+        init = classical_mds(dissimilarity_matrix, n_components)
+    if init is None:
+        mds = MDS(n_components=n_components, dissimilarity='precomputed', max_iter=30000, eps=1e-16)
+    else:
+        mds = MDS(n_components=n_components, dissimilarity='precomputed', max_iter=30000, eps=1e-16, n_init=1)
+    val = mds.fit_transform(dissimilarity_matrix, init=init)
     print(f"Número de iteraciones: {mds.n_iter_}, Stress: {mds.stress_}")
     return val, dissimilarity_matrix
 
@@ -587,6 +805,23 @@ def inversion_to_frequencies(chord):
 
     return frequencies
 
+def inversion_to_midi(chord):
+    """
+    Notas MIDI de la inversión del acorde, con las mismas octavas que inversion_to_frequencies
+    (midi_frequency de cada nota da exactamente la frecuencia que calcula esa función).
+    """
+    octave = chord['octave']
+    previous_note = chord['bass']
+    notes = []
+
+    for note in inversion_from_bass(chord):
+        if note < previous_note:
+            octave += 1
+        notes.append(note + (octave + 1) * 12)
+        previous_note = note
+
+    return notes
+
 def dissmeasure_fixed_amp(fvec, fixed_amp=1, model='min'):
     sort_idx = np.argsort(fvec)
     fr_sorted = np.asarray(fvec)[sort_idx]
@@ -622,81 +857,36 @@ def weight_function(position, total_positions):
 
 
 def interval_histogram_with_dissmeasure(chord, chord_id):
-    fixed_amp = 1
-    # Genera la secuencia de notas con inversión basada en el bajo
-    note_sequence = inversion_from_bass(chord)
-    frequencies = inversion_to_frequencies(chord)  # Asume que esta es la función correcta para obtener frecuencias
-
-    histogram = [0] * 11  # Histograma para intervalos
-    dissmeasures = [0] * 11  # Vector para almacenar las disonancias por intervalo
-    vector_test1 = [0] * 13  # Vector para la suma de histograma y disonancias
-
-    # Calcular intervalos y disonancias para pares de notas
-    for i in range(len(note_sequence) - 1):
-        for j in range(i + 1, len(note_sequence)):
-            interval = (note_sequence[j] - note_sequence[i]) % 12
-            if interval > 0:  # Solo intervalos positivos
-                histogram[interval - 1] += 1
-
-                # Calcula la disonancia para el par de notas
-                dissonance = dissmeasure_fixed_amp([frequencies[i], frequencies[j]], fixed_amp)
-                dissmeasures[interval - 1] += dissonance
-                print(frequencies[i],frequencies[j],dissonance)
-
-    # Calcula el vector_test1 como la suma de histogram y dissmeasures
-    for i in range(len(histogram)):
-        vector_test1[i] = dissmeasures[i] #Andres quiere agrear una possicon extra al vector donde este la suma total
-    # Agrega la suma total de las disonancias en la posición 11
-    vector_test1[-2] = sum(dissmeasures)
+    """
+    Disonancia de Sethares (amplitud fija) de cada par de notas, agrupada por intervalo.
 
-    # Agrega el promedio de las disonancias en la posición 12
-    vector_test1[-1] = sum(dissmeasures) / len(dissmeasures)
-    result = {
-        "chord": chord,
-        "feature_vector": vector_test1,
-        "chord_id": chord_id
-    }
+    Retorna un vector de 13 posiciones: la disonancia acumulada de cada intervalo (1 a 11
+    semitonos), su suma total y su promedio. Los pares se evalúan todos a la vez con
+    roughness.roughness_histograms, el mismo núcleo que usa la versión por lotes.
+    """
+    return _dissonance_result(chord, chord_id, weighted=False)
 
-    return result
 def interval_histogram_with_dissmeasure_weighted(chord, chord_id):
-    fixed_amp = 1
-    note_sequence = inversion_from_bass(chord)
-    frequencies = inversion_to_frequencies(chord)  # Obtener frecuencias
-
-    histogram = [0] * 11  # Histograma para intervalos
-    dissmeasures = [0] * 11  # Vector para almacenar las disonancias por intervalo
-    vector_test1 = [0] * 13  # Vector para la suma de histograma y disonancias
-
-    total_notes = len(note_sequence)
-
-    # Calcular intervalos y disonancias para pares de notas
-    for i in range(total_notes - 1):
-        for j in range(i + 1, total_notes):
-            interval = (note_sequence[j] - note_sequence[i]) % 12
-            if interval > 0:  # Solo intervalos positivos
-                # Calcular el peso basado en las posiciones de las notas
-                weight = weight_function(i, total_notes) * weight_function(j, total_notes)
-                histogram[interval - 1] += 1
-
-                # Calcular disonancia y aplicar peso
-                dissonance = dissmeasure_fixed_amp([frequencies[i], frequencies[j]], fixed_amp)
-                dissmeasures[interval - 1] += dissonance * weight
+    """
+    Igual que interval_histogram_with_dissmeasure, pero la disonancia de cada par se multiplica
+    por weight_function de las posiciones de sus dos notas.
+    """
+    return _dissonance_result(chord, chord_id, weighted=True)
 
-    # Calcula el vector_test1 como la suma de histogram y dissmeasures
-    for i in range(len(histogram)):
-        vector_test1[i] = dissmeasures[i]
-    # Agrega la suma total de las disonancias en la posición 11
-    vector_test1[-2] = sum(dissmeasures)
+def _dissonance_result(chord, chord_id, weighted):
+    note_sequence = inversion_from_bass(chord)
+    notes = inversion_to_midi(chord)
+    if all(0 <= note < 128 for note in notes):
+        # Tabla de rugosidad por pares de notas MIDI (exacta con amplitud fija)
+        vector_test1 = midi_histograms([notes], [note_sequence], [len(note_sequence)], weighted)[0]
+    else:
+        frequencies = inversion_to_frequencies(chord)
+        vector_test1 = roughness_histograms([frequencies], [note_sequence], [len(note_sequence)], weighted)[0]
 
-    # Agrega el promedio de las disonancias en la posición 12
-    vector_test1[-1] = sum(dissmeasures) / len(dissmeasures)
-    
     result = {
         "chord": chord,
-        "feature_vector": vector_test1,
+        "feature_vector": vector_test1.tolist(),
         "chord_id": chord_id
     }
 
     return result
-
-
@@ -0,0 +1,271 @@
+"""
+Codificación compacta de acordes.
+
+Un acorde se empaqueta en un único entero de 64 bits con la siguiente distribución
+(del bit menos significativo al más significativo):
+
+- bits 0-11: máscara de clases de tono (bit p encendido si la clase de tono p está en el acorde).
+- bits 12-18: bajo (0-127).
+- bits 19-23: raíz (0-31).
+- bits 24-27: octava (0-15).
+- bits 28-31: grado (0-15).
+- bits 32-34: número de intervalos (0-7).
+- bits 35-62: hasta 7 intervalos de 4 bits cada uno (0-15), en orden.
+
+El bajo tiene más bits que la raíz porque Simula_inversiones le suma un intervalo antes de
+reducirlo módulo 12 (chord["bass"] += interval), así que un Chord pasa por valores de hasta
+31 + 15 que el diccionario admite. El código completo ocupa 63 bits y cabe en un int64.
+
+La máscara se deriva de la raíz y los intervalos, pero se guarda para poder consultar la
+clase de conjunto sin decodificar. A diferencia de la máscara sola, los intervalos conservan
+el orden y las repeticiones que necesitan extractores como inversion_from_bass o
+intervals_extractor, por lo que la decodificación es exacta.
+"""
+from collections.abc import Mapping
+
+import numpy as np
+
+MASK_BITS = 12
+BASS_SHIFT, BASS_BITS = 12, 7
+ROOT_SHIFT, ROOT_BITS = 19, 5
+OCTAVE_SHIFT, OCTAVE_BITS = 24, 4
+DEGREE_SHIFT, DEGREE_BITS = 28, 4
+LENGTH_SHIFT, LENGTH_BITS = 32, 3
+INTERVALS_SHIFT, INTERVAL_BITS = 35, 4
+MAX_INTERVALS = 7
+
+CHORD_KEYS = ("octave", "bass", "root", "degree", "intervals")
+
+
+def _check_range(name, value, bits):
+    if not 0 <= value < (1 << bits):
+        raise ValueError(f"'{name}'={value} no cabe en {bits} bits (rango 0-{(1 << bits) - 1}).")
+
+
+def pitch_class_mask(root, intervals):
+    """Máscara de 12 bits con las clases de tono del acorde (raíz más intervalos acumulados)."""
+    mask = 1 << (root % 12)
+    for interval in intervals:
+        root += interval
+        mask |= 1 << (root % 12)
+    return mask
+
+
+def encode_chord(chord):
+    """
+    Empaqueta un acorde en un entero.
+
+    Parámetros:
+    - chord: diccionario (o Chord) con las claves 'octave', 'bass', 'root', 'degree' e 'intervals'.
+      Las demás claves se ignoran (Chord.from_dict las conserva en extras).
+
+    Retorna:
+    - int: el código empaquetado del acorde.
+    """
+    intervals = list(chord["intervals"])
+    if len(intervals) > MAX_INTERVALS:
+        raise ValueError(f"El acorde tiene {len(intervals)} intervalos; el máximo codificable es {MAX_INTERVALS}.")
+
+    code = pitch_class_mask(chord["root"], intervals)
+    for name, value, shift, bits in (("bass", chord["bass"], BASS_SHIFT, BASS_BITS),
+                                     ("root", chord["root"], ROOT_SHIFT, ROOT_BITS),
+                                     ("octave", chord["octave"], OCTAVE_SHIFT, OCTAVE_BITS),
+                                     ("degree", chord["degree"], DEGREE_SHIFT, DEGREE_BITS)):
+        _check_range(name, value, bits)
+        code |= value << shift
+
+    code |= len(intervals) << LENGTH_SHIFT
+    for i, interval in enumerate(intervals):
+        _check_range("intervals", interval, INTERVAL_BITS)
+        code |= interval << (INTERVALS_SHIFT + i * INTERVAL_BITS)
+    return code
+
+
+def _field(code, shift, bits):
+    return (code >> shift) & ((1 << bits) - 1)
+
+
+def _decode_intervals(code):
+    length = _field(code, LENGTH_SHIFT, LENGTH_BITS)
+    return [_field(code, INTERVALS_SHIFT + i * INTERVAL_BITS, INTERVAL_BITS) for i in range(length)]
+
+
+def decode_chord(code):
+    """
+    Desempaqueta un código en el diccionario clásico de acorde.
+
+    Parámetros:
+    - code: entero producido por encode_chord.
+
+    Retorna:
+    - dict: acorde con las claves 'octave', 'bass', 'root', 'degree' e 'intervals'.
+    """
+    code = int(code)
+    return {
+        "octave": _field(code, OCTAVE_SHIFT, OCTAVE_BITS),
+        "bass": _field(code, BASS_SHIFT, BASS_BITS),
+        "root": _field(code, ROOT_SHIFT, ROOT_BITS),
+        "degree": _field(code, DEGREE_SHIFT, DEGREE_BITS),
+        "intervals": _decode_intervals(code),
+    }
+
+
+class Chord(Mapping):
+    """
+    Acorde compacto respaldado por su código empaquetado.
+
+    Se comporta como el diccionario de acorde de solo lectura/escritura que usan
+    characteristics.py, clustering.py y Simula_inversiones: admite chord["root"],
+    chord.get("intervals", []), chord.copy() y asignaciones como chord["bass"] = 3, que
+    reempaquetan el código. Las claves que no forman parte del código (como 'name' en
+    constans.DO_chords) se guardan aparte en extras, así que cualquier diccionario de acorde
+    se puede convertir sin perder información.
+
+    Memoria: un Chord sin extras ocupa unos 80 bytes (el objeto y su entero), frente a unos
+    270 del diccionario con su lista de intervalos, es decir, unas 3.4 veces menos. El ahorro
+    grande está en los arreglos de encode_chords y encode_table: 8 bytes por acorde (más de 30
+    veces menos), aunque sin las claves adicionales.
+    """
+    __slots__ = ("code", "extras")
+
+    def __init__(self, code, extras=None):
+        self.code = int(code)
+        self.extras = dict(extras) if extras else None
+
+    @classmethod
+    def from_dict(cls, chord):
+        return cls(encode_chord(chord), {key: chord[key] for key in chord if key not in CHORD_KEYS})
+
+    @property
+    def octave(self):
+        return _field(self.code, OCTAVE_SHIFT, OCTAVE_BITS)
+
+    @property
+    def bass(self):
+        return _field(self.code, BASS_SHIFT, BASS_BITS)
+
+    @property
+    def root(self):
+        return _field(self.code, ROOT_SHIFT, ROOT_BITS)
+
+    @property
+    def degree(self):
+        return _field(self.code, DEGREE_SHIFT, DEGREE_BITS)
+
+    @property
+    def intervals(self):
+        return _decode_intervals(self.code)
+
+    @property
+    def mask(self):
+        return _field(self.code, 0, MASK_BITS)
+
+    # Protocolo de diccionario para ser intercambiable con los acordes clásicos
+    def __getitem__(self, key):
+        if key in CHORD_KEYS:
+            return getattr(self, key)
+        if self.extras is not None and key in self.extras:
+            return self.extras[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key not in CHORD_KEYS:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[key] = value
+            return
+        chord = decode_chord(self.code)
+        chord[key] = value
+        self.code = encode_chord(chord)
+
+    def __contains__(self, key):
+        return key in CHORD_KEYS or (self.extras is not None and key in self.extras)
+
+    def __iter__(self):
+        yield from CHORD_KEYS
+        if self.extras is not None:
+            yield from self.extras
+
+    def __len__(self):
+        return len(CHORD_KEYS) + (len(self.extras) if self.extras is not None else 0)
+
+    def copy(self):
+        return Chord(self.code, self.extras)
+
+    def to_dict(self):
+        chord = decode_chord(self.code)
+        if self.extras is not None:
+            chord.update(self.extras)
+        return chord
+
+    def __eq__(self, other):
+        if isinstance(other, Chord):
+            return self.code == other.code and (self.extras or {}) == (other.extras or {})
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __reduce__(self):
+        return (Chord, (self.code, self.extras))
+
+    def __repr__(self):
+        return f"Chord({self.to_dict()})"
+
+
+def pack_chords(chords):
+    """Convierte una lista de acordes (diccionarios) en una lista de Chord."""
+    return [Chord.from_dict(chord) for chord in chords]
+
+
+def encode_chords(chords):
+    """Empaqueta una lista de acordes en un arreglo int64 (8 bytes por acorde; sin las claves adicionales)."""
+    return np.fromiter((encode_chord(chord) for chord in chords), dtype=np.int64)
+
+
+def encode_table(table):
+    """
+    Empaqueta de forma vectorizada una tabla columnar de gen_chords.generate_chords_table.
+
+    Parámetros:
+    - table: diccionario de arreglos con las columnas 'octave', 'bass', 'root', 'degree',
+      'intervals' y 'length'.
+
+    Retorna:
+    - np.ndarray int64 con el código de cada fila, igual al de encode_chord.
+    """
+    intervals = table["intervals"].astype(np.int64)
+    n_chords, max_size = intervals.shape
+    if max_size > MAX_INTERVALS:
+        raise ValueError(f"La tabla tiene hasta {max_size} intervalos; el máximo codificable es {MAX_INTERVALS}.")
+    for name, bits in (("bass", BASS_BITS), ("root", ROOT_BITS), ("octave", OCTAVE_BITS), ("degree", DEGREE_BITS)):
+        column = table[name]
+        if len(column) and (column.min() < 0 or column.max() >= (1 << bits)):
+            raise ValueError(f"La columna '{name}' no cabe en {bits} bits.")
+
+    root = table["root"].astype(np.int64)
+    length = table["length"].astype(np.int64)
+
+    # Clases de tono de cada posición; las posiciones de relleno repiten la última nota
+    positions = np.zeros((n_chords, max_size + 1), dtype=np.int64)
+    np.cumsum(intervals, axis=1, out=positions[:, 1:])
+    pitch_classes = (root[:, None] + positions) % 12
+    valid = np.arange(max_size + 1)[None, :] <= length[:, None]
+    mask = np.bitwise_or.reduce(np.where(valid, 1 << pitch_classes, 0), axis=1)
+
+    code = (mask
+            | table["bass"].astype(np.int64) << BASS_SHIFT
+            | root << ROOT_SHIFT
+            | table["octave"].astype(np.int64) << OCTAVE_SHIFT
+            | table["degree"].astype(np.int64) << DEGREE_SHIFT
+            | length << LENGTH_SHIFT)
+    for i in range(max_size):
+        code |= intervals[:, i] << (INTERVALS_SHIFT + i * INTERVAL_BITS)
+    return code
+
+
+def decode_codes(codes):
+    """Generador de diccionarios de acorde a partir de un arreglo de códigos."""
+    for code in codes.tolist():
+        yield decode_chord(code)
@@ -0,0 +1,139 @@
+"""
+Matrices de disimilitud por bloques.
+
+perform_mds2 calculaba la matriz N x N completa con squareform(pdist(...)) o
+pairwise_distances, que ocupa 8·N² bytes en memoria (80 GB con N = 100 000) además de la
+forma condensada intermedia. pairwise_blocked la calcula por bloques de filas (y cada bloque
+por bloques de columnas con cdist), de modo que la memoria temporal está acotada por
+max_bytes, y escribe el resultado en un arreglo en memoria, en un archivo .npy mapeado en
+memoria (np.memmap) o en forma condensada, opcionalmente en float32.
+
+Las métricas son las mismas que aceptaba perform_mds2 y con la misma semántica: jaccard
+convierte los vectores a booleanos como pairwise_distances de sklearn, y mahalanobis usa la
+inversa regularizada pinv(cov + reg·I) (reg = 15 por defecto). Para mahalanobis los datos se
+blanquean una sola vez (X·L con L·Lᵀ = VI) y se usa la distancia euclídea sobre el resultado,
+que es la misma distancia calculada con el núcleo euclídeo en C.
+"""
+import numpy as np
+from numpy.lib.format import open_memmap
+from scipy.spatial.distance import cdist
+
+METRICS = ('euclidean', 'cityblock', 'cosine', 'chebyshev', 'jaccard', 'hamming', 'mahalanobis')
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+MAHALANOBIS_REG = 15
+
+
+def mahalanobis_vi(X, reg=MAHALANOBIS_REG):
+    """Inversa regularizada de la covarianza de X: pinv(cov(X.T) + reg·I)."""
+    X = np.asarray(X, dtype=np.float64)
+    return np.linalg.pinv(np.cov(X.T) + np.eye(X.shape[1]) * reg)
+
+
+def whitening_matrix(VI):
+    """Matriz L con L·Lᵀ = VI: la distancia euclídea entre x·L e y·L es la de Mahalanobis."""
+    eigenvalues, eigenvectors = np.linalg.eigh(np.asarray(VI, dtype=np.float64))
+    return eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+
+def whiten(X, VI=None, reg=MAHALANOBIS_REG):
+    """
+    Blanquea X para que la distancia euclídea entre filas sea la distancia de Mahalanobis.
+
+    Parámetros:
+    - X: matriz (N, d).
+    - VI: inversa de la covarianza; por defecto mahalanobis_vi(X, reg).
+    - reg: regularización de la covarianza cuando VI no se indica.
+
+    Retorna:
+    - X·L, con L·Lᵀ = VI.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    VI = mahalanobis_vi(X, reg) if VI is None else VI
+    return X @ whitening_matrix(VI)
+
+
+def condensed_index(n, i, j):
+    """Posición del par (i, j), con i < j, en la forma condensada de pdist para n puntos."""
+    return n * i - i * (i + 1) // 2 + (j - i - 1)
+
+
+def prepare_features(X, metric, VI=None, reg=MAHALANOBIS_REG):
+    """
+    Prepara X para calcular distancias con cdist/pdist.
+
+    Retorna:
+    - (X preparada, métrica para cdist): jaccard pasa a booleanos y mahalanobis se blanquea y
+      se convierte en euclidean; las demás métricas no cambian.
+    """
+    if metric not in METRICS:
+        raise ValueError("Métrica no soportada.")
+    X = np.asarray(X)
+    if metric == 'jaccard':
+        return X.astype(bool), metric
+    if metric == 'mahalanobis':
+        return whiten(X, VI, reg), 'euclidean'
+    return X.astype(np.float64, copy=False), metric
+
+
+def _row_blocks(n, itemsize, max_bytes):
+    rows = max(1, min(n, max_bytes // max(1, n * itemsize)))
+    for start in range(0, n, rows):
+        yield start, min(n, start + rows)
+
+
+def _fill_rows(X, start, stop, first_column, buffer, metric, column_block):
+    """Escribe en buffer las distancias de las filas start:stop a las columnas first_column:n."""
+    n = len(X)
+    for column in range(first_column, n, column_block):
+        end = min(n, column + column_block)
+        buffer[:stop - start, column - first_column:end - first_column] = cdist(
+            X[start:stop], X[column:end], metric=metric)
+
+
+def pairwise_blocked(X, metric='euclidean', out=None, condensed=False, dtype=np.float64,
+                     max_bytes=DEFAULT_MAX_BYTES, VI=None, reg=MAHALANOBIS_REG):
+    """
+    Calcula la matriz de disimilitud de X por bloques.
+
+    Parámetros:
+    - X: matriz (N, d) de vectores de características.
+    - metric: una de METRICS.
+    - out: None para devolver un arreglo en memoria, o la ruta de un archivo .npy que se crea
+      mapeado en memoria (se puede volver a abrir con np.load(out, mmap_mode='r')).
+    - condensed: si es True se guarda solo el triángulo superior en la forma condensada de
+      pdist (N·(N-1)/2 valores) y solo se calculan esas distancias.
+    - dtype: tipo del resultado (np.float32 reduce a la mitad el espacio).
+    - max_bytes: memoria máxima aproximada de cada bloque de filas.
+    - VI: inversa de la covarianza para mahalanobis (por defecto mahalanobis_vi(X, reg)).
+    - reg: regularización de la covarianza para mahalanobis.
+
+    Retorna:
+    - Matriz (N, N) o vector condensado, como np.ndarray o np.memmap.
+    """
+    X, metric = prepare_features(X, metric, VI, reg)
+    n = len(X)
+    dtype = np.dtype(dtype)
+    shape = (n * (n - 1) // 2,) if condensed else (n, n)
+    result = np.zeros(shape, dtype=dtype) if out is None else open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+
+    # cdist devuelve float64: el bloque de columnas se limita para que su salida también quepa en max_bytes
+    column_block = max(1, max_bytes // (8 * max(1, min(n, max_bytes // max(1, n * dtype.itemsize)))))
+    for start, stop in _row_blocks(n, dtype.itemsize, max_bytes):
+        if not condensed:
+            _fill_rows(X, start, stop, 0, result[start:stop], metric, column_block)
+            continue
+        first_column = start + 1
+        if first_column >= n:
+            break
+        buffer = np.empty((stop - start, n - first_column), dtype=dtype)
+        _fill_rows(X, start, stop, first_column, buffer, metric, column_block)
+        for row in range(start, min(stop, n - 1)):
+            offset = condensed_index(n, row, row + 1)
+            result[offset:offset + n - row - 1] = buffer[row - start, row - start:]
+
+    if not condensed:
+        # La diagonal es exactamente cero, como en squareform(pdist(...))
+        np.fill_diagonal(result, 0)
+    if out is not None:
+        result.flush()
+    return result
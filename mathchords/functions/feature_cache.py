@@ -0,0 +1,215 @@
+"""
+Caché persistente de resultados de características.
+
+Los resultados de un extractor (por ejemplo interval_histogram o only_six_intervals) se
+guardan en disco por bloques de acordes. La clave de cada bloque es un hash del contenido
+de sus acordes y de la identidad del extractor, por lo que:
+
+- volver a ejecutar process() con la misma población y el mismo extractor no llama a func;
+- si la población crece, los bloques que ya existían se reutilizan y solo se calculan los nuevos;
+- si cambia el código del extractor o el de las funciones de mathchords que usa, o la versión
+  con la que está registrado en feature_registry, la caché deja de coincidir.
+
+El tamaño del directorio está acotado: al superar max_bytes se borran los bloques usados
+hace más tiempo.
+"""
+import hashlib
+import os
+import pickle
+import types
+
+DEFAULT_BLOCK_SIZE = 4096
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+# Solo se siguen las funciones auxiliares de este paquete (no las de NumPy, la biblioteca estándar...)
+_PACKAGE = "mathchords"
+
+
+def _hash_const(value, hasher, namespace, seen):
+    """Añade una constante al hash sin depender de direcciones de memoria ni del orden de los sets."""
+    if isinstance(value, types.CodeType):
+        _hash_code(value, hasher, namespace, seen)
+    elif isinstance(value, (tuple, frozenset)):
+        items = sorted(value, key=repr) if isinstance(value, frozenset) else value
+        hasher.update(b"(")
+        for item in items:
+            _hash_const(item, hasher, namespace, seen)
+        hasher.update(b")")
+    else:
+        hasher.update(repr(value).encode())
+
+
+def _hash_code(code, hasher, namespace, seen):
+    """
+    Añade al hash el bytecode, las constantes (incluidos los objetos de código anidados) y los
+    nombres de code, y después el código de las funciones de mathchords a las que se refiere.
+    """
+    hasher.update(code.co_code)
+    hasher.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        _hash_const(const, hasher, namespace, seen)
+    for name in code.co_names:
+        helper = namespace.get(name)
+        if (isinstance(helper, types.FunctionType) and helper not in seen
+                and (helper.__module__ or "").split(".")[0] == _PACKAGE):
+            seen.add(helper)
+            hasher.update(f"{helper.__module__}.{helper.__qualname__}".encode())
+            _hash_code(helper.__code__, hasher, helper.__globals__, seen)
+
+
+def code_hash(func):
+    """
+    Hash del código de un extractor y de las funciones auxiliares de mathchords que llama.
+
+    Es estable entre procesos: los objetos de código anidados (comprensiones, lambdas) se
+    recorren en lugar de usar su repr, que incluye su dirección de memoria.
+    """
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return ""
+    hasher = hashlib.blake2b(digest_size=8)
+    _hash_const(getattr(func, "__defaults__", None), hasher, {}, set())
+    _hash_code(code, hasher, getattr(func, "__globals__", {}), {func})
+    return hasher.hexdigest()
+
+
+def feature_key(func):
+    """
+    Identidad de un extractor: módulo, nombre, hash de su código (ver code_hash) y la versión
+    de su FeatureSpec si está registrado en feature_registry.FEATURES (subir la versión
+    invalida la caché cuando cambia algo que el hash no ve, como una tabla de datos).
+    """
+    # Importación diferida: feature_registry importa characteristics, que usa esta caché
+    from mathchords.functions.feature_registry import FEATURES
+    versions = [spec.version for spec in FEATURES.values() if spec.func is func]
+    version = max(versions) if versions else ""
+    identity = f"{func.__module__}.{func.__qualname__}:{code_hash(func)}:{version}"
+    return hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+
+
+def block_hash(chords):
+    """Hash del contenido de un bloque de acordes (independiente de su posición en la población)."""
+    content = repr([sorted(chord.items()) for chord in chords]).encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+class FeatureCache:
+    """
+    Caché en disco de los resultados de process(), direccionada por contenido.
+
+    Parámetros:
+    - cache_dir: carpeta donde se guardan los bloques.
+    - max_bytes: tamaño máximo de la carpeta; al superarlo se borran los bloques menos usados.
+    - block_size: número de acordes por bloque.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, block_size=DEFAULT_BLOCK_SIZE):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _block_path(self, func_key, chords):
+        return os.path.join(self.cache_dir, func_key, f"{block_hash(chords)}.pkl")
+
+    def _read(self, path):
+        try:
+            with open(path, "rb") as block_file:
+                entries = pickle.load(block_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path)  # La fecha de modificación sirve como marca de último uso
+        return entries
+
+    def _write(self, path, entries):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as block_file:
+            pickle.dump(entries, block_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def process(self, chords, func, compute=None):
+        """
+        Calcula (o recupera de la caché) los resultados de func sobre una población de acordes.
+
+        Parámetros:
+        - chords: lista de acordes.
+        - func: extractor de características con firma func(chord, chord_id).
+        - compute: función opcional compute(chords, ranges) que calcula los bloques que faltan
+          y retorna chord_id -> resultado para las posiciones [begin, end) de cada rango (por
+          ejemplo en paralelo, ver characteristics.process); por defecto se llama a func
+          acorde por acorde.
+
+        Retorna:
+        - Diccionario chord_id -> resultado, idéntico al que construye process().
+        """
+        func_key = feature_key(func)
+        chords = list(chords)
+
+        blocks, missing = [], []
+        for start in range(0, len(chords), self.block_size):
+            block = chords[start:start + self.block_size]
+            path = self._block_path(func_key, block)
+            entries = self._read(path)
+            if entries is None:
+                self.misses += 1
+                missing.append((start, start + len(block)))
+            else:
+                self.hits += 1
+            blocks.append((start, block, path, entries))
+
+        computed = {}
+        if missing:
+            if compute is not None:
+                computed = compute(chords, missing)
+            else:
+                for begin, end in missing:
+                    for i in range(begin, end):
+                        computed[f"chord_{i}"] = func(chords[i], f"chord_{i}")
+
+        results = {}
+        for start, block, path, entries in blocks:
+            if entries is None:
+                # Se guarda todo menos el acorde y su identificador, que dependen de la población
+                entries = [{key: value for key, value in computed[f"chord_{i}"].items() if key not in ("chord", "chord_id")}
+                           for i in range(start, start + len(block))]
+                self._write(path, entries)
+
+            for i, (chord, entry) in enumerate(zip(block, entries), start=start):
+                chord_id = f"chord_{i}"
+                result = {"chord": chord}
+                result.update(entry)
+                result["chord_id"] = chord_id
+                results[chord_id] = result
+
+        if missing:
+            self.evict()
+        return results
+
+    def size(self):
+        """Tamaño total en bytes de los bloques guardados."""
+        return sum(entry[1] for entry in self._blocks())
+
+    def _blocks(self):
+        blocks = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".pkl"):
+                    stat = os.stat(os.path.join(root, name))
+                    blocks.append((os.path.join(root, name), stat.st_size, stat.st_mtime))
+        return blocks
+
+    def evict(self):
+        """Borra los bloques usados hace más tiempo hasta que la caché quepa en max_bytes."""
+        blocks = sorted(self._blocks(), key=lambda entry: entry[2])
+        total = sum(entry[1] for entry in blocks)
+        for path, size, _ in blocks:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        for path, _, _ in self._blocks():
+            os.remove(path)
@@ -0,0 +1,137 @@
+"""
+Registro de características con forma y tipo declarados.
+
+process() devuelve un diccionario chord_id -> {"chord", "feature_vector", "chord_id"} con listas
+de Python, y cada consumidor (perform_mds2, las gráficas) tiene que reconstruir un arreglo de
+NumPy a partir de él. Aquí cada extractor se registra con su nombre, dimensión, dtype y versión,
+y compute_features() llena directamente una matriz (N, d) preasignada por característica. Todas
+las matrices comparten el mismo índice de acordes: la fila i corresponde a data['chords'][i]
+(el chord_{i} de process()).
+
+Ejemplo:
+    features = compute_features(data, ["interval_vector", "interval_histogram"])
+    coords, D = perform_mds2(features["features"]["interval_vector"])
+"""
+import numpy as np
+
+from mathchords.functions import characteristics
+from mathchords.functions.batch_features import BATCH_FEATURES, table_slices
+from mathchords.io.columnar import ColumnarChords
+
+
+class FeatureSpec:
+    """
+    Declaración de una característica.
+
+    Parámetros:
+    - name: nombre con el que se pide en compute_features.
+    - func: extractor por acorde con firma func(chord, chord_id).
+    - dim: número de columnas, o None si el vector tiene longitud variable (por ejemplo las
+      clases de tono de cada acorde). En ese caso se reserva una columna por nota del acorde
+      más largo y compute_features devuelve además la longitud de cada fila.
+    - dtype: tipo de la matriz.
+    - version: versión de la característica; cambiarla indica que los resultados guardados ya no valen
+      (forma parte de la clave de feature_cache.FeatureCache).
+    """
+
+    def __init__(self, name, func, dim, dtype, version=1):
+        self.name = name
+        self.func = func
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.version = version
+
+    def __repr__(self):
+        return (f"FeatureSpec(name={self.name!r}, func={self.func.__name__}, dim={self.dim}, "
+                f"dtype={self.dtype}, version={self.version})")
+
+
+FEATURES = {}
+
+
+def register_feature(name, func, dim, dtype, version=1):
+    """Registra (o reemplaza) una característica y devuelve su FeatureSpec."""
+    spec = FeatureSpec(name, func, dim, dtype, version)
+    FEATURES[name] = spec
+    return spec
+
+
+register_feature("pitch_classes", characteristics.pitch_classes_extractor, None, np.int8)
+register_feature("transpose_to_zero", characteristics.transpose_to_zero, None, np.int8)
+register_feature("prime_form", characteristics.prime_form, None, np.int8)
+register_feature("normal_form", characteristics.normal_form, None, np.int8)
+register_feature("rahn_normal_order", characteristics.rahn_normal_order, None, np.int8)
+register_feature("interval_vector", characteristics.interval_vector, 6, np.int16)
+register_feature("only_six_intervals", characteristics.only_six_intervals, 6, np.int16)
+register_feature("binary_pitch_class_set", characteristics.binary_pitch_class_set, 12, np.int8)
+register_feature("polar_pitch_classes", characteristics.polar_pitch_classes, 24, np.float64)
+register_feature("interval_histogram", characteristics.interval_histogram, 11, np.int16)
+register_feature("interval_histogram_with_dissmeasure",
+                 characteristics.interval_histogram_with_dissmeasure, 13, np.float64)
+register_feature("interval_histogram_with_dissmeasure_weighted",
+                 characteristics.interval_histogram_with_dissmeasure_weighted, 13, np.float64)
+
+
+def _max_notes(chords):
+    """Número de notas del acorde más largo (ancho de las características de longitud variable)."""
+    if isinstance(chords, ColumnarChords):
+        chords = chords.table
+    if isinstance(chords, dict):
+        return int(chords["length"].max()) + 1 if len(chords["length"]) else 0
+    return max((len(chord["intervals"]) for chord in chords), default=-1) + 1
+
+
+def compute_features(data: dict, names: list, batch_size: int = 65536) -> dict:
+    """
+    Calcula varias características registradas como matrices densas.
+
+    Las características con versión por lotes (batch_features.BATCH_FEATURES) se calculan por
+    bloques de batch_size acordes; las demás acorde por acorde. En ambos casos los valores se
+    escriben directamente en la matriz preasignada, sin construir los diccionarios de results.
+
+    Parámetros:
+    - data: diccionario del experimento con la clave 'chords' (lista, tabla columnar o ColumnarChords).
+    - names: nombres de características registradas en FEATURES.
+    - batch_size: número de acordes por bloque.
+
+    Retorna:
+    - Diccionario con:
+      - 'chords': los acordes de data (la fila i de cada matriz es el acorde i).
+      - 'features': nombre -> matriz (N, d) con el dtype declarado.
+      - 'lengths': nombre -> longitud de cada fila (solo para características con dim=None, si no None).
+    """
+    unknown = [name for name in names if name not in FEATURES]
+    if unknown:
+        raise KeyError(f"Características no registradas: {unknown}")
+
+    chords = data["chords"]
+    n_chords = len(chords["length"]) if isinstance(chords, dict) else len(chords)
+    features, lengths = {}, {}
+    for name in names:
+        spec = FEATURES[name]
+        width = spec.dim if spec.dim is not None else _max_notes(chords)
+        out = np.zeros((n_chords, width), dtype=spec.dtype)
+        row_lengths = np.zeros(n_chords, dtype=np.int16) if spec.dim is None else None
+
+        batch_func = BATCH_FEATURES.get(spec.func)
+        if batch_func is not None:
+            start = 0
+            for table in table_slices(chords, batch_size):
+                block, block_lengths = batch_func(table)
+                stop = start + len(block)
+                columns = min(width, block.shape[1])
+                out[start:stop, :columns] = block[:, :columns]
+                if row_lengths is not None:
+                    row_lengths[start:stop] = block_lengths
+                start = stop
+        else:
+            iterator = chords if not isinstance(chords, dict) else ColumnarChords(chords)
+            for i, chord in enumerate(iterator):
+                vector = spec.func(chord, f"chord_{i}")["feature_vector"]
+                out[i, :len(vector)] = vector
+                if row_lengths is not None:
+                    row_lengths[i] = len(vector)
+
+        features[name] = out
+        lengths[name] = row_lengths
+    return {"chords": chords, "features": features, "lengths": lengths}
@@ -1,9 +1,12 @@
-from itertools import product
+from itertools import product, islice
 import pickle
 import os
+import sys
 from datetime import datetime
+import numpy as np
 
-def generate_chords(scale, octaves, sizes, intervals, max_population=-1):
+def generate_chords(scale, octaves, sizes, intervals, max_population=-1, columnar=False,
+                    memory_budget=None, budget_action="raise"):
     """
     Genera una lista de acordes musicales.
 
@@ -13,13 +16,124 @@ def generate_chords(scale, octaves, sizes, intervals, max_population=-1):
     - sizes: una lista de tamaños de acorde (número de notas en el acorde) cardinal.
     - intervals: una lista de intervalos musicales posibles para los acordes. Son saltos por entre la escala
     - max_population: número máximo de acordes a generar. Si es -1, no hay límite.
+    - columnar: si es True, genera los acordes de forma vectorizada y devuelve la tabla
+      columnar de generate_chords_table en lugar de la lista de diccionarios.
+    - memory_budget: memoria máxima en bytes durante la generación, según estimate_population
+      (con columnar=True se compara con el pico 'bytes_table_peak', que incluye los arreglos
+      temporales, y no solo con el tamaño final de la tabla). Si es None, no se comprueba.
+    - budget_action: qué hacer si la estimación supera memory_budget. Con "raise" se lanza
+      MemoryError antes de generar nada; con "stream" se devuelve un generador por bloques
+      que caben en el presupuesto: listas de diccionarios de iter_chords o, con columnar=True,
+      tablas columnares de iter_chords_table.
 
     Retorna:
-    - Una lista de diccionarios, donde cada diccionario representa un acorde.
+    - Por defecto, una lista de diccionarios, donde cada diccionario representa un acorde.
+    - Con columnar=True, la tabla columnar de generate_chords_table: un diccionario de
+      arreglos 'octave', 'bass', 'root', 'degree', 'length' (N,) e 'intervals' (N, max(sizes)).
+    - Si la estimación supera memory_budget y budget_action="stream", un generador de bloques
+      (listas de diccionarios de iter_chords o, con columnar=True, tablas de iter_chords_table)
+      en lugar de la población completa; con budget_action="raise" se lanza MemoryError.
     """
+    if memory_budget is not None:
+        estimate = estimate_population(scale, octaves, sizes, intervals, max_population)
+        needed = estimate["bytes_table_peak"] if columnar else estimate["bytes_dicts"]
+        if needed > memory_budget:
+            if budget_action == "stream" and columnar:
+                chunk_size = max(1, int(memory_budget // estimate["bytes_per_row_peak"]))
+                return iter_chords_table(scale, octaves, sizes, intervals, chunk_size, max_population)
+            if budget_action == "stream":
+                chunk_size = max(1, int(memory_budget // estimate["bytes_per_dict"]))
+                return iter_chords(scale, octaves, sizes, intervals, chunk_size, max_population)
+            if budget_action == "raise":
+                raise MemoryError(
+                    f"Se generarían {estimate['n_chords']} acordes (~{needed / 2**20:.1f} MiB), "
+                    f"más que el presupuesto de {memory_budget / 2**20:.1f} MiB. "
+                    "Use iter_chords, iter_chords_table o budget_action='stream'."
+                )
+            raise ValueError("budget_action debe ser 'raise' o 'stream'.")
 
-    chords = []  # Lista para almacenar los acordes generados
+    if columnar:
+        return generate_chords_table(scale, octaves, sizes, intervals, max_population)
 
+    chords = _iter_chords(scale, octaves, sizes, intervals)
+
+    # Si se alcanza la población máxima de acordes, se detiene toda la generación
+    # (no solo el bucle de combinaciones del tamaño actual)
+    if max_population > 0:
+        chords = islice(chords, max_population)
+
+    return list(chords)  # Devuelve la lista de acordes generados
+
+
+def estimate_population(scale, octaves, sizes, intervals, max_population=-1):
+    """
+    Calcula el tamaño exacto de la población y la memoria que ocuparía, sin generar acordes.
+
+    El número de acordes es len(octaves) * len(scale["intervals"]) * sum(len(intervals)**size),
+    y cada acorde de tamaño size produce size + 1 filas en Simula_inversiones. La memoria de
+    los diccionarios se estima con sys.getsizeof sobre un acorde de ejemplo de cada tamaño,
+    incluyendo el puntero de la lista que los contiene (las inversiones son copias superficiales
+    que comparten la lista de intervalos con su acorde original).
+
+    Parámetros:
+    - scale, octaves, sizes, intervals, max_population: igual que en generate_chords.
+
+    Retorna:
+    - Un diccionario con:
+        - 'n_chords': número de acordes que devolvería generate_chords.
+        - 'n_inversions': número de filas que devolvería Simula_inversiones.
+        - 'bytes_dicts': memoria de la lista de diccionarios de generate_chords.
+        - 'bytes_inversions_dicts': memoria adicional de Simula_inversiones sobre esos diccionarios.
+        - 'bytes_table': memoria de la tabla columnar de generate_chords_table.
+        - 'bytes_table_peak': memoria máxima durante generate_chords_table (la tabla, la copia
+          de la primera octava y los arreglos temporales de un bloque).
+        - 'bytes_per_row_peak': cota de la memoria por fila de un bloque de iter_chords_table,
+          contando los temporales como si el bloque entero se calculara a la vez.
+        - 'bytes_inversions_table': memoria de la vista de inversions_table.
+        - 'bytes_per_dict': memoria media por acorde en la lista de diccionarios.
+    """
+    per_octave = len(scale["intervals"])
+    max_size = max(sizes) if len(sizes) else 0
+    dict_size = sys.getsizeof({"octave": 0, "bass": 0, "root": 0, "degree": 0, "intervals": []})
+
+    # Acordes por octava, en el orden de generación: (tamaño, cantidad) para cada grado
+    counts = [(size, len(intervals) ** size) for size in sizes]
+    remaining = max_population if max_population > 0 else None
+
+    n_chords = n_inversions = bytes_dicts = bytes_inversions = 0
+    for _ in range(len(octaves) * per_octave):
+        for size, count in counts:
+            if remaining is not None:
+                count = min(count, remaining)
+                remaining -= count
+            n_chords += count
+            n_inversions += count * (size + 1)
+            bytes_dicts += count * (dict_size + sys.getsizeof(list(range(size))) + 8)
+            bytes_inversions += count * (size + 1) * (dict_size + 8)
+
+    bytes_row = 5 + max_size
+    per_octave_chords = per_octave * sum(len(intervals) ** size for size in sizes)
+    # generate_chords_table calcula la primera octava aparte y la copia en las demás
+    first_octave = per_octave_chords * bytes_row if n_chords > per_octave_chords else 0
+    block = min(_BLOCK_ROWS, max((len(intervals) ** size for size in sizes), default=0))
+
+    return {
+        "n_chords": n_chords,
+        "n_inversions": n_inversions,
+        "bytes_dicts": bytes_dicts,
+        "bytes_inversions_dicts": bytes_inversions,
+        "bytes_table": n_chords * bytes_row,
+        "bytes_table_peak": n_chords * bytes_row + first_octave + block * max_size * _BLOCK_BYTES_PER_NOTE,
+        "bytes_per_row_peak": bytes_row + max_size * _BLOCK_BYTES_PER_NOTE,
+        "bytes_inversions_table": n_inversions * (np.dtype(np.intp).itemsize + 1),
+        "bytes_per_dict": bytes_dicts / n_chords if n_chords else 0,
+    }
+
+
+def _iter_chords(scale, octaves, sizes, intervals):
+    """
+    Genera perezosamente los acordes de generate_chords, uno a uno y en el mismo orden.
+    """
     # Itera sobre cada octava proporcionada
     for octave in octaves:
         # Itera sobre cada nota de la escala
@@ -38,14 +152,373 @@ def generate_chords(scale, octaves, sizes, intervals, max_population=-1):
                         chord["intervals"][i] = (scale["intervals"][val] - scale["intervals"][pos]) % 12
                         pos = val
 
-                    # Añade el acorde a la lista de acordes
-                    chords.append(chord)
+                    yield chord
+
+
+def iter_chords(scale, octaves, sizes, intervals, chunk_size=10000, max_population=-1):
+    """
+    Genera la población de acordes por bloques, sin mantenerla completa en memoria.
+
+    Los acordes son los mismos y en el mismo orden que los de generate_chords, pero se
+    entregan en listas de chunk_size acordes (el último bloque puede ser más corto).
+    Cada bloque puede pasarse directamente a Simula_inversiones o a los extractores de
+    características, de modo que la memoria usada depende de chunk_size y no del tamaño
+    total de la población.
+
+    Parámetros:
+    - scale, octaves, sizes, intervals: igual que en generate_chords.
+    - chunk_size: número de acordes por bloque.
+    - max_population: número máximo de acordes a generar en total. Si es -1, no hay límite.
+
+    Retorna:
+    - Un generador de listas de diccionarios, cada una con a lo sumo chunk_size acordes.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size debe ser un entero positivo.")
+
+    chords = _iter_chords(scale, octaves, sizes, intervals)
+    if max_population > 0:
+        chords = islice(chords, max_population)
+
+    while True:
+        chunk = list(islice(chords, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Número máximo de combinaciones de intervalos que se calculan a la vez al llenar una tabla
+_BLOCK_ROWS = 1 << 16
+# Bytes temporales por combinación y por nota del acorde al calcular un bloque (medido con
+# tracemalloc: unos 28 bytes entre índices int64 de unravel_index, sumas acumuladas y posiciones)
+_BLOCK_BYTES_PER_NOTE = 32
+
+
+def _interval_products(intervals, size, first=0, last=None):
+    """
+    Equivalente vectorizado de product(intervals, repeat=size), filas first:last.
+
+    Retorna una matriz (last - first, size) con las combinaciones en el mismo orden
+    lexicográfico que itertools.product.
+    """
+    intervals = np.asarray(intervals, dtype=np.int32)
+    total = len(intervals) ** size
+    last = total if last is None else min(last, total)
+    if size == 0:
+        return np.zeros((max(0, last - first), 0), dtype=np.int32)
+    index = np.unravel_index(np.arange(first, last), (len(intervals),) * size)
+    return np.stack([intervals[axis] for axis in index], axis=1)
+
+
+def _degree_intervals(scale_intervals, start, steps):
+    """
+    Traduce saltos dentro de la escala a intervalos en semitonos para un grado inicial.
+
+    Parámetros:
+    - scale_intervals: arreglo con los intervalos de la escala.
+    - start: índice del grado inicial en la escala.
+    - steps: matriz (C, size) de saltos entre grados de la escala.
+
+    Retorna:
+    - Matriz (C, size) con los intervalos en semitonos, igual que el bucle de generate_chords.
+    """
+    n_notes = len(scale_intervals)
+    if steps.shape[1] == 0:
+        return steps
+    # Posición en la escala después de cada salto
+    pos = (start + np.cumsum(steps, axis=1)) % n_notes
+    prev = np.empty_like(pos)
+    prev[:, 0] = start
+    prev[:, 1:] = pos[:, :-1]
+    return (scale_intervals[pos] - scale_intervals[prev]) % 12
+
+
+def _segments(scale, octaves, sizes, intervals):
+    """
+    Bloques contiguos de la población en el orden de generate_chords.
+
+    Retorna:
+    - Un generador de tuplas (octava, índice del grado, tamaño, número de acordes).
+    """
+    for octave in octaves:
+        for note in range(len(scale["intervals"])):
+            for size in sizes:
+                yield octave, note, size, len(intervals) ** size
+
+
+def _fill_table(table, row, scale, octave, note, size, intervals, first, last):
+    """Escribe en table, a partir de la fila row, los acordes first:last de un bloque de _segments."""
+    scale_intervals = np.asarray(scale["intervals"], dtype=np.int32)
+    stop = row + last - first
+    table["octave"][row:stop] = octave
+    table["bass"][row:stop] = scale["root"] + scale["intervals"][note]
+    table["root"][row:stop] = scale["root"] + scale["intervals"][note]
+    table["degree"][row:stop] = note + 1
+    table["length"][row:stop] = size
+    for begin in range(first, last, _BLOCK_ROWS):
+        end = min(last, begin + _BLOCK_ROWS)
+        steps = _interval_products(intervals, size, begin, end)
+        offset = row + begin - first
+        table["intervals"][offset:offset + end - begin, :size] = _degree_intervals(scale_intervals, note, steps)
+
 
-                    # Si se alcanza la población máxima de acordes, termina el bucle
-                    if max_population > 0 and len(chords) == max_population:
-                        break
+def _empty_table(n_chords, max_size):
+    table = {key: np.zeros(n_chords, dtype=np.int8) for key in ("octave", "bass", "root", "degree", "length")}
+    table["intervals"] = np.zeros((n_chords, max_size), dtype=np.int8)
+    return table
+
+
+def _table_rows(scale, octaves, sizes, intervals, start, stop):
+    """Tabla columnar con las filas start:stop de la población completa."""
+    table = _empty_table(stop - start, max(sizes) if len(sizes) else 0)
+    row = 0
+    for octave, note, size, count in _segments(scale, octaves, sizes, intervals):
+        if row >= stop:
+            break
+        first, last = max(start, row) - row, min(stop, row + count) - row
+        if first < last:
+            _fill_table(table, row + first - start, scale, octave, note, size, intervals, first, last)
+        row += count
+    return table
+
+
+def generate_chords_table(scale, octaves, sizes, intervals, max_population=-1):
+    """
+    Genera los acordes de forma vectorizada y los devuelve como una tabla columnar.
+
+    Produce exactamente los mismos acordes y en el mismo orden que generate_chords, pero
+    sin crear un diccionario por acorde: las combinaciones de product(intervals, repeat=size)
+    y las búsquedas en la escala se calculan con operaciones de NumPy sobre arreglos.
+
+    La tabla se reserva una sola vez y se llena por bloques de a lo sumo _BLOCK_ROWS
+    combinaciones, de modo que la memoria temporal no depende del tamaño de la población
+    (ver estimate_population, 'bytes_table_peak'). Las octavas solo cambian la columna
+    'octave', así que las filas de la primera octava se copian en las demás.
+
+    Parámetros:
+    - scale, octaves, sizes, intervals: igual que en generate_chords.
+    - max_population: número máximo de acordes a generar. Si es -1, no hay límite.
+
+    Retorna:
+    - Un diccionario de arreglos con N filas:
+        - 'octave', 'bass', 'root', 'degree': arreglos int8 de tamaño N.
+        - 'intervals': matriz int8 (N, max(sizes)) rellenada con ceros a la derecha.
+        - 'length': arreglo int8 con el número de intervalos válidos de cada fila.
+    """
+    per_octave = len(scale["intervals"]) * sum(len(intervals) ** size for size in sizes)
+    n_chords = per_octave * len(octaves)
+    if max_population > 0:
+        n_chords = min(n_chords, max_population)
+
+    if not len(octaves) or n_chords <= per_octave:
+        return _table_rows(scale, octaves, sizes, intervals, 0, n_chords)
+
+    table = _empty_table(n_chords, max(sizes))
+    first_octave = _table_rows(scale, octaves[:1], sizes, intervals, 0, per_octave)
+    for i, octave in enumerate(octaves):
+        start = i * per_octave
+        stop = min(n_chords, start + per_octave)
+        if start >= stop:
+            break
+        for key, column in first_octave.items():
+            table[key][start:stop] = column[:stop - start]
+        table["octave"][start:stop] = octave
+    return table
+
+
+def iter_chords_table(scale, octaves, sizes, intervals, chunk_size=100000, max_population=-1):
+    """
+    Versión por bloques de generate_chords_table.
+
+    Parámetros:
+    - scale, octaves, sizes, intervals: igual que en generate_chords.
+    - chunk_size: número de acordes por bloque.
+    - max_population: número máximo de acordes a generar en total. Si es -1, no hay límite.
+
+    Retorna:
+    - Un generador de tablas columnares de a lo sumo chunk_size filas que, concatenadas,
+      son la tabla de generate_chords_table.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size debe ser un entero positivo.")
+    n_chords = len(octaves) * len(scale["intervals"]) * sum(len(intervals) ** size for size in sizes)
+    if max_population > 0:
+        n_chords = min(n_chords, max_population)
+    for start in range(0, n_chords, chunk_size):
+        yield _table_rows(scale, octaves, sizes, intervals, start, min(n_chords, start + chunk_size))
+
+
+def chords_from_table(table):
+    """
+    Adaptador que recorre una tabla columnar y produce la vista clásica de diccionarios.
+
+    Cada acorde se entrega con las mismas claves que generate_chords ('octave', 'bass',
+    'root', 'degree', 'intervals') y valores de Python, por lo que el resultado se puede
+    pasar directamente a process() o al código de visualización.
+
+    Parámetros:
+    - table: tabla columnar devuelta por generate_chords_table.
+
+    Retorna:
+    - Un generador de diccionarios, uno por acorde.
+    """
+    columns = zip(table["octave"].tolist(), table["bass"].tolist(), table["root"].tolist(),
+                  table["degree"].tolist(), table["intervals"].tolist(), table["length"].tolist())
+    for octave, bass, root, degree, row, length in columns:
+        yield {"octave": octave, "bass": bass, "root": root, "degree": degree, "intervals": row[:length]}
+
+def _rotation_classes(scale):
+    """
+    Agrupa los grados de la escala que generan los mismos patrones de intervalos.
+
+    Los intervalos de un acorde solo dependen de la escala vista desde su grado inicial (la
+    escala rotada), así que los grados con la misma rotación producen exactamente los mismos
+    acordes salvo la raíz. En la escala cromática los 12 grados forman una sola clase.
+
+    Retorna:
+    - np.array con la clase de cada grado (las clases se numeran por su primer grado).
+    - list con el primer grado de cada clase.
+    """
+    scale_intervals = scale["intervals"]
+    n_notes = len(scale_intervals)
+    classes = {}
+    degree_class = []
+    for note in range(n_notes):
+        rotation = tuple((scale_intervals[(note + k) % n_notes] - scale_intervals[note]) % 12 for k in range(n_notes))
+        degree_class.append(classes.setdefault(rotation, len(classes)))
+    degree_class = np.array(degree_class, dtype=np.intp)
+    return degree_class, [int(np.flatnonzero(degree_class == k)[0]) for k in range(len(classes))]
+
+
+def generate_chord_orbits(scale, octaves, sizes, intervals):
+    """
+    Genera un representante por órbita de transposición en lugar de la población completa.
+
+    Dos acordes de la misma octava y con el mismo patrón de intervalos son transposiciones
+    uno del otro (solo cambia la raíz). Solo se generan los acordes de un grado por cada
+    rotación distinta de la escala (ver _rotation_classes; en la escala cromática, solo los de
+    raíz 0) y de la primera octava, se eliminan los patrones repetidos y se recuerda qué órbita
+    ocupa cada posición de un grado: ni la generación ni el resultado crecen con el número de
+    grados ni de octavas. El primer acorde de cada órbita, en el orden de generate_chords, es
+    su representante.
+
+    Parámetros:
+    - scale, octaves, sizes, intervals: igual que en generate_chords.
+
+    Retorna:
+    - Un diccionario con:
+        - 'chords': lista de diccionarios con los representantes de cada órbita (las de la
+          primera octava, luego las de la segunda...).
+        - 'multiplicity': arreglo con el número de acordes de la población que representa cada uno.
+        - 'n_chords': tamaño de la población completa.
+        - 'degree_class': clase de rotación de cada grado de la escala.
+        - 'class_orbits': matriz (clases, acordes por grado) con la órbita, dentro de una octava,
+          de cada acorde de un grado de esa clase.
+        - 'scale', 'octaves': los usados, necesarios para reconstruir la población (ver
+          orbit_index, orbit_chord y expand_orbits).
+    """
+    octaves = list(octaves)
+    per_degree = sum(len(intervals) ** size for size in sizes)
+    degree_class, class_notes = _rotation_classes(scale)
+
+    # Patrones de un grado de cada clase, en el orden de generate_chords
+    table = _empty_table(len(class_notes) * per_degree, max(sizes) if len(sizes) else 0)
+    for k, note in enumerate(class_notes):
+        row = k * per_degree
+        for size in sizes:
+            count = len(intervals) ** size
+            _fill_table(table, row, scale, 0, note, size, intervals, 0, count)
+            row += count
+
+    # Clave de la órbita dentro de una octava: tamaño y patrón de intervalos (sin la raíz)
+    keys = np.column_stack([table["length"], table["intervals"]])
+    _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    # Ordena las órbitas por su primera aparición para conservar el orden de generate_chords
+    # (las clases están ordenadas por su primer grado, así que el orden de las filas es ese)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    class_orbits = rank[inverse.reshape(-1)].reshape(len(class_notes), per_degree)
+
+    notes_per_class = np.bincount(degree_class, minlength=len(class_notes))
+    multiplicity = np.bincount(class_orbits.ravel(), weights=np.repeat(notes_per_class, per_degree),
+                               minlength=len(order)).astype(np.int64)
+
+    representatives = {key: column[first[order]] for key, column in table.items()}
+    chords = []
+    for octave in octaves:
+        representatives["octave"][:] = octave
+        chords.extend(chords_from_table(representatives))
+
+    return {
+        "chords": chords,
+        "multiplicity": np.tile(multiplicity, len(octaves)),
+        "n_chords": len(octaves) * len(degree_class) * per_degree,
+        "degree_class": degree_class,
+        "class_orbits": class_orbits,
+        "scale": scale,
+        "octaves": octaves,
+    }
+
+
+def orbit_index(orbits, rows=None):
+    """
+    Órbita (índice en orbits['chords']) de acordes de la población completa.
+
+    Parámetros:
+    - orbits: diccionario devuelto por generate_chord_orbits.
+    - rows: posición o arreglo de posiciones en la población; None para toda la población.
+
+    Retorna:
+    - El índice de la órbita de cada posición (un entero si rows es un entero).
+    """
+    if rows is None:
+        rows = np.arange(orbits["n_chords"])
+    class_orbits = orbits["class_orbits"]
+    per_degree = class_orbits.shape[1]
+    per_octave = len(orbits["degree_class"]) * per_degree
+    orbits_per_octave = len(orbits["chords"]) // max(1, len(orbits["octaves"]))
+    octave, within = np.divmod(rows, per_octave)
+    note, offset = np.divmod(within, per_degree)
+    index = octave * orbits_per_octave + class_orbits[orbits["degree_class"][note], offset]
+    return int(index) if np.ndim(index) == 0 else index
+
+
+def orbit_chord(orbits, row):
+    """Acorde de la posición row de la población completa, como lo generaría generate_chords."""
+    scale = orbits["scale"]
+    representative = orbits["chords"][orbit_index(orbits, row)]
+    per_degree = orbits["class_orbits"].shape[1]
+    degree = int(row) % (len(orbits["degree_class"]) * per_degree) // per_degree + 1
+    note = scale["root"] + scale["intervals"][degree - 1]
+    return {"octave": representative["octave"], "bass": note, "root": note, "degree": degree,
+            "intervals": list(representative["intervals"])}
+
+
+def expand_orbits(orbits):
+    """
+    Reconstruye bajo demanda la población completa a partir de generate_chord_orbits.
+
+    Parámetros:
+    - orbits: diccionario devuelto por generate_chord_orbits.
+
+    Retorna:
+    - Un generador de diccionarios con los mismos acordes, y en el mismo orden, que
+      generate_chords con los mismos parámetros.
+    """
+    scale = orbits["scale"]
+    representatives = orbits["chords"]
+    orbits_per_octave = len(representatives) // max(1, len(orbits["octaves"]))
+    class_orbits = orbits["class_orbits"].tolist()
+    for i in range(len(orbits["octaves"])):
+        first = i * orbits_per_octave
+        for degree, k in enumerate(orbits["degree_class"].tolist(), start=1):
+            note = scale["root"] + scale["intervals"][degree - 1]
+            for orbit in class_orbits[k]:
+                representative = representatives[first + orbit]
+                yield {"octave": representative["octave"], "bass": note, "root": note, "degree": degree,
+                       "intervals": list(representative["intervals"])}
 
-    return chords  # Devuelve la lista de acordes generados
 
 def Simula_inversiones(chords):
     """
@@ -60,12 +533,18 @@ def Simula_inversiones(chords):
               Cada acorde debe tener una clave "intervals" que es una lista de 
               intervalos en semitonos desde la nota más baja, y una clave "bass" 
               que indica la nota más baja del acorde en semitonos desde C0.
+              También se acepta una tabla columnar de generate_chords_table, en cuyo
+              caso se usa la versión vectorizada inversions_table.
     
     Retorna:
     - Una lista de diccionarios, donde cada diccionario representa un acorde 
       original o una de sus inversiones. La clave "bass" de cada acorde se actualiza 
       para reflejar la nota más baja después de la inversión.
+      Si chords es una tabla columnar, devuelve la vista de índices de inversions_table.
     """
+    if isinstance(chords, dict):
+        return inversions_table(chords)
+
     output = []  # Lista para almacenar los acordes originales e invertidos
     
     for chord in chords:
@@ -85,6 +564,63 @@ def Simula_inversiones(chords):
     return output  # Devuelve la lista de acordes originales e invertidos
 
 
+def inversions_table(table):
+    """
+    Versión vectorizada de Simula_inversiones sobre una tabla columnar de acordes.
+
+    En lugar de copiar cada acorde por inversión, devuelve una vista basada en índices: cada
+    fila apunta a su acorde padre en la tabla (que conserva los intervalos) y guarda solo el
+    nuevo bajo. Todos los bajos se obtienen con una única suma acumulada sobre la matriz de
+    intervalos. El orden de las filas es exactamente el de Simula_inversiones (el acorde
+    original seguido de sus inversiones), así que los identificadores chord_{i} no cambian.
+
+    Parámetros:
+    - table: tabla columnar devuelta por generate_chords_table.
+
+    Retorna:
+    - Un diccionario con:
+        - 'parent': arreglo con el índice en table del acorde del que proviene cada fila.
+        - 'bass': arreglo int8 con el bajo de cada fila.
+    """
+    lengths = table["length"].astype(np.intp)
+    counts = lengths + 1  # El acorde original más una inversión por intervalo
+    n_chords = len(lengths)
+
+    parent = np.repeat(np.arange(n_chords), counts)
+    # Número de inversión de cada fila dentro de su acorde padre (0 = acorde original)
+    starts = np.cumsum(counts) - counts
+    step = np.arange(len(parent)) - np.repeat(starts, counts)
+
+    # Desplazamiento acumulado del bajo: columna de ceros seguida de la suma acumulada de intervalos
+    offsets = np.zeros((n_chords, table["intervals"].shape[1] + 1), dtype=np.int16)
+    np.cumsum(table["intervals"], axis=1, dtype=np.int16, out=offsets[:, 1:])
+
+    bass = table["bass"][parent].astype(np.int16)
+    inverted = step > 0
+    # Igual que Simula_inversiones, solo las inversiones se reducen al rango 0-11
+    bass[inverted] = (bass[inverted] + offsets[parent[inverted], step[inverted]]) % 12
+
+    return {"parent": parent, "bass": bass.astype(np.int8)}
+
+
+def chords_from_inversions(table, inversions):
+    """
+    Adaptador que produce la vista de diccionarios de Simula_inversiones a partir de inversions_table.
+
+    Parámetros:
+    - table: tabla columnar de los acordes originales.
+    - inversions: diccionario devuelto por inversions_table(table).
+
+    Retorna:
+    - Un generador de diccionarios, uno por fila, iguales a los de Simula_inversiones.
+    """
+    parents = list(chords_from_table(table))
+    for parent, bass in zip(inversions["parent"].tolist(), inversions["bass"].tolist()):
+        chord = parents[parent].copy()
+        chord["bass"] = bass
+        yield chord
+
+
 
 '''
 def create_experiment_data(scale, octaves, sizes, intervals, chords, 
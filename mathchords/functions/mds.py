@@ -0,0 +1,213 @@
+"""
+Motores de MDS alternativos a SMACOF.
+
+perform_mds2 usa por defecto el MDS métrico de sklearn (SMACOF), que cuesta O(N² · iteraciones).
+Aquí se definen:
+
+- classical_mds: MDS clásico (Torgerson) con una descomposición espectral truncada de la matriz
+  doblemente centrada. Necesita la matriz N x N, pero no itera; su resultado sirve además como
+  punto de partida (warm start) de SMACOF.
+- landmark_mds: MDS con puntos de referencia (de Silva y Tenenbaum). Se eligen L puntos de
+  referencia, se les aplica MDS clásico y el resto de puntos se triangulan a partir de sus
+  distancias a los puntos de referencia. Nunca construye la matriz N x N: la memoria es O(N · L).
+- embed_points: coloca acordes nuevos en una configuración ya calculada (por cualquiera de los
+  métodos) sin volver a ajustarla: las coordenadas existentes no cambian y cada punto nuevo solo
+  usa sus distancias a los puntos existentes, con un coste O(nuevos · N).
+"""
+import numpy as np
+import scipy.linalg
+from scipy.sparse.linalg import eigsh
+from scipy.spatial.distance import cdist, pdist
+
+from mathchords.functions.distances import DEFAULT_MAX_BYTES, MAHALANOBIS_REG, mahalanobis_vi, prepare_features
+
+DEFAULT_LANDMARKS = 1000
+EMBED_METHODS = ('gower', 'stress')
+# Por debajo de este tamaño la descomposición densa es más rápida y estable que eigsh
+_DENSE_EIGH_MAX = 500
+
+
+def _top_eigenpairs(B, n_components):
+    """Los n_components mayores autovalores (en orden descendente) y autovectores de B simétrica."""
+    n = len(B)
+    k = min(n_components, n)
+    if n <= _DENSE_EIGH_MAX or k >= n - 1:
+        eigenvalues, eigenvectors = scipy.linalg.eigh(B, subset_by_index=[n - k, n - 1])
+    else:
+        eigenvalues, eigenvectors = eigsh(B, k=k, which='LA')
+    order = np.argsort(eigenvalues)[::-1]
+    eigenvalues, eigenvectors = eigenvalues[order], eigenvectors[:, order]
+    # Signo determinista: la componente de mayor valor absoluto de cada autovector es positiva
+    signs = np.sign(eigenvectors[np.abs(eigenvectors).argmax(axis=0), np.arange(k)])
+    signs[signs == 0] = 1
+    return eigenvalues, eigenvectors * signs
+
+
+def _double_centered(squared):
+    """-1/2 · J · D² · J, con J la matriz de centrado."""
+    row_means = squared.mean(axis=1)
+    B = squared - row_means[:, None] - row_means[None, :] + row_means.mean()
+    B *= -0.5
+    return B
+
+
+def classical_mds(dissimilarity_matrix, n_components=2):
+    """
+    MDS clásico (Torgerson) sobre una matriz de disimilitud.
+
+    Parámetros:
+    - dissimilarity_matrix: matriz (N, N) simétrica (puede ser un np.memmap).
+    - n_components: dimensiones del resultado.
+
+    Retorna:
+    - np.array (N, n_components): coordenadas. Las dimensiones con autovalor no positivo quedan en cero.
+    """
+    squared = np.square(np.asarray(dissimilarity_matrix, dtype=np.float64))
+    eigenvalues, eigenvectors = _top_eigenpairs(_double_centered(squared), n_components)
+    coords = np.zeros((len(squared), n_components))
+    coords[:, :len(eigenvalues)] = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+    return coords
+
+
+def landmark_mds(data, metric='euclidean', n_components=2, n_landmarks=DEFAULT_LANDMARKS, random_state=None,
+                 max_bytes=DEFAULT_MAX_BYTES, mahalanobis_reg=MAHALANOBIS_REG):
+    """
+    MDS con puntos de referencia sobre una matriz de características.
+
+    Parámetros:
+    - data: matriz (N, d) de vectores de características.
+    - metric: una de distances.METRICS.
+    - n_components: dimensiones del resultado.
+    - n_landmarks: número de puntos de referencia (elegidos al azar).
+    - random_state: semilla para elegir los puntos de referencia.
+    - max_bytes: memoria máxima de cada bloque de distancias a los puntos de referencia.
+    - mahalanobis_reg: regularización de la covarianza para 'mahalanobis'.
+
+    Retorna:
+    - np.array (N, n_components): coordenadas.
+    - np.array: índices de los puntos de referencia.
+    """
+    features, kernel_metric = prepare_features(data, metric, reg=mahalanobis_reg)
+    n = len(features)
+    rng = np.random.default_rng(random_state)
+    landmarks = np.sort(rng.choice(n, size=min(n_landmarks, n), replace=False))
+
+    landmark_squared = np.square(cdist(features[landmarks], features[landmarks], metric=kernel_metric))
+    eigenvalues, eigenvectors = _top_eigenpairs(_double_centered(landmark_squared), n_components)
+    positive = eigenvalues > 0
+    # Pseudo-inversa de las coordenadas de los puntos de referencia (una columna por dimensión)
+    pseudo_inverse = np.zeros((len(landmarks), n_components))
+    pseudo_inverse[:, :len(eigenvalues)][:, positive] = eigenvectors[:, positive] / np.sqrt(eigenvalues[positive])
+    mean_squared = landmark_squared.mean(axis=0)
+
+    coords = np.empty((n, n_components))
+    rows = max(1, max_bytes // (8 * len(landmarks)))
+    for start in range(0, n, rows):
+        block = np.square(cdist(features[start:start + rows], features[landmarks], metric=kernel_metric))
+        coords[start:start + rows] = -0.5 * (block - mean_squared) @ pseudo_inverse
+    return coords, landmarks
+
+
+def _gower(coords, features, new_features, metric, references):
+    """Interpolación de Gower de los puntos nuevos respecto a los puntos de referencia."""
+    reference_coords = coords[references]
+    centroid = reference_coords.mean(axis=0)
+    centered = reference_coords - centroid
+    mean_squared = np.square(cdist(features[references], features[references], metric=metric)).mean(axis=0)
+    # y = c - 1/2 · (XᵀX)⁺ · Xᵀ · (d² - media de las columnas de D²), con X centrada en c
+    projection = np.linalg.pinv(centered.T @ centered) @ centered.T
+    squared = np.square(cdist(new_features, features[references], metric=metric))
+    return centroid - 0.5 * (squared - mean_squared) @ projection.T
+
+
+def _stress_refine(coords, distances, start, n_iter, tol):
+    """
+    Minimiza el stress de cada punto nuevo por separado con la transformación de Guttman,
+    manteniendo fijos los puntos existentes: y ← x̄ + (Σ_j r_j · y - Σ_j r_j · x_j) / N, con
+    r_j = d_j / ‖y - x_j‖.
+    """
+    n = len(coords)
+    mean = coords.mean(axis=0)
+    points = start.copy()
+    for _ in range(n_iter):
+        embedded = cdist(points, coords)
+        ratio = np.divide(distances, embedded, out=np.zeros_like(distances), where=embedded > 0)
+        updated = mean + (ratio.sum(axis=1)[:, None] * points - ratio @ coords) / n
+        change = np.abs(updated - points).max(initial=0)
+        points = updated
+        if change < tol:
+            break
+    return points
+
+
+def embed_points(coords, data, new_data, metric='euclidean', method='gower', references=DEFAULT_LANDMARKS,
+                 random_state=None, n_iter=300, tol=1e-6, max_bytes=DEFAULT_MAX_BYTES,
+                 mahalanobis_reg=MAHALANOBIS_REG):
+    """
+    Coloca puntos nuevos en una configuración de MDS ya calculada, sin modificarla.
+
+    Parámetros:
+    - coords: coordenadas (N, n_components) de los puntos existentes (por ejemplo de perform_mds2).
+    - data: matriz (N, d) de características con la que se calcularon coords.
+    - new_data: matriz (M, d) de características de los acordes nuevos.
+    - metric: la misma métrica usada para calcular coords (una de distances.METRICS). Para
+      'mahalanobis' la covarianza se estima solo con data, como al calcular coords.
+    - method: 'gower' (interpolación de Gower a partir de las distancias a los puntos de
+      referencia) o 'stress' (la interpolación de Gower seguida de la minimización del stress
+      de cada punto nuevo frente a todos los puntos existentes).
+    - references: número de puntos de referencia (elegidos al azar) para la interpolación de
+      Gower, o sus índices (por ejemplo los que devuelve landmark_mds). None usa todos los
+      puntos, lo que cuesta O(N²) la primera vez.
+    - random_state: semilla para elegir los puntos de referencia.
+    - n_iter, tol: iteraciones máximas y tolerancia (cambio máximo de coordenadas) de 'stress'.
+    - max_bytes: memoria máxima aproximada de cada bloque de distancias de 'stress'.
+    - mahalanobis_reg: regularización de la covarianza para 'mahalanobis'.
+
+    Retorna:
+    - np.array (M, n_components): coordenadas de los puntos nuevos.
+    """
+    if method not in EMBED_METHODS:
+        raise ValueError(f"Método de inserción no soportado: {method}")
+    coords = np.asarray(coords, dtype=np.float64)
+    data = np.asarray(data)
+    new_data = np.asarray(new_data)
+    if len(coords) != len(data):
+        raise ValueError("coords y data deben tener el mismo número de filas.")
+
+    VI = mahalanobis_vi(data, mahalanobis_reg) if metric == 'mahalanobis' else None
+    features, kernel_metric = prepare_features(data, metric, VI)
+    new_features, _ = prepare_features(new_data, metric, VI)
+
+    n = len(features)
+    if references is None:
+        references = np.arange(n)
+    elif np.ndim(references) == 0:
+        rng = np.random.default_rng(random_state)
+        references = np.sort(rng.choice(n, size=min(int(references), n), replace=False))
+    else:
+        references = np.asarray(references)
+
+    new_coords = _gower(coords, features, new_features, kernel_metric, references)
+    if method == 'gower':
+        return new_coords
+
+    # Bloques de puntos nuevos cuyas distancias a los N puntos existentes caben en max_bytes
+    rows = max(1, max_bytes // (24 * max(1, n)))
+    for start in range(0, len(new_features), rows):
+        distances = cdist(new_features[start:start + rows], features, metric=kernel_metric)
+        new_coords[start:start + rows] = _stress_refine(coords, distances, new_coords[start:start + rows],
+                                                        n_iter, tol)
+    return new_coords
+
+
+def stress(dissimilarity_matrix, coords):
+    """
+    Stress-1 de Kruskal de una configuración: sqrt(Σ (d_ij - ‖x_i - x_j‖)² / Σ d_ij²).
+
+    Acepta la matriz completa (N, N) o su forma condensada.
+    """
+    D = np.asarray(dissimilarity_matrix, dtype=np.float64)
+    if D.ndim == 2:
+        D = D[np.triu_indices(len(D), 1)]
+    embedded = pdist(np.asarray(coords, dtype=np.float64))
+    return float(np.sqrt(np.sum((D - embedded) ** 2) / np.sum(D ** 2)))
@@ -0,0 +1,302 @@
+"""
+Índice de vecinos más cercanos sobre vectores de características.
+
+Para saber qué acordes se parecen más a uno dado había que calcular la matriz de disimilitud
+completa con perform_mds2 y recorrer una fila. NeighborIndex construye una sola vez un árbol
+sobre la matriz de características (la de process(), ColumnarResults o compute_features) y
+responde consultas de k vecinos y de radio en tiempo sublineal:
+
+- euclidean, cityblock y chebyshev (métricas de Minkowski) usan un KD-tree (scipy cKDTree).
+- mahalanobis blanquea los vectores con la covarianza de los datos indexados (como
+  distances.pairwise_blocked) y usa el KD-tree euclídeo.
+- cosine normaliza los vectores y usa el KD-tree euclídeo: para vectores unitarios la
+  distancia coseno es ‖u - v‖² / 2, así que el orden de los vecinos es el mismo. Los vectores
+  nulos (para los que la distancia coseno no está definida) quedan en el origen: su distancia a
+  cualquier otro vector es 0.5 (0 entre dos nulos), donde cdist devuelve nan.
+- jaccard y hamming no son de Minkowski y usan un árbol métrico (BallTree de sklearn), que
+  solo necesita la desigualdad triangular.
+
+Las distancias devueltas son las mismas que las de scipy.spatial.distance.cdist con la métrica
+pedida. El índice se puede guardar junto al experimento con save() (ver mathchords.io.save_sidecar).
+
+Ejemplo:
+    data = process(data, interval_vector)
+    index = NeighborIndex.from_results(data["results"], metric="cityblock", func=interval_vector)
+    distances, ids = index.query("chord_42", k=10)
+    index.save("experimentos/mayor.pkl")
+"""
+from collections.abc import Mapping
+
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import cdist
+from sklearn.neighbors import BallTree
+
+from mathchords.functions.distances import METRICS, MAHALANOBIS_REG, mahalanobis_vi, whitening_matrix
+from mathchords.io import ColumnarResults, save_sidecar, load_sidecar
+
+# Métrica -> exponente p del KD-tree (las métricas que no están usan el BallTree)
+_MINKOWSKI = {'euclidean': 2, 'cityblock': 1, 'chebyshev': np.inf, 'mahalanobis': 2, 'cosine': 2}
+# Métrica con la que se calculan las distancias sobre los vectores ya transformados
+_KERNEL_METRIC = {'mahalanobis': 'euclidean', 'cosine': 'euclidean'}
+DEFAULT_LEAF_SIZE = 16
+# Margen relativo del radio de búsqueda en el KD-tree (ver query_radius_batch)
+RADIUS_PAD = 1e-9
+SIDECAR_NAME = "neighbors"
+
+
+def results_matrix(results):
+    """
+    Matriz de características de los resultados de process().
+
+    Parámetros:
+    - results: diccionario chord_id -> {"feature_vector", ...} o ColumnarResults.
+
+    Retorna:
+    - np.array (N, d): los vectores, rellenados con ceros si tienen longitudes distintas.
+    - list: los chord_id en el orden de las filas.
+    """
+    if isinstance(results, ColumnarResults):
+        return np.asarray(results.features), list(results)
+    ids = list(results.keys())
+    vectors = [results[chord_id]["feature_vector"] for chord_id in ids]
+    width = max(map(len, vectors), default=0)
+    features = np.zeros((len(vectors), width))
+    for i, vector in enumerate(vectors):
+        features[i, :len(vector)] = vector
+    return features, ids
+
+
+class NeighborIndex:
+    """
+    Índice de vecinos más cercanos de N vectores de características.
+
+    Parámetros:
+    - features: matriz (N, d) de características.
+    - metric: una de distances.METRICS.
+    - ids: chord_id de cada fila; por defecto chord_{i}, como en process().
+    - func: extractor (chord, chord_id) con el que se calcularon las características; solo
+      hace falta para consultar con acordes que no están en el índice. Debe estar definido a
+      nivel de módulo para poder guardar el índice.
+    - leaf_size: tamaño de las hojas del árbol.
+    - mahalanobis_reg: regularización de la covarianza para 'mahalanobis'.
+    """
+
+    def __init__(self, features, metric='euclidean', ids=None, func=None, leaf_size=DEFAULT_LEAF_SIZE,
+                 mahalanobis_reg=MAHALANOBIS_REG):
+        if metric not in METRICS:
+            raise ValueError("Métrica no soportada.")
+        features = np.asarray(features)
+        if features.ndim != 2:
+            raise ValueError("features debe ser una matriz (N, d).")
+        self.metric = metric
+        self.ids = list(ids) if ids is not None else None
+        self.func = func
+        self.dim = features.shape[1]
+        self._positions = None
+        self._vi = mahalanobis_vi(features, mahalanobis_reg) if metric == 'mahalanobis' else None
+        self._whitening = whitening_matrix(self._vi) if metric == 'mahalanobis' else None
+        # El árbol guarda los vectores transformados; las consultas de radio necesitan los
+        # originales para calcular la distancia exacta con cdist
+        self._features = np.asarray(features, dtype=np.float64) if metric in _KERNEL_METRIC else None
+
+        points = self._transform(features)
+        if metric in _MINKOWSKI:
+            self._tree = cKDTree(points, leafsize=leaf_size)
+        else:
+            self._tree = BallTree(points, leaf_size=leaf_size, metric=metric)
+
+    @classmethod
+    def from_results(cls, results, metric='euclidean', func=None, **options):
+        """Construye el índice a partir de los resultados de process() (diccionario o ColumnarResults)."""
+        features, ids = results_matrix(results)
+        return cls(features, metric, ids, func, **options)
+
+    def __len__(self):
+        return self._tree.n if isinstance(self._tree, cKDTree) else len(self._points)
+
+    def __repr__(self):
+        return f"NeighborIndex(n={len(self)}, dim={self.dim}, metric={self.metric!r})"
+
+    @property
+    def _points(self):
+        # Vectores transformados tal como los guarda el árbol (no se duplican al guardar el índice)
+        return self._tree.data if isinstance(self._tree, cKDTree) else np.asarray(self._tree.data)
+
+    def _transform(self, X):
+        """Vectores en el espacio del árbol."""
+        if self.metric == 'jaccard':
+            return np.asarray(X).astype(bool)
+        X = np.asarray(X, dtype=np.float64)
+        if self.metric == 'mahalanobis':
+            return X @ self._whitening
+        if self.metric == 'cosine':
+            norms = np.linalg.norm(X, axis=1, keepdims=True)
+            return np.divide(X, norms, out=np.zeros_like(X), where=norms > 0)
+        return X
+
+    def chord_id(self, index):
+        """chord_id de la fila index."""
+        return self.ids[index] if self.ids is not None else f"chord_{index}"
+
+    def position(self, chord_id):
+        """Fila del acorde chord_id."""
+        if self.ids is None:
+            prefix, _, number = chord_id.rpartition("_")
+            if prefix == "chord" and number.isdigit() and int(number) < len(self):
+                return int(number)
+            raise KeyError(chord_id)
+        if self._positions is None:
+            self._positions = {key: i for i, key in enumerate(self.ids)}
+        return self._positions[chord_id]
+
+    def _vector(self, item):
+        """Vector de características (sin transformar) de un acorde, o el propio vector."""
+        if isinstance(item, Mapping):
+            if self.func is None:
+                raise ValueError("El índice no tiene extractor (func) para calcular las características del acorde.")
+            item = self.func(item, "query")["feature_vector"]
+        vector = np.zeros(self.dim)
+        values = np.asarray(item, dtype=np.float64).ravel()
+        if len(values) > self.dim:
+            raise ValueError(f"El vector tiene {len(values)} valores y el índice {self.dim}.")
+        vector[:len(values)] = values
+        return vector
+
+    def _query_points(self, items, original=False):
+        """
+        Vectores transformados de una lista de chord_id, acordes o vectores (o de una matriz).
+        Con original=True retorna también los vectores sin transformar (si el índice los guarda).
+        """
+        keep = original and self._features is not None
+        if isinstance(items, np.ndarray) and items.ndim == 2:
+            points = self._transform(items)
+            return (points, np.asarray(items, dtype=np.float64) if keep else None) if original else points
+        points = np.empty((len(items), self.dim), dtype=self._points.dtype)
+        vectors = np.empty((len(items), self.dim)) if keep else None
+        pending = []
+        for i, item in enumerate(items):
+            if isinstance(item, str):
+                points[i] = self._points[self.position(item)]
+                if keep:
+                    vectors[i] = self._features[self.position(item)]
+            else:
+                pending.append(i)
+        if pending:
+            pending_vectors = np.array([self._vector(items[i]) for i in pending])
+            points[pending] = self._transform(pending_vectors)
+            if keep:
+                vectors[pending] = pending_vectors
+        return (points, vectors) if original else points
+
+    def _distances(self, points):
+        """Convierte distancias del árbol en distancias de la métrica pedida."""
+        return points ** 2 / 2 if self.metric == 'cosine' else points
+
+    def _exact_distances(self, point, vector, indices):
+        """
+        Distancias de cdist en la métrica pedida entre una consulta (point transformado, vector
+        original) y las filas indices.
+        """
+        if self._features is None:
+            return cdist(point[None, :], self._points[indices], metric=self.metric)[0]
+        if self.metric == 'mahalanobis':
+            return cdist(vector[None, :], self._features[indices], metric='mahalanobis', VI=self._vi)[0]
+        distances = cdist(vector[None, :], self._features[indices], metric='cosine')[0]
+        # cdist da nan con vectores nulos; en el árbol están en el origen, a 0.5 de los unitarios
+        both_null = ~self._features[indices].any(axis=1) & (not vector.any())
+        return np.where(np.isnan(distances), np.where(both_null, 0.0, 0.5), distances)
+
+    def query_batch(self, items, k=1, workers=1):
+        """
+        Los k vecinos más cercanos de varios acordes.
+
+        Parámetros:
+        - items: lista de chord_id, acordes o vectores de características, o una matriz (M, d).
+        - k: número de vecinos (incluye al propio acorde si está en el índice).
+        - workers: procesos del KD-tree (-1 para todos los núcleos).
+
+        Retorna:
+        - np.array (M, k): distancias, en orden creciente.
+        - np.array (M, k): filas de los vecinos (ver chord_id).
+        """
+        points = self._query_points(items)
+        k = min(k, len(self))
+        if isinstance(self._tree, cKDTree):
+            distances, indices = self._tree.query(points, k=k, p=_MINKOWSKI[self.metric], workers=workers)
+            distances, indices = distances.reshape(len(points), k), indices.reshape(len(points), k)
+        else:
+            distances, indices = self._tree.query(points, k=k)
+        return self._distances(distances), indices
+
+    def query(self, chord_or_id, k=1):
+        """
+        Los k acordes más parecidos a uno dado.
+
+        Parámetros:
+        - chord_or_id: chord_id de un acorde del índice, un acorde (necesita func) o un vector.
+        - k: número de vecinos (incluye al propio acorde si está en el índice).
+
+        Retorna:
+        - np.array: distancias, en orden creciente.
+        - list: chord_id de los vecinos.
+        """
+        distances, indices = self.query_batch([chord_or_id], k)
+        return distances[0], [self.chord_id(index) for index in indices[0]]
+
+    def query_radius_batch(self, items, radius):
+        """
+        Los vecinos a distancia menor o igual que radius de varios acordes.
+
+        Parámetros:
+        - items: como en query_batch.
+        - radius: distancia máxima, en la métrica del índice. Los puntos justo en el borde se
+          incluyen: la distancia que se compara es la de cdist (ver el docstring del módulo para
+          los vectores nulos con 'cosine').
+
+        Retorna:
+        - list: por cada consulta, (distancias en orden creciente, filas de los vecinos).
+        """
+        points, vectors = self._query_points(items, original=True)
+        if not isinstance(self._tree, cKDTree):
+            indices, distances = self._tree.query_radius(points, radius, return_distance=True, sort_results=True)
+            return list(zip(distances, indices))
+
+        # El árbol calcula sus distancias con otro redondeo que cdist: se busca con un radio algo
+        # mayor y se filtra con la distancia exacta, para no perder los puntos justo en el borde
+        padded = radius * (1 + RADIUS_PAD) + RADIUS_PAD
+        tree_radius = np.sqrt(2 * padded) if self.metric == 'cosine' else padded
+        neighbors = []
+        candidates = self._tree.query_ball_point(points, tree_radius, p=_MINKOWSKI[self.metric])
+        for i, indices in enumerate(candidates):
+            indices = np.asarray(indices, dtype=np.intp)
+            distances = self._exact_distances(points[i], vectors[i] if vectors is not None else None, indices)
+            keep = distances <= radius
+            distances, indices = distances[keep], indices[keep]
+            order = np.argsort(distances, kind='stable')
+            neighbors.append((distances[order], indices[order]))
+        return neighbors
+
+    def query_radius(self, chord_or_id, radius):
+        """
+        Los acordes a distancia menor o igual que radius de uno dado.
+
+        Parámetros:
+        - chord_or_id: como en query.
+        - radius: distancia máxima, en la métrica del índice.
+
+        Retorna:
+        - np.array: distancias, en orden creciente.
+        - list: chord_id de los vecinos.
+        """
+        distances, indices = self.query_radius_batch([chord_or_id], radius)[0]
+        return distances, [self.chord_id(index) for index in indices]
+
+    def save(self, data_addr, name=SIDECAR_NAME):
+        """Guarda el índice junto al experimento data_addr (ver mathchords.io.save_sidecar)."""
+        save_sidecar(self, data_addr, name)
+
+    @staticmethod
+    def load(data_addr, name=SIDECAR_NAME):
+        """Carga el índice guardado junto al experimento; None si no hay o si el experimento cambió."""
+        return load_sidecar(data_addr, name)
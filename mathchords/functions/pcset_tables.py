@@ -0,0 +1,153 @@
+"""
+Tablas precalculadas de características de conjuntos de clases de tono.
+
+Solo hay 2**12 = 4096 conjuntos de clases de tono distintos, así que normal_form, prime_form,
+rahn_normal_order, interval_vector y binary_pitch_class_set se pueden calcular una sola vez
+para cada conjunto (indexado por su máscara de 12 bits, como en chord_encoding.pitch_class_mask)
+y después consultarse con una lectura de tabla por acorde.
+
+Las tablas se construyen llamando a los propios extractores sobre un acorde representante de
+cada conjunto, por lo que coinciden con ellos por construcción. Hay dos matices, porque los
+extractores trabajan sobre la lista de notas del acorde y no sobre el conjunto:
+
+- prime_form e interval_vector dependen de las notas repetidas (por ejemplo interval_vector
+  cuenta los unísonos), así que la tabla solo se usa para acordes sin clases de tono repetidas.
+- pitch_classes_extractor no reduce la raíz módulo 12; los acordes con raíz fuera de 0-11 no
+  se corresponden con ningún conjunto y siempre usan el extractor original.
+
+En ambos casos lookup_feature recurre al extractor original, así que el resultado es siempre
+el mismo que el de la función por acorde. batch_features usa estas tablas para las versiones por
+lotes de normal_form, prime_form y rahn_normal_order.
+"""
+import os
+import pickle
+
+import numpy as np
+
+from mathchords.functions.characteristics import (
+    normal_form, prime_form, rahn_normal_order, interval_vector, binary_pitch_class_set,
+)
+
+TABLES_VERSION = 1
+N_SETS = 4096
+
+# Extractor -> (nombre de la tabla, True si la tabla solo vale para acordes sin notas repetidas)
+SET_FEATURES = {
+    normal_form: ("normal_form", False),
+    prime_form: ("prime_form", True),
+    rahn_normal_order: ("rahn_normal_order", False),
+    interval_vector: ("interval_vector", True),
+    binary_pitch_class_set: ("binary_pitch_class_set", False),
+}
+
+_tables = None
+
+
+def mask_pitch_classes(mask):
+    """Clases de tono (ordenadas) de una máscara de 12 bits."""
+    return [pc for pc in range(12) if mask >> pc & 1]
+
+
+def _representative(mask):
+    """Acorde cuya lista de notas es exactamente el conjunto de la máscara, en orden ascendente."""
+    pcs = mask_pitch_classes(mask)
+    intervals = [b - a for a, b in zip(pcs, pcs[1:])]
+    return {"octave": 4, "bass": pcs[0], "root": pcs[0], "degree": 0, "intervals": intervals}
+
+
+def build_tables():
+    """
+    Calcula las tablas de todas las características de SET_FEATURES.
+
+    Retorna:
+    - Diccionario nombre -> {"values", "matrix", "lengths"}:
+      - values: lista de 4096 vectores (None para la máscara vacía o si el extractor falla con ese conjunto).
+      - matrix: matriz (4096, d) int8 con los vectores rellenados con ceros.
+      - lengths: número de valores válidos de cada fila (-1 si no hay valor).
+    """
+    tables = {}
+    for func, (name, _) in SET_FEATURES.items():
+        values = [None] * N_SETS
+        for mask in range(1, N_SETS):
+            try:
+                values[mask] = tuple(func(_representative(mask), "chord_0")["feature_vector"])
+            except (IndexError, ValueError):
+                pass
+        width = max(len(value) for value in values if value is not None)
+        matrix = np.zeros((N_SETS, width), dtype=np.int8)
+        lengths = np.full(N_SETS, -1, dtype=np.int8)
+        for mask, value in enumerate(values):
+            if value is not None:
+                matrix[mask, :len(value)] = value
+                lengths[mask] = len(value)
+        tables[name] = {"values": values, "matrix": matrix, "lengths": lengths}
+    return tables
+
+
+def get_tables(path=None):
+    """
+    Devuelve las tablas, construyéndolas la primera vez que se piden en el proceso.
+
+    Parámetros:
+    - path: archivo opcional donde persistirlas. Si existe (y es de la versión actual) se carga
+      en lugar de recalcular; si no, se escribe después de construirlas.
+    """
+    global _tables
+    if _tables is not None:
+        return _tables
+
+    if path is not None and os.path.exists(path):
+        with open(path, "rb") as tables_file:
+            stored = pickle.load(tables_file)
+        if stored.get("version") == TABLES_VERSION:
+            _tables = stored["tables"]
+            return _tables
+
+    _tables = build_tables()
+    if path is not None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as tables_file:
+            pickle.dump({"version": TABLES_VERSION, "tables": _tables}, tables_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    return _tables
+
+
+def chord_mask(chord):
+    """
+    Máscara de 12 bits del acorde y si sus notas son distintas entre sí.
+
+    Retorna:
+    - (mask, distinct), o (None, False) si la raíz está fuera de 0-11.
+    """
+    root = chord["root"]
+    if not 0 <= root < 12:
+        return None, False
+    mask = 1 << root
+    distinct = True
+    for interval in chord["intervals"]:
+        root = (root + interval) % 12
+        distinct = distinct and not mask >> root & 1
+        mask |= 1 << root
+    return mask, distinct
+
+
+def lookup_feature(chord, chord_id, func):
+    """
+    Resultado de func(chord, chord_id) obtenido de las tablas cuando es posible.
+
+    Parámetros:
+    - chord: acorde.
+    - chord_id: identificador del acorde.
+    - func: uno de los extractores de SET_FEATURES (cualquier otro se llama directamente).
+
+    Retorna:
+    - El mismo diccionario que devolvería func.
+    """
+    if func not in SET_FEATURES:
+        return func(chord, chord_id)
+    name, distinct_only = SET_FEATURES[func]
+    mask, distinct = chord_mask(chord)
+    value = get_tables()[name]["values"][mask] if mask is not None else None
+    if value is None or (distinct_only and not distinct):
+        return func(chord, chord_id)
+    return {"chord": chord, "feature_vector": list(value), "chord_id": chord_id}
@@ -0,0 +1,173 @@
+"""
+Rugosidad (disonancia sensorial) de Sethares por lotes.
+
+dissmeasure_fixed_amp evalúa el modelo sobre un único vector de frecuencias. Aquí el mismo
+modelo con amplitud fija se evalúa sobre una matriz (N, k) de frecuencias: todos los pares de
+notas de todos los acordes se calculan con unas pocas operaciones de arreglos, y los pares se
+agrupan en el histograma de 13 posiciones de interval_histogram_with_dissmeasure (11
+disonancias por intervalo, su suma y su promedio).
+
+Las sumas se acumulan par a par en el mismo orden que los bucles de los extractores, de modo
+que los vectores coinciden exactamente con los que se obtenían llamando a dissmeasure_fixed_amp
+par por par.
+
+Con amplitud fija la rugosidad de un par solo depende de las dos alturas absolutas, y las notas
+de los acordes son notas MIDI (0-127). get_pair_table() calcula una sola vez la tabla 128x128
+de rugosidades con amplitud 1 (opcionalmente guardada en disco) y midi_histograms() la indexa
+en lugar de evaluar exponenciales. Es exacta para el modelo de amplitud fija: cada entrada se
+calcula con pair_roughness sobre las mismas frecuencias que inversion_to_frequencies, y
+multiplicar por fixed_amp da el mismo número que evaluar el modelo con esa amplitud. No vale
+para modelos con amplitudes que dependan de la nota.
+"""
+import os
+
+import numpy as np
+
+# Parámetros del modelo de Sethares (los mismos que dissmeasure_fixed_amp)
+DSTAR = 0.24
+S1 = 0.0207
+S2 = 18.96
+C1 = 5
+C2 = -5
+A1 = -3.51
+A2 = -5.75
+
+N_INTERVALS = 11
+N_MIDI = 128
+A4_MIDI = 69
+
+_pair_table = None
+
+
+def pair_roughness(f_a, f_b, fixed_amp=1):
+    """
+    Rugosidad de cada par de frecuencias (elemento a elemento).
+
+    Equivale a dissmeasure_fixed_amp([f_a, f_b], fixed_amp) para cada par.
+    """
+    f_min = np.minimum(f_a, f_b)
+    f_dif = np.abs(f_b - f_a)
+    s_f_dif = DSTAR / (S1 * f_min + S2) * f_dif
+    return fixed_amp * (C1 * np.exp(A1 * s_f_dif) + C2 * np.exp(A2 * s_f_dif))
+
+
+def position_weights(positions, lengths):
+    """Peso de cada posición de nota, como characteristics.weight_function (matriz (N, len(positions)))."""
+    mu = (lengths[:, None].astype(np.float64) - 1) / 2
+    return 1 / (np.abs(positions[None, :] - mu) + 1)
+
+
+def dissonance_histograms(pair_dissonance, sequence, lengths, weighted=False):
+    """
+    Agrupa las disonancias de los pares de notas en el vector de 13 posiciones.
+
+    Parámetros:
+    - pair_dissonance: matriz (N, P) con la disonancia de cada par (i < j) en el orden de
+      np.triu_indices(k, 1).
+    - sequence: matriz (N, k) de clases de tono en el orden de inversion_from_bass.
+    - lengths: número de notas válidas de cada fila.
+    - weighted: aplica los pesos de interval_histogram_with_dissmeasure_weighted.
+
+    Retorna:
+    - Matriz (N, 13).
+    """
+    n_rows, width = sequence.shape
+    i, j = np.triu_indices(width, 1)
+    interval = (sequence[:, j] - sequence[:, i]) % 12
+    valid = (j[None, :] < lengths[:, None]) & (interval > 0)
+    if weighted:
+        weights = position_weights(np.arange(width), lengths)
+        pair_dissonance = pair_dissonance * (weights[:, i] * weights[:, j])
+
+    dissmeasures = np.zeros((n_rows, N_INTERVALS))
+    rows = np.arange(n_rows)
+    bins = np.where(valid, interval - 1, 0)
+    # Un par cada vez, en el orden de los bucles originales, para sumar en el mismo orden
+    for pair in range(len(i)):
+        dissmeasures[rows, bins[:, pair]] += np.where(valid[:, pair], pair_dissonance[:, pair], 0.0)
+
+    vectors = np.zeros((n_rows, N_INTERVALS + 2))
+    vectors[:, :N_INTERVALS] = dissmeasures
+    total = np.zeros(n_rows)
+    for column in range(N_INTERVALS):
+        total = total + dissmeasures[:, column]
+    vectors[:, -2] = total
+    vectors[:, -1] = total / N_INTERVALS
+    return vectors
+
+
+def roughness_histograms(frequencies, sequence, lengths, weighted=False, fixed_amp=1):
+    """
+    Vectores de disonancia por intervalo de N acordes a partir de sus frecuencias.
+
+    Parámetros:
+    - frequencies: matriz (N, k) de frecuencias en el orden de inversion_to_frequencies
+      (las posiciones a partir de lengths se ignoran).
+    - sequence: matriz (N, k) de clases de tono en el orden de inversion_from_bass.
+    - lengths: número de notas válidas de cada fila.
+    - weighted: aplica los pesos de interval_histogram_with_dissmeasure_weighted.
+    - fixed_amp: amplitud de todos los parciales.
+
+    Retorna:
+    - Matriz (N, 13).
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    i, j = np.triu_indices(frequencies.shape[1], 1)
+    pair_dissonance = pair_roughness(frequencies[:, i], frequencies[:, j], fixed_amp)
+    return dissonance_histograms(pair_dissonance, np.asarray(sequence), np.asarray(lengths), weighted)
+
+
+def midi_frequency(note):
+    """Frecuencia de una nota MIDI, con la misma expresión que inversion_to_frequencies."""
+    return 440 * 2 ** ((note - A4_MIDI) / 12)
+
+
+def build_pair_table():
+    """Tabla (128, 128) con la rugosidad de amplitud 1 de cada par de notas MIDI."""
+    frequencies = np.array([midi_frequency(note) for note in range(N_MIDI)])
+    return pair_roughness(frequencies[:, None], frequencies[None, :])
+
+
+def get_pair_table(path=None):
+    """
+    Devuelve la tabla de rugosidad por pares de notas MIDI, construyéndola la primera vez.
+
+    Parámetros:
+    - path: archivo .npy opcional donde persistirla. Si existe se carga; si no, se escribe
+      después de construirla.
+    """
+    global _pair_table
+    if _pair_table is not None:
+        return _pair_table
+
+    if path is not None and os.path.exists(path):
+        _pair_table = np.load(path)
+        return _pair_table
+
+    _pair_table = build_pair_table()
+    if path is not None:
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, _pair_table)
+        os.replace(tmp_path, path)
+    return _pair_table
+
+
+def midi_histograms(notes, sequence, lengths, weighted=False, fixed_amp=1):
+    """
+    Igual que roughness_histograms, pero a partir de las notas MIDI de cada acorde y usando la
+    tabla de get_pair_table en lugar de evaluar el modelo.
+
+    Parámetros:
+    - notes: matriz (N, k) de notas MIDI (0-127) en el orden de inversion_to_frequencies
+      (las posiciones a partir de lengths se ignoran).
+    - sequence, lengths, weighted, fixed_amp: como en roughness_histograms.
+
+    Retorna:
+    - Matriz (N, 13).
+    """
+    notes = np.asarray(notes)
+    i, j = np.triu_indices(notes.shape[1], 1)
+    pair_dissonance = get_pair_table()[notes[:, i], notes[:, j]]
+    if fixed_amp != 1:
+        pair_dissonance = fixed_amp * pair_dissonance
+    return dissonance_histograms(pair_dissonance, np.asarray(sequence), np.asarray(lengths), weighted)
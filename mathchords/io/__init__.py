@@ -1,4 +1,9 @@
-from .data_io import load, save
+from .data_io import load, save, save_sidecar, load_sidecar
 from .data_handler import ExperimentHandler, Experiment
+from .columnar import load_columnar, save_columnar, ColumnarChords, ColumnarResults
+from .cache import ExperimentCache, default_cache
+from .shards import ShardedExperimentWriter, ShardedExperimentReader
 
-__all__ = [load, save, ExperimentHandler, Experiment]
\ No newline at end of file
+__all__ = ["load", "save", "save_sidecar", "load_sidecar", "ExperimentHandler", "Experiment",
+           "load_columnar", "save_columnar", "ColumnarChords", "ColumnarResults",
+           "ExperimentCache", "default_cache", "ShardedExperimentWriter", "ShardedExperimentReader"]
\ No newline at end of file
@@ -0,0 +1,176 @@
+import mmap
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .data_io import load, file_stat
+
+# In-process cache of loaded experiments
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+# Containers longer than this are sized from an evenly spaced sample of their items
+_SAMPLE_THRESHOLD = 2048
+_SAMPLE_SIZE = 256
+
+
+def deep_sizeof(obj) -> int:
+    """
+    Estimates the memory held by an object and everything it references.
+
+    Long lists and dicts are extrapolated from a sample of their items, so the
+    estimate stays cheap for experiments with millions of chords. Memory-mapped
+    arrays only count their header, since their data lives in the page cache.
+    Views count the buffer they point into (once, however many views share it).
+
+    Args:
+        obj (Any): Object to measure (typically an experiment dict).
+
+    Returns:
+        int: Estimated size in bytes.
+    """
+    seen = set()
+
+    def sizeof(item) -> int:
+        if id(item) in seen:
+            return 0
+        seen.add(id(item))
+
+        if isinstance(item, np.ndarray):
+            return array_sizeof(item)
+        size = sys.getsizeof(item)
+        if isinstance(item, (str, bytes, int, float, bool)) or item is None:
+            return size
+
+        if isinstance(item, dict):
+            children = list(item.values())
+            keys = list(item.keys())
+            children_size = sampled(keys) + sampled(children)
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            children_size = sampled(list(item))
+        elif hasattr(item, "__dict__"):
+            children_size = sizeof(vars(item))
+        else:
+            children_size = 0
+        return size + children_size
+
+    def array_sizeof(array: np.ndarray) -> int:
+        header = sys.getsizeof(array[:0])
+        if array.flags.owndata:
+            return header + array.nbytes
+        # Follow the chain of views down to the object that owns the buffer
+        base = array
+        while isinstance(base, np.ndarray) and not base.flags.owndata and base.base is not None:
+            base = base.base
+        if isinstance(array, np.memmap) or isinstance(base, mmap.mmap):
+            return header
+        if isinstance(base, np.ndarray):
+            return header + sizeof(base)
+        if id(base) in seen:
+            return header
+        seen.add(id(base))
+        return header + memoryview(base).nbytes
+
+    def sampled(items: list) -> int:
+        if len(items) <= _SAMPLE_THRESHOLD:
+            return sum(sizeof(item) for item in items)
+        step = len(items) // _SAMPLE_SIZE
+        sample = items[::step][:_SAMPLE_SIZE]
+        return int(sum(sizeof(item) for item in sample) * len(items) / len(sample))
+
+    return sizeof(obj)
+
+
+class ExperimentCache:
+    """
+    LRU cache of loaded experiments bounded by an estimated byte budget.
+
+    Entries are keyed by path and validated against the file size and mtime,
+    so a file modified by another process is reloaded. Cached experiments are
+    shared between callers: treat them as read-only, or copy them before
+    modifying them in place. Caching is opt-in: `ExperimentHandler` and
+    `Experiment` only use a cache when one is passed (e.g. `default_cache`).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, data_addr: Path) -> dict:
+        """
+        Returns the experiment at `data_addr`, loading it only when needed.
+
+        Args:
+            data_addr (Path): Data file address or columnar experiment directory.
+
+        Returns:
+            Dict[str, Any]: Loaded experiment data.
+        """
+        key = os.path.abspath(data_addr)
+        signature = file_stat(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        data = load(key)
+        self.put(key, data, signature)
+        return data
+
+    def put(self, data_addr: Path, data: dict, signature: tuple = None) -> None:
+        """Stores an already loaded experiment, evicting the least recently used ones if needed."""
+        key = os.path.abspath(data_addr)
+        signature = signature or file_stat(key)
+        nbytes = deep_sizeof(data)
+        with self._lock:
+            self._discard(key)
+            if nbytes > self.max_bytes:
+                # Never keep something that would evict the whole cache by itself
+                return
+            self._entries[key] = (signature, data, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def invalidate(self, data_addr: Path) -> None:
+        """Drops the cached copy of an experiment (called after it is written)."""
+        with self._lock:
+            self._discard(os.path.abspath(data_addr))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Cache counters.
+
+        Returns:
+            Dict[str, int]: hits, misses, evictions, entries, bytes and max_bytes.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+# Shared cache for callers that opt in, e.g. ExperimentHandler(base_addr, cache=default_cache)
+default_cache = ExperimentCache()
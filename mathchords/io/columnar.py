@@ -0,0 +1,356 @@
+import json
+import os
+import pickle as pkl
+from collections.abc import Mapping, Sequence
+from itertools import chain
+from pathlib import Path
+
+import numpy as np
+
+# Columnar experiment format: a directory with a small JSON metadata file plus
+# one .npy file per chord column, feature matrix and top-level array.
+
+COLUMNAR_SUFFIX = ".columnar"
+METADATA_FILE = "metadata.json"
+OBJECTS_FILE = "objects.pkl"
+FORMAT_NAME = "mathchords-columnar"
+FORMAT_VERSION = 1
+
+CHORD_KEYS = ("octave", "bass", "root", "degree", "intervals")
+RESULT_KEYS = ("chord", "feature_vector", "chord_id")
+SCALAR_COLUMNS = ("octave", "bass", "root", "degree")
+
+
+def is_columnar(data_addr: Path) -> bool:
+    """
+    Tells whether an address refers to the columnar format.
+
+    Args:
+        data_addr (Path): Experiment address.
+
+    Returns:
+        bool: True for directories and for addresses ending in `.columnar`.
+    """
+    path = Path(data_addr)
+    return path.is_dir() or path.suffix == COLUMNAR_SUFFIX
+
+
+class ColumnarChords(Sequence):
+    """
+    Read-only list view of a chord table.
+
+    Indexing returns the classic chord dicts, so the view can be passed to
+    `process()` and the plotting code; `table` exposes the underlying
+    (possibly memory-mapped) columns for vectorized code.
+    """
+
+    def __init__(self, table: dict, extras: dict = None) -> None:
+        self.table = table
+        self.extras = extras or {}
+
+    def __len__(self) -> int:
+        return len(self.table["length"])
+
+    def _chord(self, index: int, octave, bass, root, degree, intervals, length) -> dict:
+        chord = {"octave": octave, "bass": bass, "root": root, "degree": degree, "intervals": intervals[:length]}
+        for key, values in self.extras.items():
+            if index in values:
+                chord[key] = values[index]
+        return chord
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chord index out of range")
+        table = self.table
+        return self._chord(index, *(table[key][index].tolist() for key in SCALAR_COLUMNS),
+                           table["intervals"][index].tolist(), int(table["length"][index]))
+
+    def __iter__(self):
+        # Converts whole blocks at once instead of one element at a time
+        block = 65536
+        table = self.table
+        for start in range(0, len(self), block):
+            stop = start + block
+            columns = [table[key][start:stop].tolist() for key in SCALAR_COLUMNS]
+            columns += [table["intervals"][start:stop].tolist(), table["length"][start:stop].tolist()]
+            for index, row in enumerate(zip(*columns), start=start):
+                yield self._chord(index, *row)
+
+
+class ColumnarResults(Mapping):
+    """
+    Read-only `chord_id -> {"chord", "feature_vector", "chord_id"}` view of a
+    feature matrix, equivalent to the `results` dict built by `process()`.
+
+    `features` holds the (N, d) matrix; `lengths` is only set when the
+    original feature vectors had different lengths (rows are zero padded).
+    """
+
+    def __init__(self, features: np.ndarray, chords: ColumnarChords, ids: list = None,
+                 lengths: np.ndarray = None, extras: dict = None) -> None:
+        self.features = features
+        self.chords = chords
+        self.ids = ids
+        self.lengths = lengths
+        self.extras = extras or {}
+        self._positions = None
+
+    def _index(self, chord_id: str) -> int:
+        if self.ids is None:
+            prefix, _, number = chord_id.rpartition("_")
+            if prefix == "chord" and number.isdigit() and int(number) < len(self):
+                return int(number)
+            raise KeyError(chord_id)
+        if self._positions is None:
+            self._positions = {key: i for i, key in enumerate(self.ids)}
+        return self._positions[chord_id]
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def __iter__(self):
+        if self.ids is None:
+            return (f"chord_{i}" for i in range(len(self)))
+        return iter(self.ids)
+
+    def __getitem__(self, chord_id: str) -> dict:
+        if not isinstance(chord_id, str):
+            raise KeyError(chord_id)
+        index = self._index(chord_id)
+        vector = self.features[index].tolist()
+        if self.lengths is not None:
+            vector = vector[:int(self.lengths[index])]
+        result = {"chord": self.chords[index], "feature_vector": vector, "chord_id": chord_id}
+        for key, values in self.extras.items():
+            result[key] = values[index]
+        return result
+
+
+# Writing helpers
+
+def _atomic_write(path: Path, write) -> None:
+    # Replacing the file keeps arrays that are still memory-mapped from the old one valid
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as tmp_file:
+        write(tmp_file)
+    os.replace(tmp_path, path)
+
+
+def _save_array(path: Path, name: str, array: np.ndarray) -> None:
+    _atomic_write(path.joinpath(f"{name}.npy"), lambda file: np.save(file, np.asarray(array)))
+
+
+def _is_json(value) -> bool:
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+
+def chords_to_table(chords) -> tuple:
+    """
+    Converts a list of chord dicts into chord columns.
+
+    Args:
+        chords (list): Chord dicts (or any mapping with the chord keys).
+
+    Returns:
+        tuple: (table, extras) where `table` maps column names to arrays and
+        `extras` maps non-standard chord keys (e.g. `name`) to `{index: value}`.
+    """
+    n_chords = len(chords)
+    lengths = np.fromiter((len(chord["intervals"]) for chord in chords), dtype=np.int16, count=n_chords)
+    width = int(lengths.max()) if n_chords else 0
+    intervals = np.zeros((n_chords, width), dtype=np.int16)
+    extras = {}
+    for i, chord in enumerate(chords):
+        intervals[i, :lengths[i]] = chord["intervals"]
+        for key in chord.keys():
+            if key not in CHORD_KEYS:
+                extras.setdefault(key, {})[i] = chord[key]
+
+    table = {key: np.fromiter((chord[key] for chord in chords), dtype=np.int16, count=n_chords)
+             for key in SCALAR_COLUMNS}
+    table["intervals"] = intervals
+    table["length"] = lengths
+    return table, extras
+
+
+def _save_chords(path: Path, prefix: str, chords, objects: dict) -> dict:
+    if isinstance(chords, ColumnarChords):
+        table, extras = chords.table, chords.extras
+    elif isinstance(chords, dict):
+        # Columnar table from gen_chords.generate_chords_table
+        table, extras = chords, {}
+    else:
+        table, extras = chords_to_table(chords)
+
+    for key in SCALAR_COLUMNS + ("intervals", "length"):
+        _save_array(path, f"{prefix}.{key}", table[key])
+    if extras:
+        objects[f"{prefix}.extras"] = extras
+    return {"n": len(table["length"]), "table": isinstance(chords, dict)}
+
+
+def _same_chords(result_chords, chords) -> bool:
+    if result_chords is chords:
+        return True
+    if isinstance(result_chords, ColumnarChords) and result_chords.table is chords:
+        return True
+    if isinstance(chords, dict):
+        chords = ColumnarChords(chords)
+    if chords is None or len(result_chords) != len(chords):
+        return False
+    return all(a is b or a == b for a, b in zip(result_chords, chords))
+
+
+def _save_results(path: Path, results, chords, objects: dict) -> dict:
+    if isinstance(results, ColumnarResults):
+        features, lengths, ids = results.features, results.lengths, results.ids
+        result_chords, extras = results.chords, results.extras
+    else:
+        ids = list(results.keys())
+        entries = list(results.values())
+        vectors = [entry["feature_vector"] for entry in entries]
+        lengths = np.fromiter(map(len, vectors), dtype=np.int64, count=len(vectors))
+        width = int(lengths.max()) if len(vectors) else 0
+        flat = np.asarray(list(chain.from_iterable(vectors)))
+        features = np.zeros((len(vectors), width), dtype=flat.dtype if flat.size else np.float64)
+        rows = np.repeat(np.arange(len(vectors)), lengths)
+        columns = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        features[rows, columns] = flat
+        if len(vectors) and (lengths == width).all():
+            lengths = None
+        if ids == [f"chord_{i}" for i in range(len(ids))]:
+            ids = None
+        result_chords = [entry["chord"] for entry in entries]
+        extras = {}
+        for key in set(chain.from_iterable(entries)) - set(RESULT_KEYS):
+            extras[key] = [entry.get(key) for entry in entries]
+
+    _save_array(path, "results.features", features)
+    if lengths is not None:
+        _save_array(path, "results.lengths", lengths)
+
+    # Results usually reference the experiment chords; they are only stored once
+    shared = _same_chords(result_chords, chords)
+    if not shared:
+        _save_chords(path, "results.chord", result_chords, objects)
+    if extras:
+        objects["results.extras"] = extras
+
+    return {"n": len(features), "ids": ids, "ragged": lengths is not None, "shared_chords": shared}
+
+
+def save_columnar(data: dict, data_addr: Path) -> None:
+    """
+    Stores an experiment dict in the columnar format.
+
+    Chords become one array per column, `results` becomes a feature matrix,
+    top-level NumPy arrays (e.g. MDS embeddings) are stored as `.npy` files,
+    JSON-serializable fields go to `metadata.json` and anything else is
+    pickled into `objects.pkl`.
+
+    Args:
+        data (dict): Experiment data, as produced by `create_experiment_data` and `process`.
+        data_addr (Path): Destination directory.
+    """
+    path = Path(data_addr)
+    path.mkdir(parents=True, exist_ok=True)
+    metadata = {"format": FORMAT_NAME, "format_version": FORMAT_VERSION,
+                "fields": {}, "arrays": [], "objects": [], "chords": None, "results": None}
+    objects = {}
+
+    for key, value in data.items():
+        if key == "chords":
+            metadata["chords"] = _save_chords(path, "chords", value, objects)
+        elif key == "results":
+            metadata["results"] = _save_results(path, value, data.get("chords"), objects)
+        elif isinstance(value, np.ndarray):
+            _save_array(path, key, value)
+            metadata["arrays"].append(key)
+        elif _is_json(value):
+            metadata["fields"][key] = value
+        else:
+            objects[key] = value
+            metadata["objects"].append(key)
+
+    if objects:
+        _atomic_write(path.joinpath(OBJECTS_FILE), lambda file: pkl.dump(objects, file))
+    elif path.joinpath(OBJECTS_FILE).exists():
+        os.remove(path.joinpath(OBJECTS_FILE))
+    # The metadata file is written last: a directory without it is incomplete
+    _atomic_write(path.joinpath(METADATA_FILE),
+                  lambda file: file.write(json.dumps(metadata, ensure_ascii=False).encode("utf-8")))
+
+
+# Reading helpers
+
+def read_metadata(data_addr: Path) -> dict:
+    """Reads the JSON metadata of a columnar experiment."""
+    with open(Path(data_addr).joinpath(METADATA_FILE), "rb") as metadata_file:
+        metadata = json.loads(metadata_file.read().decode("utf-8"))
+    if metadata.get("format") != FORMAT_NAME:
+        raise ValueError(f"{data_addr} is not a {FORMAT_NAME} directory")
+    return metadata
+
+
+def _load_array(path: Path, name: str, mmap_mode: str) -> np.ndarray:
+    return np.load(path.joinpath(f"{name}.npy"), mmap_mode=mmap_mode)
+
+
+def _load_chords(path: Path, prefix: str, info: dict, objects: dict, mmap_mode: str):
+    table = {key: _load_array(path, f"{prefix}.{key}", mmap_mode) for key in SCALAR_COLUMNS + ("intervals", "length")}
+    if info.get("table"):
+        return table
+    return ColumnarChords(table, objects.get(f"{prefix}.extras"))
+
+
+def load_columnar(data_addr: Path, mmap_mode: str = "r") -> dict:
+    """
+    Opens a columnar experiment.
+
+    Arrays are memory-mapped, so opening is immediate and only the pages that
+    are actually touched get read from disk. `chords` is returned as a
+    `ColumnarChords` list view (or as the raw table if it was saved as one) and
+    `results` as a `ColumnarResults` mapping.
+
+    Args:
+        data_addr (Path): Experiment directory.
+        mmap_mode (str): Mode passed to `np.load`; None reads arrays into memory.
+
+    Returns:
+        Dict[str, Any]: Experiment data with the same top-level keys that were saved.
+    """
+    path = Path(data_addr)
+    metadata = read_metadata(path)
+    objects = {}
+    if path.joinpath(OBJECTS_FILE).exists():
+        with open(path.joinpath(OBJECTS_FILE), "rb") as objects_file:
+            objects = pkl.load(objects_file)
+
+    data = dict(metadata["fields"])
+    for key in metadata["arrays"]:
+        data[key] = _load_array(path, key, mmap_mode)
+    for key in metadata["objects"]:
+        data[key] = objects[key]
+
+    if metadata["chords"] is not None:
+        data["chords"] = _load_chords(path, "chords", metadata["chords"], objects, mmap_mode)
+
+    info = metadata["results"]
+    if info is not None:
+        if info["shared_chords"]:
+            chords = data["chords"]
+            if isinstance(chords, dict):
+                chords = ColumnarChords(chords)
+        else:
+            chords = _load_chords(path, "results.chord", {}, objects, mmap_mode)
+        lengths = _load_array(path, "results.lengths", mmap_mode) if info["ragged"] else None
+        data["results"] = ColumnarResults(_load_array(path, "results.features", mmap_mode), chords,
+                                          info["ids"], lengths, objects.get("results.extras"))
+    return data
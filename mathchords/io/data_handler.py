@@ -1,37 +1,211 @@
+import asyncio
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from .data_io import load, save
+from typing import Callable
+from .data_io import load, save, save_delta
+from .columnar import METADATA_FILE
+from .shards import is_sharded
+from .index import ExperimentIndex
+from .cache import ExperimentCache
+
+EXPERIMENT_SUFFIX = ".pkl"
+
+def _load_projected(addr: Path, projection: Callable = None):
+    # Module-level so process pools can pickle it; the projection runs in the worker
+    data = load(addr)
+    return projection(data) if projection is not None else data
 
 # Loader classes
 class Experiment:
-    def __init__(self, addr: str) -> None:
+    def __init__(self, addr: str, cache: ExperimentCache = None, max_segments: int = 8) -> None:
+        """
+        Args:
+            addr (str): Experiment file or directory.
+            cache (ExperimentCache): Cache used to load it (e.g. `default_cache`); None,
+                the default, disables caching. Cached data is shared with other readers,
+                so don't modify it in place.
+            max_segments (int): Delta segments kept by `update()` before the
+                experiment is compacted back into a single file.
+        """
         self.addr = addr
         self.name = addr.split("/")[-1].split(".")[0]
-        self.data = load(addr)
+        self.cache = cache
+        self.max_segments = max_segments
+        self.data = cache.get(addr) if cache is not None else load(addr)
     
-    def update(self, data):
-        save(data, self.addr)
+    def update(self, data, keys: list = None):
+        """
+        Persists `data` as the new content of the experiment.
+
+        By default the whole experiment is rewritten atomically. For pickled
+        experiments, naming the top-level keys that changed in `keys` stores
+        only those keys as a delta segment instead (keys listed but missing
+        from `data` are recorded as deleted); after `max_segments` segments
+        everything is compacted into one file. Changes to keys that are not
+        listed are not saved in that case.
+
+        Args:
+            data (dict): New experiment data.
+            keys (list): Top-level keys that changed, to write a delta segment
+                instead of the whole experiment.
+        """
+        if keys and os.path.isfile(self.addr):
+            changed = {key: data[key] for key in keys if key in data}
+            deleted = [key for key in keys if key not in data]
+            if save_delta(changed, self.addr, deleted) > self.max_segments:
+                save(data, self.addr)
+        else:
+            save(data, self.addr)
+        self.data = data
+        if self.cache is not None:
+            self.cache.invalidate(self.addr)
+
+    def compact(self):
+        """Rewrites the experiment as a single file, dropping its delta segments."""
+        save(self.data, self.addr)
+        if self.cache is not None:
+            self.cache.invalidate(self.addr)
 
 class ExperimentHandler:
-    def __init__(self, base_addr) -> None:
+    def __init__(self, base_addr, cache: ExperimentCache = None) -> None:
+        """
+        Args:
+            base_addr (str): Directory holding the experiments.
+            cache (ExperimentCache): Cache used by `read()` (e.g. `default_cache`); None,
+                the default, disables caching. Cached experiments are shared, so don't
+                modify them in place.
+        """
         self.base_addr = Path(base_addr)
         self.file_list = self.get_files()
+        self.cache = cache
+        self._index = None
+
+    @property
+    def index(self) -> ExperimentIndex:
+        # Created on first use so that read-only handlers don't write to the directory
+        if self._index is None:
+            self._index = ExperimentIndex(self.base_addr)
+        return self._index
 
     def get_files(self) -> list:
         files_list = []
         for file_name in os.listdir(self.base_addr):
+            # Hidden files (the metadata index, .DS_Store, ...) are not experiments
+            if file_name.startswith("."):
+                continue
             file_path = os.path.join(self.base_addr, file_name)
+            # Single-file experiments are pickles; other files (e.g. the manifest.json written by
+            # generate_all_scales, or an interrupted .tmp write) are not experiments
             if os.path.isfile(file_path):
+                if file_name.endswith(EXPERIMENT_SUFFIX):
+                    files_list.append(file_name)
+            # Columnar and sharded experiments are directories with a metadata/manifest file
+            elif os.path.isfile(os.path.join(file_path, METADATA_FILE)) or is_sharded(file_path):
                 files_list.append(file_name)
         return files_list
 
     def read(self, file_name: str) -> dict:
         addr = self.base_addr.joinpath(file_name)
+        if self.cache is not None:
+            return self.cache.get(addr)
         return load(addr)
 
+    def _read_projected(self, file_name: str, projection: Callable = None):
+        data = self.read(file_name)
+        return projection(data) if projection is not None else data
+
+    def read_many(self, file_names: list, workers: int = None, executor: str = "thread",
+                  projection: Callable = None) -> tuple:
+        """
+        Loads several experiments concurrently, preserving their order.
+
+        Args:
+            file_names (list): Files to read.
+            workers (int): Pool size; None lets the executor choose.
+            executor (str): "thread" (shares this handler's cache) or "process"
+                (bypasses the cache; useful when unpickling is CPU bound).
+            projection (Callable): Optional function applied to each experiment inside
+                the worker, e.g. `lambda d: d["experiment_params"]`, so only the needed
+                fields come back. With "process" it must be picklable (module-level).
+
+        Returns:
+            Tuple[list, dict]: The loaded (or projected) data in the order of `file_names`,
+            with None for files that failed, and a `file_name -> exception` dict of failures.
+        """
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=workers)
+            task = partial(self._read_projected, projection=projection)
+            args = file_names
+        elif executor == "process":
+            pool = ProcessPoolExecutor(max_workers=workers)
+            task = partial(_load_projected, projection=projection)
+            args = [self.base_addr.joinpath(file_name) for file_name in file_names]
+        else:
+            raise ValueError("executor must be 'thread' or 'process'")
+
+        results, errors = [], {}
+        with pool:
+            futures = [pool.submit(task, arg) for arg in args]
+            for file_name, future in zip(file_names, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    results.append(None)
+                    errors[file_name] = e
+        return results, errors
+
+    async def aread(self, file_names: list, projection: Callable = None) -> tuple:
+        """
+        Async variant of `read_many` for notebooks and event-loop based jobs.
+
+        Files are read concurrently in the loop's default thread pool.
+
+        Args:
+            file_names (list): Files to read.
+            projection (Callable): Optional function applied to each experiment.
+
+        Returns:
+            Tuple[list, dict]: Same as `read_many`.
+        """
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(None, self._read_projected, file_name, projection)
+                   for file_name in file_names]
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+
+        results, errors = [], {}
+        for file_name, outcome in zip(file_names, outcomes):
+            if isinstance(outcome, Exception):
+                results.append(None)
+                errors[file_name] = outcome
+            else:
+                results.append(outcome)
+        return results, errors
+
     def write(self, data: dict, file_name: str) -> None:
         addr = self.base_addr.joinpath(file_name)
         save(data, addr)
+        if self.cache is not None:
+            self.cache.invalidate(addr)
+        self.index.update(file_name, data)
+
+    def query(self, refresh: bool = True, **filters) -> list:
+        """
+        Finds experiments by their metadata without loading them.
+
+        Args:
+            refresh (bool): Re-index files added or modified since the last query.
+            **filters: Filters accepted by `ExperimentIndex.query` (experiment_name,
+                scale, version, date_from, date_to, min_chords, max_chords, size, has_key).
+
+        Returns:
+            List[Dict[str, Any]]: Matching index rows.
+        """
+        if refresh:
+            self.file_list = self.get_files()
+            self.index.refresh(self.file_list)
+        return self.index.query(**filters)
 
 
         
\ No newline at end of file
@@ -1,6 +1,20 @@
 import os
 import pickle as pkl
+import shutil
 from pathlib import Path
+from .columnar import is_columnar, load_columnar, save_columnar
+from .shards import is_sharded, ShardedExperimentReader
+
+# Pickled experiments can carry a sidecar directory of delta segments
+# (`<file>.deltas/000001.pkl`, ...) with top-level keys updated after the
+# last full write. Each segment records the identity of the base file it
+# applies to, so a later full write silently invalidates old segments.
+DELTA_SUFFIX = ".deltas"
+
+# Derived artifacts (e.g. neighbour indexes) live in a sibling directory
+# (`<experiment>.sidecars/<name>.pkl`). Each one records the size and mtime of
+# the experiment it was built from, so it is ignored once the experiment changes.
+SIDECAR_SUFFIX = ".sidecars"
 
 # Loader functions
 
@@ -9,25 +23,177 @@ def load(data_addr: Path) -> dict:
     Chords data loader to store as consts.
 
     Args:
-        data_addr (str): Data file address (.pkl file)
+        data_addr (str): Data file address (.pkl file), columnar experiment directory
+            or sharded experiment directory
 
     Returns:
         Dict[str, Any]: Expected structure of data file
     """
+    if is_sharded(data_addr):
+        return ShardedExperimentReader(data_addr).load()
+    if os.path.isdir(data_addr):
+        return load_columnar(data_addr)
     with open(data_addr, "rb") as data_file:
-        return pkl.load(data_file)
+        data = pkl.load(data_file)
+    for segment in _valid_segments(data_addr):
+        data.update(segment["set"])
+        for key in segment["deleted"]:
+            data.pop(key, None)
+    return data
+
+def _atomic_dump(data, data_addr: Path) -> None:
+    # Written next to the destination so os.replace never crosses file systems
+    tmp_addr = f"{data_addr}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_addr, "wb") as data_file:
+            pkl.dump(data, data_file, protocol=pkl.HIGHEST_PROTOCOL)
+            data_file.flush()
+            os.fsync(data_file.fileno())
+        os.replace(tmp_addr, data_addr)
+    finally:
+        if os.path.exists(tmp_addr):
+            os.remove(tmp_addr)
 
 def save(data: dict, data_addr: Path) -> None:
-    """_summary_
+    """
+    Chords data writer.
+
+    Existing directories and addresses ending in `.columnar` are written in the
+    columnar format (see `mathchords.io.columnar`); anything else is pickled.
+    Pickles are written to a temporary file and moved into place, so an
+    interrupted write never corrupts an existing experiment. A full write
+    supersedes any delta segments of the file.
+
+    Args:
+        data (dict): Experiment data
+        data_addr (str): Destination file or directory
+    """
+    if is_sharded(data_addr):
+        raise ValueError(f"{data_addr} is a sharded experiment; write it with ShardedExperimentWriter")
+    if is_columnar(data_addr):
+        save_columnar(data, data_addr)
+        return
+    if os.path.dirname(data_addr):
+        os.makedirs(os.path.dirname(data_addr), exist_ok=True)
+    _atomic_dump(data, data_addr)
+    shutil.rmtree(f"{data_addr}{DELTA_SUFFIX}", ignore_errors=True)
+
+def _base_identity(data_addr: Path) -> list:
+    stat = os.stat(data_addr)
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+def delta_segments(data_addr: Path) -> list:
+    """
+    Delta segment files of a pickled experiment, oldest first.
+
+    Args:
+        data_addr (str): Data file address (.pkl file)
+
+    Returns:
+        List[str]: Segment paths (including stale ones not yet cleaned up)
+    """
+    delta_dir = f"{data_addr}{DELTA_SUFFIX}"
+    if not os.path.isdir(delta_dir):
+        return []
+    return [os.path.join(delta_dir, name) for name in sorted(os.listdir(delta_dir)) if name.endswith(".pkl")]
+
+def _valid_segments(data_addr: Path) -> list:
+    identity = _base_identity(data_addr)
+    segments = []
+    for segment_addr in delta_segments(data_addr):
+        with open(segment_addr, "rb") as segment_file:
+            segment = pkl.load(segment_file)
+        if segment["base"] == identity:
+            segments.append(segment)
+    return segments
+
+def save_delta(changes: dict, data_addr: Path, deleted: list = ()) -> int:
+    """
+    Persists only some top-level keys of a pickled experiment.
+
+    The changes are written as a new segment next to the base file instead of
+    rewriting it; `load` applies the segments in order.
+
+    Args:
+        changes (dict): New or changed top-level keys and their values
+        data_addr (str): Base data file address (.pkl file), which must exist
+        deleted (list): Top-level keys removed from the experiment
+
+    Returns:
+        int: Number of delta segments after this write
+    """
+    delta_dir = f"{data_addr}{DELTA_SUFFIX}"
+    os.makedirs(delta_dir, exist_ok=True)
+    segments = delta_segments(data_addr)
+    number = int(os.path.basename(segments[-1]).split(".")[0]) + 1 if segments else 1
+    segment = {"base": _base_identity(data_addr), "set": changes, "deleted": list(deleted)}
+    _atomic_dump(segment, os.path.join(delta_dir, f"{number:06d}.pkl"))
+    return len(segments) + 1
+
+def file_stat(data_addr: Path) -> tuple:
+    """
+    Size and modification time of an experiment.
+
+    Experiment directories report the total size of their files and the
+    latest mtime among them; pickles include their delta segments.
+
+    Args:
+        data_addr (str): Data file address or experiment directory
+
+    Returns:
+        Tuple[int, float]: (size in bytes, mtime)
+    """
+    if os.path.isdir(data_addr):
+        stats = [entry.stat() for entry in os.scandir(data_addr) if entry.is_file()]
+        return sum(stat.st_size for stat in stats), max((stat.st_mtime for stat in stats), default=0.0)
+    stats = [os.stat(data_addr)] + [os.stat(segment) for segment in delta_segments(data_addr)]
+    return sum(stat.st_size for stat in stats), max(stat.st_mtime for stat in stats)
+
+def sidecar_path(data_addr: Path, name: str) -> str:
+    """
+    Address of a sidecar artifact of an experiment.
+
+    Args:
+        data_addr (str): Experiment file or directory
+        name (str): Artifact name
+
+    Returns:
+        str: `<data_addr>.sidecars/<name>.pkl`
+    """
+    return os.path.join(f"{os.fspath(data_addr).rstrip(os.sep)}{SIDECAR_SUFFIX}", f"{name}.pkl")
+
+def save_sidecar(value, data_addr: Path, name: str) -> None:
+    """
+    Stores an object derived from an experiment next to it.
+
+    The sidecar directory is not an experiment, so `ExperimentHandler` does not list it.
+
+    Args:
+        value (Any): Picklable object
+        data_addr (str): Experiment file or directory, which must exist
+        name (str): Artifact name
+    """
+    addr = sidecar_path(data_addr, name)
+    os.makedirs(os.path.dirname(addr), exist_ok=True)
+    _atomic_dump({"stat": list(file_stat(data_addr)), "value": value}, addr)
+
+def load_sidecar(data_addr: Path, name: str):
+    """
+    Loads an object stored with `save_sidecar`.
 
     Args:
-        data (dict): _description_
-        data_addr (str): _description_
+        data_addr (str): Experiment file or directory
+        name (str): Artifact name
 
     Returns:
-        _type_: _description_
+        Any: The stored object, or None if there is none or the experiment
+        changed after it was stored
     """
-    os.makedirs(os.path.dirname(data_addr), exist_ok=True)
-    with open(data_addr, "wb") as data_file:
-        pkl.dump(data, data_file)
-        
\ No newline at end of file
+    addr = sidecar_path(data_addr, name)
+    if not os.path.isfile(addr):
+        return None
+    with open(addr, "rb") as sidecar_file:
+        sidecar = pkl.load(sidecar_file)
+    if sidecar["stat"] != list(file_stat(data_addr)):
+        return None
+    return sidecar["value"]
@@ -0,0 +1,180 @@
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+
+from .data_io import load, file_stat
+
+# Sidecar index of the experiments stored in a directory
+
+INDEX_FILE = ".mathchords_index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS experiments (
+    file TEXT PRIMARY KEY,
+    experiment_name TEXT,
+    scale TEXT,
+    experiment_date TEXT,
+    version TEXT,
+    n_chords INTEGER,
+    n_results INTEGER,
+    keys TEXT,
+    params TEXT,
+    size INTEGER,
+    mtime REAL,
+    error TEXT
+)
+"""
+_COLUMNS = ("file", "experiment_name", "scale", "experiment_date", "version",
+            "n_chords", "n_results", "keys", "params", "size", "mtime", "error")
+
+
+def _to_json(value) -> str:
+    def default(obj):
+        if isinstance(obj, (range, tuple, set)):
+            return list(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+        return repr(obj)
+    return json.dumps(value, default=default, ensure_ascii=False)
+
+
+def describe(data: dict) -> dict:
+    """
+    Extracts the indexed fields from an experiment dict.
+
+    Args:
+        data (dict): Experiment data.
+
+    Returns:
+        Dict[str, Any]: Name, scale, date, version, chord/result counts, top-level keys and params.
+    """
+    params = data.get("experiment_params") or {}
+    scale = params.get("scale") if isinstance(params, dict) else None
+    chords = data.get("chords")
+    if isinstance(chords, dict):
+        # Columnar chord table
+        chords = chords.get("length", ())
+    return {
+        "experiment_name": data.get("experiment_name"),
+        "scale": scale.get("name") if isinstance(scale, dict) else None,
+        "experiment_date": data.get("experiment_date"),
+        "version": data.get("version"),
+        "n_chords": len(chords) if chords is not None else None,
+        "n_results": len(data["results"]) if data.get("results") is not None else None,
+        "keys": _to_json(sorted(map(str, data.keys()))),
+        "params": _to_json(params),
+    }
+
+
+class ExperimentIndex:
+    """
+    SQLite sidecar index of the experiments in a directory.
+
+    Each row stores the experiment metadata together with the file size and
+    mtime it was read from, so `refresh()` only re-reads files that changed
+    and `query()` never has to unpickle anything.
+    """
+
+    def __init__(self, base_addr) -> None:
+        self.base_addr = Path(base_addr)
+        self.index_addr = self.base_addr.joinpath(INDEX_FILE)
+        with closing(self._connect()) as conn:
+            conn.execute(_SCHEMA)
+            conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.index_addr)
+
+    def _store(self, conn: sqlite3.Connection, file_name: str, data: dict, error: str = None) -> None:
+        size, mtime = file_stat(self.base_addr.joinpath(file_name))
+        row = dict(describe(data), file=file_name, size=size, mtime=mtime, error=error)
+        conn.execute(f"INSERT OR REPLACE INTO experiments ({', '.join(_COLUMNS)}) "
+                     f"VALUES ({', '.join('?' * len(_COLUMNS))})", [row[column] for column in _COLUMNS])
+
+    def update(self, file_name: str, data: dict) -> None:
+        """
+        Records an experiment that was just written.
+
+        Args:
+            file_name (str): File name relative to the base directory.
+            data (dict): The data that was written, so nothing has to be read back.
+        """
+        with closing(self._connect()) as conn:
+            self._store(conn, file_name, data)
+            conn.commit()
+
+    def refresh(self, files: list) -> None:
+        """
+        Brings the index in line with the directory contents.
+
+        Only files that are new or whose size/mtime changed are read; rows for
+        files that no longer exist are dropped. Files that cannot be loaded are
+        kept with their error and excluded from `query()`.
+
+        Args:
+            files (list): Current experiment file names (see `ExperimentHandler.get_files`).
+        """
+        with closing(self._connect()) as conn:
+            known = {file: (size, mtime) for file, size, mtime in conn.execute("SELECT file, size, mtime FROM experiments")}
+            for file_name in files:
+                if known.pop(file_name, None) == file_stat(self.base_addr.joinpath(file_name)):
+                    continue
+                try:
+                    self._store(conn, file_name, load(self.base_addr.joinpath(file_name)))
+                except Exception as e:
+                    # Unreadable files are remembered so they are not retried until they change
+                    self._store(conn, file_name, {}, error=repr(e))
+            conn.executemany("DELETE FROM experiments WHERE file = ?", [(file_name,) for file_name in known])
+            conn.commit()
+
+    def query(self, experiment_name: str = None, scale: str = None, version: str = None,
+              date_from: str = None, date_to: str = None, min_chords: int = None,
+              max_chords: int = None, size: int = None, has_key: str = None) -> list:
+        """
+        Filters the indexed experiments.
+
+        Args:
+            experiment_name (str): Exact experiment name, or a SQL LIKE pattern when it contains `%`.
+            scale (str): Scale name (e.g. "Escala Mayor").
+            version (str): Experiment version.
+            date_from (str): Minimum experiment date (YYYY-MM-DD), inclusive.
+            date_to (str): Maximum experiment date (YYYY-MM-DD), inclusive.
+            min_chords (int): Minimum number of chords.
+            max_chords (int): Maximum number of chords.
+            size (int): Chord size that must appear in `experiment_params['sizes']`.
+            has_key (str): Top-level key the experiment must contain (e.g. "results").
+
+        Returns:
+            List[Dict[str, Any]]: Matching rows sorted by file name, with `keys` and `params` decoded.
+        """
+        clauses, values = ["error IS NULL"], []
+        if experiment_name is not None:
+            clauses.append("experiment_name LIKE ?" if "%" in experiment_name else "experiment_name = ?")
+            values.append(experiment_name)
+        for column, operator, value in (("scale", "=", scale), ("version", "=", version),
+                                        ("experiment_date", ">=", date_from), ("experiment_date", "<=", date_to),
+                                        ("n_chords", ">=", min_chords), ("n_chords", "<=", max_chords)):
+            if value is not None:
+                clauses.append(f"{column} {operator} ?")
+                values.append(value)
+        where = f" WHERE {' AND '.join(clauses)}"
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM experiments{where} ORDER BY file", values).fetchall()
+
+        matches = []
+        for row in rows:
+            entry = dict(zip(_COLUMNS, row))
+            entry["keys"] = json.loads(entry["keys"])
+            entry["params"] = json.loads(entry["params"])
+            if has_key is not None and has_key not in entry["keys"]:
+                continue
+            if size is not None and size not in (entry["params"].get("sizes") or []):
+                continue
+            matches.append(entry)
+        return matches
@@ -0,0 +1,256 @@
+import json
+import pickle as pkl
+from pathlib import Path
+
+from .columnar import _atomic_write
+
+# Append-only sharded experiment format: a directory with a JSON manifest,
+# the experiment metadata, and per shard one chords file plus one file per
+# result field (feature_vector, chord_id, ...). The manifest is not called
+# manifest.json: batch_generation.generate_all_scales already writes one with
+# that name next to its (pickled) experiments.
+
+MANIFEST_FILE = "shards.json"
+METADATA_FILE = "metadata.pkl"
+FORMAT_NAME = "mathchords-shards"
+FORMAT_VERSION = 1
+
+
+def _dump(path: Path, value) -> None:
+    _atomic_write(path, lambda file: pkl.dump(value, file, protocol=pkl.HIGHEST_PROTOCOL))
+
+
+def _read(path: Path):
+    with open(path, "rb") as data_file:
+        return pkl.load(data_file)
+
+
+def is_sharded(data_addr: Path) -> bool:
+    """
+    Tells whether an address is a sharded experiment directory.
+
+    Args:
+        data_addr (Path): Experiment address.
+
+    Returns:
+        bool: True if it holds a manifest of this format.
+    """
+    try:
+        with open(Path(data_addr).joinpath(MANIFEST_FILE), "rb") as manifest_file:
+            return json.loads(manifest_file.read().decode("utf-8")).get("format") == FORMAT_NAME
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def _read_manifest(path: Path) -> dict:
+    with open(path.joinpath(MANIFEST_FILE), "rb") as manifest_file:
+        manifest = json.loads(manifest_file.read().decode("utf-8"))
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"{path} is not a {FORMAT_NAME} directory")
+    return manifest
+
+
+class ShardedExperimentWriter:
+    """
+    Writes an experiment incrementally as numbered shards.
+
+    Every `append()` persists one chunk of chords (and optionally its results)
+    and then updates the manifest, so a crash only loses the chunk being
+    written. Re-opening an existing directory resumes it: `count` tells how
+    many chords are already stored.
+
+    Example:
+        writer = ShardedExperimentWriter("data/big", metadata)
+        for i, chunk in enumerate(iter_chords(scale, octaves, sizes, intervals, chunk_size=100000)):
+            if i < writer.n_shards:
+                continue  # already written before a restart
+            writer.append(chunk)
+    """
+
+    def __init__(self, base_addr, metadata: dict = None) -> None:
+        """
+        Args:
+            base_addr (str): Experiment directory (created if missing).
+            metadata (dict): Experiment fields without `chords`/`results`, e.g. the
+                output of `create_experiment_data` with an empty chord list. Only
+                used when the directory is new.
+        """
+        self.base_addr = Path(base_addr)
+        if self.base_addr.joinpath(MANIFEST_FILE).exists():
+            self.manifest = _read_manifest(self.base_addr)
+        else:
+            self.base_addr.mkdir(parents=True, exist_ok=True)
+            metadata = {key: value for key, value in (metadata or {}).items() if key not in ("chords", "results")}
+            _dump(self.base_addr.joinpath(METADATA_FILE), metadata)
+            self.manifest = {"format": FORMAT_NAME, "format_version": FORMAT_VERSION, "shards": []}
+            self._write_manifest()
+
+    @property
+    def count(self) -> int:
+        """Number of chords already stored."""
+        return sum(shard["count"] for shard in self.manifest["shards"])
+
+    @property
+    def n_shards(self) -> int:
+        return len(self.manifest["shards"])
+
+    def _write_manifest(self) -> None:
+        _atomic_write(self.base_addr.joinpath(MANIFEST_FILE),
+                      lambda file: file.write(json.dumps(self.manifest, indent=1).encode("utf-8")))
+
+    def _shard_file(self, index: int, part: str) -> Path:
+        return self.base_addr.joinpath(f"shard_{index:05d}.{part}.pkl")
+
+    def _write_results(self, index: int, start: int, results: dict) -> list:
+        # Results are stored under the global ids of the shard's chords. A chunk run through
+        # process() on its own is keyed chord_0.. again, so those ids are shifted by `start`;
+        # without that, shards would overwrite each other's results when read back together
+        ids = [f"chord_{start + i}" for i in range(len(results))]
+        if list(results) != ids and list(results) != [f"chord_{i}" for i in range(len(results))]:
+            raise ValueError(f"results must be keyed chord_0.. or {ids[0]}.. (the shard's global ids)")
+        entries = list(results.values())
+        keys = ["chord_id"]
+        for entry in entries:
+            keys.extend(key for key in entry if key != "chord" and key not in keys)
+        for key in keys:
+            values = ids if key == "chord_id" else [entry.get(key) for entry in entries]
+            _dump(self._shard_file(index, f"results.{key}"), values)
+        return keys
+
+    def append(self, chords: list, results: dict = None) -> int:
+        """
+        Stores a new shard.
+
+        Args:
+            chords (list): Chunk of chords.
+            results (dict): Optional `chord_id -> result` dict for the same chords,
+                as built by `process()` (keyed `chord_0..`, renumbered from the
+                shard's first global index) or `iter_process()` (already keyed
+                by global index).
+
+        Returns:
+            int: Index of the new shard.
+        """
+        chords = list(chords)
+        if results is not None and len(results) != len(chords):
+            raise ValueError("results must have one entry per chord in the shard")
+
+        index = len(self.manifest["shards"])
+        start = self.count
+        result_keys = self._write_results(index, start, results) if results is not None else []
+        _dump(self._shard_file(index, "chords"), chords)
+
+        self.manifest["shards"].append({"index": index, "start": start, "count": len(chords),
+                                        "result_keys": result_keys})
+        self._write_manifest()
+        return index
+
+    def write_results(self, index: int, results: dict) -> None:
+        """
+        Adds results to a shard written earlier (e.g. in a later feature run).
+
+        Args:
+            index (int): Shard index.
+            results (dict): `chord_id -> result` dict with one entry per chord of the shard,
+                keyed as in `append()`.
+        """
+        shard = self.manifest["shards"][index]
+        if len(results) != shard["count"]:
+            raise ValueError("results must have one entry per chord in the shard")
+        keys = self._write_results(index, shard["start"], results)
+        shard["result_keys"] += [key for key in keys if key not in shard["result_keys"]]
+        self._write_manifest()
+
+
+class ShardedExperimentReader:
+    """
+    Reads sharded experiments partially: shard by shard, by chord range, or
+    only some result fields.
+    """
+
+    def __init__(self, base_addr) -> None:
+        self.base_addr = Path(base_addr)
+        self.manifest = _read_manifest(self.base_addr)
+        self.shards = self.manifest["shards"]
+
+    def __len__(self) -> int:
+        return sum(shard["count"] for shard in self.shards)
+
+    @property
+    def metadata(self) -> dict:
+        return _read(self.base_addr.joinpath(METADATA_FILE))
+
+    def _shard_file(self, index: int, part: str) -> Path:
+        return self.base_addr.joinpath(f"shard_{index:05d}.{part}.pkl")
+
+    def read_shard(self, index: int, keys: list = None, with_chords: bool = True) -> dict:
+        """
+        Loads one shard.
+
+        Args:
+            index (int): Shard index.
+            keys (list): Result fields to load (e.g. ["feature_vector"]); None loads all of them.
+            with_chords (bool): Whether to load the chords (and attach them to the results).
+
+        Returns:
+            Dict[str, Any]: {"index", "start", "chords", "results"}; `chords` is None when not loaded and
+            `results` is None when the shard has no results.
+        """
+        shard = self.shards[index]
+        chords = _read(self._shard_file(index, "chords")) if with_chords else None
+        results = None
+        available = shard["result_keys"]
+        if available:
+            wanted = [key for key in available if keys is None or key in keys]
+            columns = {key: _read(self._shard_file(index, f"results.{key}")) for key in wanted}
+            ids = columns.get("chord_id") or _read(self._shard_file(index, "results.chord_id"))
+            results = {}
+            for i, chord_id in enumerate(ids):
+                result = {"chord": chords[i]} if with_chords else {}
+                for key in wanted:
+                    result[key] = columns[key][i]
+                result["chord_id"] = chord_id
+                results[chord_id] = result
+        return {"index": index, "start": shard["start"], "chords": chords, "results": results}
+
+    def iter_shards(self, keys: list = None, with_chords: bool = True):
+        """Yields every shard in order (see `read_shard`), one at a time."""
+        for shard in self.shards:
+            yield self.read_shard(shard["index"], keys, with_chords)
+
+    def read_range(self, start: int, stop: int, keys: list = None, with_chords: bool = True) -> dict:
+        """
+        Loads the chords `start:stop` and their results, reading only the shards that overlap.
+
+        Returns:
+            Dict[str, Any]: {"chords", "results"} for the requested range.
+        """
+        chords, results = [], {}
+        for shard in self.shards:
+            first, last = shard["start"], shard["start"] + shard["count"]
+            if last <= start or first >= stop:
+                continue
+            part = self.read_shard(shard["index"], keys, with_chords)
+            lo, hi = max(start, first) - first, min(stop, last) - first
+            if with_chords:
+                chords.extend(part["chords"][lo:hi])
+            if part["results"] is not None:
+                results.update(list(part["results"].items())[lo:hi])
+        return {"chords": chords if with_chords else None, "results": results}
+
+    def load(self, keys: list = None) -> dict:
+        """
+        Loads the whole experiment in the usual single-dict layout.
+
+        Args:
+            keys (list): Result fields to load; None loads all of them.
+
+        Returns:
+            Dict[str, Any]: Metadata plus `chords` and, if any shard has them, `results`.
+        """
+        data = self.metadata
+        part = self.read_range(0, len(self), keys)
+        data["chords"] = part["chords"]
+        if part["results"]:
+            data["results"] = part["results"]
+        return data
@@ -0,0 +1,15 @@
+"""Fixtures compartidas por las pruebas."""
+import pytest
+
+from mathchords.constans import SCALES
+from mathchords.functions.characteristics import interval_vector, process
+from mathchords.functions.gen_chords import create_experiment_data, generate_chords
+
+
+@pytest.fixture
+def experiment():
+    """Experimento pequeño (escala mayor, tríadas) con los resultados de interval_vector."""
+    scale = SCALES[0]
+    chords = generate_chords(scale, [4], [3], [2, 3, 4])
+    data = create_experiment_data(scale, [4], [3], [2, 3, 4], chords)
+    return process(data, interval_vector)
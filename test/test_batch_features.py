@@ -0,0 +1,32 @@
+"""Extractores por lotes frente a los extractores por acorde (mathchords.functions.batch_features)."""
+import numpy as np
+import pytest
+
+from mathchords.constans import SCALES
+from mathchords.functions.batch_features import BATCH_FEATURES, compute_batched
+from mathchords.functions.characteristics import polar_pitch_classes, process
+from mathchords.functions.gen_chords import generate_chords, generate_chords_table
+
+
+@pytest.fixture(scope="module")
+def chords():
+    return generate_chords(SCALES[0], [4], [2, 3], [1, 2, 3, 4])
+
+
+@pytest.mark.parametrize("feature", list(BATCH_FEATURES), ids=lambda feature: feature.__name__)
+def test_batch_matches_process(chords, feature):
+    expected = process({"chords": chords}, feature)["results"]
+    # batch_size pequeño: se ejercita también la unión de varios lotes
+    features, lengths = compute_batched(chords, feature, batch_size=97)
+    assert len(features) == len(chords)
+    for row, chord_id in enumerate(expected):
+        vector = features[row] if lengths is None else features[row, :lengths[row]]
+        assert np.array_equal(vector, np.asarray(expected[chord_id]["feature_vector"])), chord_id
+
+
+def test_polar_from_table_writes_every_batch():
+    table = generate_chords_table(SCALES[2], [4], [4], [2, 3])
+    features, lengths = compute_batched(table, polar_pitch_classes, batch_size=100)
+    single, _ = compute_batched(table, polar_pitch_classes, batch_size=len(table["length"]))
+    assert lengths is None and features.dtype == np.float64
+    assert np.array_equal(features, single)
@@ -0,0 +1,38 @@
+"""Generación por lotes de varias escalas (mathchords.functions.batch_generation)."""
+import json
+
+import pytest
+
+from mathchords.constans import SCALES
+from mathchords.functions.batch_generation import MANIFEST_NAME, generate_all_scales
+from mathchords.functions.gen_chords import generate_chords
+from mathchords.io import load
+from mathchords.io.data_handler import ExperimentHandler
+
+# El segundo conjunto de parámetros hace fallar generate_chords
+PARAM_SETS = [{"octaves": [4], "sizes": [2], "intervals": [3, 4]},
+              {"octaves": [4], "sizes": ["x"], "intervals": [3, 4]}]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failed_tasks_are_recorded_in_the_manifest(tmp_path, workers):
+    manifest = generate_all_scales(PARAM_SETS, tmp_path, scales=SCALES[:2], workers=workers, inversions=False)
+    with open(tmp_path / MANIFEST_NAME) as manifest_file:
+        assert json.load(manifest_file) == manifest
+
+    assert [shard["params_index"] for shard in manifest["shards"]] == [0, 0]
+    assert [error["params_index"] for error in manifest["errors"]] == [1, 1]
+    assert all(error["error"].startswith("TypeError") for error in manifest["errors"])
+    for shard, scale in zip(manifest["shards"], SCALES[:2]):
+        data = load(tmp_path / shard["file"])
+        assert data["chords"] == generate_chords(scale, [4], [2], [3, 4])
+    assert manifest["total_chords"] == sum(shard["n_chords"] for shard in manifest["shards"])
+
+
+def test_handler_skips_the_manifest(tmp_path):
+    manifest = generate_all_scales(PARAM_SETS[:1], tmp_path, scales=SCALES[:2], workers=1, inversions=False)
+    handler = ExperimentHandler(tmp_path)
+    assert sorted(handler.get_files()) == sorted(shard["file"] for shard in manifest["shards"])
+    assert len(handler.query()) == 2
+    data, errors = handler.read_many(handler.get_files())
+    assert errors == {} and all(item is not None for item in data)
@@ -0,0 +1,37 @@
+"""Codificación empaquetada de acordes (mathchords.functions.chord_encoding)."""
+import pickle
+
+import numpy as np
+
+from mathchords.constans import DO_chords, SCALES
+from mathchords.functions.characteristics import interval_histogram, interval_vector, process
+from mathchords.functions.chord_encoding import (Chord, decode_chord, decode_codes, encode_chord, encode_chords,
+                                                 encode_table, pack_chords)
+from mathchords.functions.gen_chords import Simula_inversiones, generate_chords, generate_chords_table
+
+
+def test_encode_decode_round_trip():
+    chords = generate_chords(SCALES[-1], [3, 4], [1, 2, 3], [1, 4, 7, 11])
+    assert [decode_chord(encode_chord(chord)) for chord in chords] == chords
+    codes = encode_chords(chords)
+    assert list(decode_codes(codes)) == chords
+    table = generate_chords_table(SCALES[-1], [3, 4], [1, 2, 3], [1, 4, 7, 11])
+    np.testing.assert_array_equal(encode_table(table), codes)
+
+
+def test_chord_is_a_drop_in_for_chord_dicts():
+    packed = pack_chords(DO_chords)
+    assert packed == DO_chords
+    assert packed[0]["name"] == "C Major" and dict(packed[0]) == DO_chords[0]
+    assert pickle.loads(pickle.dumps(packed)) == DO_chords
+    for func in (interval_vector, interval_histogram):
+        expected = process({"chords": DO_chords}, func)["results"]
+        results = process({"chords": packed}, func)["results"]
+        assert [r["feature_vector"] for r in results.values()] == [r["feature_vector"] for r in expected.values()]
+
+
+def test_inversions_of_packed_chords():
+    chords = generate_chords(SCALES[-1], [4], [3], [4, 7])
+    packed = Simula_inversiones(pack_chords(chords))
+    assert all(isinstance(chord, Chord) for chord in packed)
+    assert packed == Simula_inversiones(chords)
@@ -0,0 +1,22 @@
+"""Round trip of the columnar experiment format (mathchords.io.columnar)."""
+import numpy as np
+
+from mathchords.io import load, save
+
+
+def _feature_vectors(results):
+    return {chord_id: list(result["feature_vector"]) for chord_id, result in results.items()}
+
+
+def test_columnar_round_trip(tmp_path, experiment):
+    experiment["embedding"] = np.arange(12.0).reshape(4, 3)
+    addr = tmp_path / "experiment.columnar"
+    save(experiment, addr)
+    loaded = load(addr)
+
+    assert set(loaded) == set(experiment)
+    assert [dict(chord) for chord in loaded["chords"]] == experiment["chords"]
+    assert _feature_vectors(loaded["results"]) == _feature_vectors(experiment["results"])
+    assert loaded["results"]["chord_0"]["chord"] == experiment["chords"][0]
+    np.testing.assert_array_equal(loaded["embedding"], experiment["embedding"])
+    assert loaded["experiment_params"] == experiment["experiment_params"]
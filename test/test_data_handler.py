@@ -0,0 +1,45 @@
+"""Experiment updates: delta segments, compaction and full atomic writes (mathchords.io.data_handler)."""
+import os
+
+from mathchords.io import Experiment, load, save
+from mathchords.io.data_io import delta_segments
+
+
+def test_delta_update_then_compact(tmp_path, experiment):
+    addr = str(tmp_path / "experiment.pkl")
+    save(experiment, addr)
+    handle = Experiment(addr, max_segments=2)
+
+    data = dict(handle.data)
+    data["notes"] = "first"
+    del data["results"]
+    handle.update(data, keys=["notes", "results"])
+    assert len(delta_segments(addr)) == 1
+    loaded = load(addr)
+    assert loaded["notes"] == "first" and "results" not in loaded
+
+    data = dict(data, notes="second")
+    handle.update(data, keys=["notes"])
+    assert len(delta_segments(addr)) == 2
+    assert load(addr)["notes"] == "second"
+
+    # Past max_segments the experiment is rewritten as a single file
+    data = dict(data, notes="third")
+    handle.update(data, keys=["notes"])
+    assert delta_segments(addr) == []
+    assert load(addr)["notes"] == "third"
+
+    data = dict(data, notes="fourth")
+    handle.update(data, keys=["notes"])
+    handle.compact()
+    assert not os.path.exists(f"{addr}.deltas") or delta_segments(addr) == []
+    assert load(addr) == data
+
+
+def test_update_without_keys_saves_in_place_edits(tmp_path, experiment):
+    addr = str(tmp_path / "experiment.pkl")
+    save(experiment, addr)
+    handle = Experiment(addr)
+    handle.data["chords"][0]["root"] = 11
+    handle.update(handle.data)
+    assert load(addr)["chords"][0]["root"] == 11
@@ -0,0 +1,72 @@
+"""Matrices de disimilitud por bloques (mathchords.functions.distances) frente a scipy."""
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist, pdist
+
+from mathchords.functions.distances import (
+    MAHALANOBIS_REG, METRICS, condensed_index, mahalanobis_vi, pairwise_blocked, whiten,
+)
+
+# max_bytes pequeño: varios bloques de filas y de columnas
+SMALL_BLOCKS = 4096
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(1)
+    return rng.integers(0, 4, size=(150, 6)).astype(float)
+
+
+def _scipy_input(features, metric):
+    # pairwise_blocked trata jaccard sobre booleanos, como pairwise_distances de sklearn
+    return features.astype(bool) if metric == "jaccard" else features
+
+
+@pytest.mark.parametrize("metric", [metric for metric in METRICS if metric != "mahalanobis"])
+def test_blocked_matches_cdist(features, metric):
+    data = _scipy_input(features, metric)
+    expected = cdist(data, data, metric=metric)
+    np.fill_diagonal(expected, 0)
+    np.testing.assert_allclose(pairwise_blocked(features, metric, max_bytes=SMALL_BLOCKS), expected, atol=1e-12)
+    condensed = pairwise_blocked(features, metric, condensed=True, max_bytes=SMALL_BLOCKS)
+    np.testing.assert_allclose(condensed, pdist(data, metric), atol=1e-12)
+
+
+def test_float32_memmap(tmp_path, features):
+    path = tmp_path / "dissimilarity.npy"
+    result = pairwise_blocked(features, "euclidean", out=str(path), dtype=np.float32, max_bytes=SMALL_BLOCKS)
+    assert isinstance(result, np.memmap) and result.dtype == np.float32
+    stored = np.load(path, mmap_mode="r")
+    np.testing.assert_allclose(stored, cdist(features, features), rtol=1e-6)
+    assert not np.diagonal(stored).any()
+
+
+def test_condensed_index():
+    n = 7
+    positions = [condensed_index(n, i, j) for i in range(n) for j in range(i + 1, n)]
+    assert positions == list(range(n * (n - 1) // 2))
+
+
+def test_unknown_metric(features):
+    with pytest.raises(ValueError):
+        pairwise_blocked(features, "minkowski")
+
+
+@pytest.mark.parametrize("reg", [MAHALANOBIS_REG, 0.1])
+def test_whitening_matches_mahalanobis(features, reg):
+    VI = mahalanobis_vi(features, reg)
+    np.testing.assert_allclose(VI, np.linalg.pinv(np.cov(features.T) + reg * np.eye(features.shape[1])))
+    expected = cdist(features, features, "mahalanobis", VI=VI)
+    np.fill_diagonal(expected, 0)
+    np.testing.assert_allclose(pairwise_blocked(features, "mahalanobis", reg=reg, max_bytes=SMALL_BLOCKS),
+                               expected, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(cdist(whiten(features, reg=reg), whiten(features, reg=reg)), expected,
+                               rtol=1e-10, atol=1e-12)
+
+
+def test_whitening_with_given_vi(features):
+    # VI semidefinida positiva con un autovalor nulo: la distancia ignora esa dirección
+    VI = np.diag([1.0, 2.0, 0.5, 0.0, 3.0, 1.0])
+    expected = cdist(features, features, "mahalanobis", VI=VI)
+    np.fill_diagonal(expected, 0)
+    np.testing.assert_allclose(pairwise_blocked(features, "mahalanobis", VI=VI), expected, rtol=1e-10, atol=1e-12)
@@ -0,0 +1,36 @@
+"""Claves de la caché de características (mathchords.functions.feature_cache)."""
+import os
+import subprocess
+import sys
+
+from mathchords.functions import characteristics
+from mathchords.functions.characteristics import interval_histogram, interval_vector, only_six_intervals
+from mathchords.functions.feature_cache import feature_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXTRACTORS = ("interval_vector", "interval_histogram", "only_six_intervals")
+
+
+def _keys_in_subprocess(hash_seed):
+    script = ("from mathchords.functions import characteristics\n"
+              "from mathchords.functions.feature_cache import feature_key\n"
+              f"for name in {EXTRACTORS!r}:\n"
+              "    print(feature_key(getattr(characteristics, name)))\n")
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed), PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, "-c", script], env=env, cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    return output.split()
+
+
+def test_feature_key_is_stable_across_processes():
+    keys = [feature_key(func) for func in (interval_vector, interval_histogram, only_six_intervals)]
+    assert _keys_in_subprocess(1) == keys
+    assert _keys_in_subprocess(2) == keys
+    assert len(set(keys)) == len(keys)
+
+
+def test_feature_key_follows_helpers(monkeypatch):
+    key = feature_key(interval_vector)
+    # interval_vector llama a pitch_classes_extractor: si la función auxiliar cambia, cambia la clave
+    monkeypatch.setattr(characteristics, "pitch_classes_extractor", characteristics.transpose_to_zero)
+    assert feature_key(interval_vector) != key
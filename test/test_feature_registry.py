@@ -0,0 +1,45 @@
+"""compute_features (mathchords.functions.feature_registry) frente a process()."""
+import numpy as np
+import pytest
+
+from mathchords.constans import SCALES
+from mathchords.functions import feature_registry
+from mathchords.functions.characteristics import process
+from mathchords.functions.feature_registry import FEATURES, compute_features, register_feature
+from mathchords.functions.gen_chords import generate_chords, generate_chords_table
+
+PARAMS = (SCALES[0], [4], [1, 3], [1, 2, 3])
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_matrices_match_process(columnar):
+    chords = generate_chords(*PARAMS)
+    data = {"chords": generate_chords_table(*PARAMS) if columnar else chords}
+    # batch_size pequeño: varios bloques por característica
+    result = compute_features(data, list(FEATURES), batch_size=50)
+    assert result["chords"] is data["chords"]
+
+    for name, spec in FEATURES.items():
+        matrix, lengths = result["features"][name], result["lengths"][name]
+        assert matrix.dtype == spec.dtype and len(matrix) == len(chords)
+        assert (lengths is None) == (spec.dim is not None)
+        expected = process({"chords": chords}, spec.func)["results"]
+        for i, chord_id in enumerate(expected):
+            vector = matrix[i] if lengths is None else matrix[i, :lengths[i]]
+            np.testing.assert_array_equal(vector, np.asarray(expected[chord_id]["feature_vector"], dtype=spec.dtype))
+
+
+def test_registered_feature_without_batch(monkeypatch):
+    monkeypatch.setattr(feature_registry, "FEATURES", dict(FEATURES))
+    spec = register_feature("root_and_size", lambda chord, chord_id: {
+        "chord": chord, "feature_vector": [chord["root"], len(chord["intervals"])], "chord_id": chord_id}, 2, np.int8)
+    assert feature_registry.FEATURES["root_and_size"] is spec
+
+    chords = generate_chords(*PARAMS)
+    matrix = compute_features({"chords": chords}, ["root_and_size"])["features"]["root_and_size"]
+    np.testing.assert_array_equal(matrix, [[chord["root"], len(chord["intervals"])] for chord in chords])
+
+
+def test_unknown_feature():
+    with pytest.raises(KeyError):
+        compute_features({"chords": []}, ["interval_vector", "missing"])
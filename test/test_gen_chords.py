@@ -0,0 +1,125 @@
+"""Generación de acordes (mathchords.functions.gen_chords) frente a la lista de diccionarios."""
+import numpy as np
+import pytest
+
+from mathchords.constans import SCALES
+from mathchords.functions.characteristics import interval_vector, pitch_classes_extractor, process, process_orbits
+from mathchords.functions.gen_chords import (
+    Simula_inversiones, chords_from_inversions, chords_from_table, estimate_population, expand_orbits,
+    generate_chord_orbits, generate_chords, generate_chords_table, inversions_table, iter_chords,
+    iter_chords_table, orbit_chord,
+)
+
+# (escala, octavas, tamaños, intervalos): escala diatónica, pentatónica y cromática
+PARAMS = [
+    (SCALES[0], [4], [2, 3], [1, 2, 3, 4]),
+    (SCALES[3], [3, 4], [1, 3], [2, 5]),
+    (SCALES[-1], [2, 3, 4], [2], [1, 4, 7]),
+]
+
+
+@pytest.mark.parametrize("max_population", [-1, 50, 300])
+@pytest.mark.parametrize("params", PARAMS)
+def test_columnar_matches_dicts(params, max_population):
+    expected = generate_chords(*params, max_population)
+    table = generate_chords(*params, max_population, columnar=True)
+    assert list(chords_from_table(table)) == expected
+    assert all(column.dtype == np.int8 for column in table.values())
+
+    chunks = list(iter_chords_table(*params, chunk_size=37, max_population=max_population))
+    assert [chord for chunk in chunks for chord in chords_from_table(chunk)] == expected
+    assert all(len(chunk["length"]) <= 37 for chunk in chunks)
+
+
+def test_table_pads_intervals_with_zeros():
+    table = generate_chords_table(*PARAMS[1])
+    lengths = table["length"]
+    assert set(lengths.tolist()) == {1, 3}
+    assert not table["intervals"][lengths == 1, 1:].any()
+
+
+@pytest.mark.parametrize("max_population", [-1, 5, 100, 101])
+def test_iter_chords_matches_generate_chords(max_population):
+    params = PARAMS[0]
+    expected = generate_chords(*params, max_population)
+    chunks = list(iter_chords(*params, chunk_size=17, max_population=max_population))
+    assert [chord for chunk in chunks for chord in chunk] == expected
+    assert all(len(chunk) == 17 for chunk in chunks[:-1])
+
+
+def test_max_population_cuts_the_whole_generation():
+    # El corte es global: se detiene en el tamaño 2 del primer grado, sin seguir con el tamaño 3
+    full = generate_chords(*PARAMS[0])
+    chords = generate_chords(*PARAMS[0], max_population=10)
+    assert chords == full[:10]
+    assert {len(chord["intervals"]) for chord in chords} == {2}
+
+
+@pytest.mark.parametrize("params", PARAMS)
+def test_orbits_expand_to_the_population(params):
+    orbits = generate_chord_orbits(*params)
+    expected = generate_chords(*params)
+    assert list(expand_orbits(orbits)) == expected
+    assert orbits["n_chords"] == len(expected) == orbits["multiplicity"].sum()
+    assert [orbit_chord(orbits, row) for row in range(0, len(expected), 7)] == expected[::7]
+    # Cada órbita agrupa acordes con los mismos intervalos
+    patterns = {(chord["octave"], tuple(chord["intervals"])) for chord in expected}
+    assert len(orbits["chords"]) == len(patterns)
+
+
+def test_chromatic_orbits_are_one_degree():
+    orbits = generate_chord_orbits(*PARAMS[2])
+    assert len(orbits["chords"]) * 12 == orbits["n_chords"]
+    assert {chord["root"] for chord in orbits["chords"]} == {SCALES[-1]["root"]}
+
+
+@pytest.mark.parametrize("func", [interval_vector, pitch_classes_extractor], ids=lambda func: func.__name__)
+@pytest.mark.parametrize("params", PARAMS)
+def test_process_orbits_matches_process(params, func):
+    expected = process({"chords": generate_chords(*params)}, func)["results"]
+    results = process_orbits(generate_chord_orbits(*params), func)
+    assert list(results) == list(expected)
+    for chord_id, result in expected.items():
+        assert results[chord_id]["chord"] == result["chord"]
+        assert list(results[chord_id]["feature_vector"]) == list(result["feature_vector"])
+
+
+@pytest.mark.parametrize("params", PARAMS)
+def test_inversions_table_matches_simula_inversiones(params):
+    table = generate_chords_table(*params)
+    inversions = Simula_inversiones(table)
+    assert inversions.keys() == {"parent", "bass"}
+    expected = Simula_inversiones(generate_chords(*params))
+    assert list(chords_from_inversions(table, inversions)) == expected
+    np.testing.assert_array_equal(inversions_table(table)["bass"], [chord["bass"] for chord in expected])
+
+
+@pytest.mark.parametrize("max_population", [-1, 60])
+@pytest.mark.parametrize("params", PARAMS)
+def test_estimate_population_is_exact(params, max_population):
+    estimate = estimate_population(*params, max_population)
+    chords = generate_chords(*params, max_population)
+    table = generate_chords_table(*params, max_population)
+    assert estimate["n_chords"] == len(chords)
+    assert estimate["n_inversions"] == len(Simula_inversiones(chords))
+    assert estimate["bytes_table"] == sum(column.nbytes for column in table.values())
+    inversions = inversions_table(table)
+    assert estimate["bytes_inversions_table"] == inversions["parent"].nbytes + inversions["bass"].nbytes
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_memory_budget(columnar):
+    params = PARAMS[0]
+    estimate = estimate_population(*params)
+    budget = (estimate["bytes_table_peak"] if columnar else estimate["bytes_dicts"]) // 4
+    with pytest.raises(MemoryError):
+        generate_chords(*params, columnar=columnar, memory_budget=budget)
+
+    chunks = list(generate_chords(*params, columnar=columnar, memory_budget=budget, budget_action="stream"))
+    assert len(chunks) > 1
+    if columnar:
+        chunks = [list(chords_from_table(chunk)) for chunk in chunks]
+    assert [chord for chunk in chunks for chord in chunk] == generate_chords(*params)
+    # Con presupuesto suficiente se devuelve la población completa
+    full = generate_chords(*params, columnar=columnar, memory_budget=budget * 8)
+    assert len(full["length"] if columnar else full) == estimate["n_chords"]
@@ -0,0 +1,110 @@
+"""MDS clásico, con puntos de referencia e inserción de puntos nuevos (mathchords.functions.mds y perform_mds2)."""
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist, pdist, squareform
+
+from mathchords.functions.characteristics import perform_mds2
+from mathchords.functions.distances import mahalanobis_vi, pairwise_blocked
+from mathchords.functions.mds import classical_mds, embed_points, landmark_mds, stress
+
+
+def _plane(n, seed=0):
+    # Puntos de un plano dentro de un espacio de 5 dimensiones: MDS en 2D los recupera sin error
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n, 2)) @ rng.normal(size=(2, 5))
+
+
+@pytest.mark.parametrize("n", [40, 600])  # descomposición densa y eigsh
+def test_classical_recovers_euclidean_distances(n):
+    points = _plane(n)
+    coords = classical_mds(squareform(pdist(points)), n_components=2)
+    np.testing.assert_allclose(pdist(coords), pdist(points), atol=1e-8)
+    assert stress(pdist(points), coords) < 1e-10
+
+
+def test_classical_pads_missing_dimensions():
+    coords = classical_mds(squareform(pdist(_plane(10))), n_components=4)
+    assert coords.shape == (10, 4)
+    np.testing.assert_allclose(coords[:, 2:], 0, atol=1e-6)
+
+
+@pytest.mark.parametrize("n_landmarks", [5, 40, 1000])
+def test_landmark_recovers_euclidean_distances(n_landmarks):
+    points = _plane(300)
+    coords, landmarks = landmark_mds(points, n_components=2, n_landmarks=n_landmarks, random_state=0)
+    assert len(landmarks) == min(n_landmarks, 300) and list(landmarks) == sorted(set(landmarks))
+    np.testing.assert_allclose(pdist(coords), pdist(points), atol=1e-8)
+
+
+def test_landmark_uses_the_metric():
+    points = _plane(120)
+    coords, _ = landmark_mds(points, metric="cityblock", n_components=2, n_landmarks=30, random_state=1,
+                             max_bytes=1024)
+    reference = classical_mds(cdist(points, points, "cityblock"), n_components=2)
+    # cityblock no es euclídea: ningún método es exacto, pero el stress de ambos es parecido
+    assert abs(stress(cdist(points, points, "cityblock"), coords)
+               - stress(cdist(points, points, "cityblock"), reference)) < 0.05
+
+
+def test_perform_mds2_methods():
+    points = _plane(30)
+    classical, D = perform_mds2(points, method="classical")
+    np.testing.assert_allclose(D, squareform(pdist(points)), atol=1e-12)
+    assert stress(D, classical) < 1e-10
+
+    landmark, D = perform_mds2(points, method="landmark", n_landmarks=10, random_state=0)
+    assert D is None
+    np.testing.assert_allclose(pdist(landmark), pdist(points), atol=1e-8)
+
+    warm, D = perform_mds2(points, init="classical")
+    assert stress(D, warm) <= stress(D, classical) + 1e-6
+
+    with pytest.raises(ValueError):
+        perform_mds2(points, method="isomap")
+
+
+@pytest.mark.parametrize("references", [None, 8, np.arange(0, 60, 3)])
+def test_gower_places_new_points_exactly(references):
+    points = _plane(80)
+    data, new_data = points[:60], points[60:]
+    coords = classical_mds(squareform(pdist(data)), n_components=2)
+    new_coords = embed_points(coords, data, new_data, references=references, random_state=0)
+    np.testing.assert_allclose(cdist(new_coords, coords), cdist(new_data, data), atol=1e-8)
+    np.testing.assert_allclose(embed_points(coords, data, data[:5], references=references, random_state=0),
+                               coords[:5], atol=1e-8)
+
+
+def test_mahalanobis_uses_the_covariance_of_the_layout():
+    points = _plane(80)
+    data, new_data = points[:60], points[60:]
+    coords = classical_mds(pairwise_blocked(data, "mahalanobis"), n_components=2)
+    new_coords = embed_points(coords, data, new_data, metric="mahalanobis")
+    # La covarianza se estima solo con data, como al calcular coords
+    expected = cdist(new_data, data, "mahalanobis", VI=mahalanobis_vi(data))
+    np.testing.assert_allclose(cdist(new_coords, coords), expected, atol=1e-8)
+    np.testing.assert_allclose(embed_points(coords, data, data[:5], metric="mahalanobis"), coords[:5], atol=1e-8)
+
+
+def test_stress_refinement_improves_on_gower():
+    rng = np.random.default_rng(2)
+    points = rng.integers(0, 4, size=(70, 6)).astype(float)
+    data, new_data = points[:60], points[60:]
+    coords = classical_mds(cdist(data, data, "cityblock"), n_components=2)
+    distances = cdist(new_data, data, "cityblock")
+
+    def point_stress(new_coords):
+        return np.sum((cdist(new_coords, coords) - distances) ** 2)
+
+    gower = embed_points(coords, data, new_data, metric="cityblock", references=None)
+    refined = embed_points(coords, data, new_data, metric="cityblock", method="stress", references=None,
+                           max_bytes=2048)
+    assert point_stress(refined) < point_stress(gower)
+
+
+def test_embed_points_errors():
+    points = _plane(20)
+    coords = classical_mds(squareform(pdist(points)))
+    with pytest.raises(ValueError):
+        embed_points(coords, points, points[:2], method="nearest")
+    with pytest.raises(ValueError):
+        embed_points(coords[:10], points, points[:2])
@@ -0,0 +1,57 @@
+"""NeighborIndex frente a la búsqueda exhaustiva con scipy.spatial.distance.cdist."""
+import numpy as np
+import pytest
+from scipy.spatial.distance import cdist
+
+from mathchords.functions.distances import MAHALANOBIS_REG, mahalanobis_vi
+from mathchords.functions.neighbors import NeighborIndex
+
+METRICS = ("euclidean", "cityblock", "chebyshev", "mahalanobis", "cosine", "hamming", "jaccard")
+
+
+@pytest.fixture
+def features():
+    # Vectores enteros pequeños, como los de interval_vector: hay muchas distancias repetidas
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 4, size=(200, 6)).astype(float)
+
+
+def _brute_force(features, metric):
+    extra = {"VI": mahalanobis_vi(features, MAHALANOBIS_REG)} if metric == "mahalanobis" else {}
+    data = features.astype(bool) if metric == "jaccard" else features
+    return cdist(data, data, metric=metric, **extra)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_query_batch_matches_cdist(features, metric):
+    index = NeighborIndex(features, metric)
+    expected = np.sort(_brute_force(features, metric), axis=1)[:, :5]
+    distances, indices = index.query_batch([f"chord_{i}" for i in range(len(features))], k=5)
+    np.testing.assert_allclose(distances, expected, atol=1e-9)
+    # Los vecinos devueltos están a las distancias devueltas (con empates, el orden puede variar)
+    np.testing.assert_allclose(np.take_along_axis(_brute_force(features, metric), indices, axis=1),
+                               distances, atol=1e-9)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_query_radius_matches_cdist(features, metric):
+    index = NeighborIndex(features, metric)
+    brute = _brute_force(features, metric)
+    for row in range(0, len(features), 7):
+        # El radio es una de las distancias exactas: los puntos del borde deben aparecer
+        radius = np.sort(brute[row])[8]
+        distances, ids = index.query_radius(f"chord_{row}", radius)
+        expected = np.flatnonzero(brute[row] <= radius)
+        assert sorted(index.position(chord_id) for chord_id in ids) == expected.tolist()
+        np.testing.assert_allclose(distances, np.sort(brute[row, expected]), atol=1e-12)
+        assert list(distances) == sorted(distances)
+
+
+def test_cosine_zero_vectors(features):
+    features[:2] = 0
+    index = NeighborIndex(features, "cosine")
+    distances, ids = index.query_radius("chord_0", 0.5)
+    # cdist da nan con vectores nulos; el índice los deja a 0.5 (0 entre ellos)
+    assert distances[:2].tolist() == [0.0, 0.0]
+    assert sorted(ids[:2]) == ["chord_0", "chord_1"]
+    assert len(ids) == len(features) and np.all(distances[2:] == 0.5)
@@ -0,0 +1,50 @@
+"""Tablas de conjuntos de clases de tono (mathchords.functions.pcset_tables) frente a los extractores."""
+import numpy as np
+import pytest
+
+from mathchords.constans import SCALES
+from mathchords.functions import pcset_tables
+from mathchords.functions.gen_chords import generate_chords
+from mathchords.functions.pcset_tables import SET_FEATURES, chord_mask, get_tables, lookup_feature
+
+
+def _chords():
+    # Incluye unísonos (intervalo 0), notas repetidas tras la vuelta de octava y raíces fuera de 0-11
+    chords = generate_chords(SCALES[0], [4], [1, 2, 3], [0, 1, 2, 7])
+    chords += generate_chords(SCALES[-1], [4], [3], [0, 5, 11])
+    return chords + [{"octave": 4, "bass": 14, "root": 14, "degree": 1, "intervals": [3, 4]}]
+
+
+@pytest.mark.parametrize("func", list(SET_FEATURES), ids=lambda func: func.__name__)
+def test_lookup_matches_the_extractor(func):
+    for i, chord in enumerate(_chords()):
+        try:
+            expected = func(chord, f"chord_{i}")
+        except (IndexError, ValueError) as error:
+            with pytest.raises(type(error)):
+                lookup_feature(chord, f"chord_{i}", func)
+            continue
+        result = lookup_feature(chord, f"chord_{i}", func)
+        assert list(result["feature_vector"]) == list(expected["feature_vector"]), chord
+        assert result["chord"] is chord and result["chord_id"] == f"chord_{i}"
+
+
+def test_chord_mask():
+    assert chord_mask({"root": 0, "intervals": [4, 3]}) == (0b10010001, True)
+    assert chord_mask({"root": 11, "intervals": [1, 12]}) == (0b100000000001, False)
+    assert chord_mask({"root": 12, "intervals": [4]}) == (None, False)
+
+
+def test_tables_persist(tmp_path, monkeypatch):
+    path = tmp_path / "pcset_tables.pkl"
+    monkeypatch.setattr(pcset_tables, "_tables", None)
+    built = get_tables(path)
+    assert path.exists()
+
+    monkeypatch.setattr(pcset_tables, "_tables", None)
+    monkeypatch.setattr(pcset_tables, "build_tables", lambda: pytest.fail("tables were rebuilt"))
+    loaded = get_tables(path)
+    for name, table in built.items():
+        assert loaded[name]["values"] == table["values"]
+        np.testing.assert_array_equal(loaded[name]["matrix"], table["matrix"])
+        np.testing.assert_array_equal(loaded[name]["lengths"], table["lengths"])
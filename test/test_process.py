@@ -0,0 +1,41 @@
+"""process() en paralelo y con caché (mathchords.functions.characteristics)."""
+import pickle
+
+from mathchords.constans import SCALES
+from mathchords.functions.characteristics import interval_histogram, only_six_intervals, process
+from mathchords.functions.feature_cache import FeatureCache
+from mathchords.functions.gen_chords import generate_chords
+
+
+def _chords():
+    return generate_chords(SCALES[0], [4], [2, 3], [1, 2, 3, 4])
+
+
+def test_parallel_process_is_byte_identical_to_serial():
+    data = {"chords": _chords()}
+    serial = process(data, only_six_intervals)
+    timings, calls = [], []
+    parallel = process(data, only_six_intervals, workers=2, chunk_size=100, timings=timings,
+                       progress=lambda done, total: calls.append((done, total)))
+    assert pickle.dumps(parallel) == pickle.dumps(serial)
+    assert sum(entry["count"] for entry in timings) == len(data["chords"])
+    assert calls[-1] == (len(data["chords"]), len(data["chords"]))
+
+
+def test_cache_computes_only_missing_blocks_with_the_given_workers(tmp_path):
+    chords = _chords()
+    cache = FeatureCache(tmp_path, block_size=64)
+    expected = process({"chords": chords}, interval_histogram)["results"]
+
+    timings = []
+    first = process({"chords": chords[:200]}, interval_histogram, cache=cache, timings=timings)["results"]
+    assert sum(entry["count"] for entry in timings) == 200
+    assert first == {key: expected[key] for key in first}
+
+    # Solo se calculan los bloques nuevos, repartidos entre los procesos
+    timings = []
+    results = process({"chords": chords}, interval_histogram, cache=cache, workers=2, chunk_size=50,
+                      timings=timings)["results"]
+    assert results == expected
+    assert sum(entry["count"] for entry in timings) == len(chords) - 192
+    assert cache.hits == 3
@@ -0,0 +1,51 @@
+"""Concurrent bulk loading: read_many and aread (mathchords.io.data_handler)."""
+import asyncio
+
+import pytest
+
+from mathchords.io import ExperimentCache, ExperimentHandler
+
+
+def _params(data):
+    # Module-level so the process pool can pickle it
+    return data["experiment_params"]
+
+
+@pytest.fixture
+def handler(tmp_path, experiment):
+    handler = ExperimentHandler(tmp_path)
+    for i in range(3):
+        handler.write(dict(experiment, experiment_params=dict(experiment["experiment_params"], run=i)), f"run{i}.pkl")
+    (tmp_path / "broken.pkl").write_bytes(b"not a pickle")
+    return handler
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_read_many_keeps_order_and_reports_failures(handler, executor):
+    names = ["run2.pkl", "broken.pkl", "run0.pkl", "run1.pkl"]
+    data, errors = handler.read_many(names, workers=2, executor=executor, projection=_params)
+    assert [params and params["run"] for params in data] == [2, None, 0, 1]
+    assert list(errors) == ["broken.pkl"]
+
+    full, errors = handler.read_many(["run1.pkl"], executor=executor)
+    assert errors == {} and full[0] == handler.read("run1.pkl")
+
+
+def test_aread_matches_read_many(handler):
+    names = ["run1.pkl", "broken.pkl", "run0.pkl"]
+    data, errors = asyncio.run(handler.aread(names, projection=_params))
+    expected, expected_errors = handler.read_many(names, projection=_params)
+    assert data == expected
+    assert errors.keys() == expected_errors.keys() == {"broken.pkl"}
+
+
+def test_thread_reads_share_the_cache(tmp_path, handler):
+    cached = ExperimentHandler(tmp_path, cache=ExperimentCache())
+    first, _ = cached.read_many(["run0.pkl", "run1.pkl"])
+    second, _ = cached.read_many(["run1.pkl", "run0.pkl"])
+    assert second[0] is first[1] and second[1] is first[0]
+
+
+def test_unknown_executor(handler):
+    with pytest.raises(ValueError):
+        handler.read_many(["run0.pkl"], executor="fiber")
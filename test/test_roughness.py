@@ -0,0 +1,87 @@
+"""Rugosidad de Sethares por lotes (mathchords.functions.roughness) frente al bucle original por pares."""
+import numpy as np
+import pytest
+
+from mathchords.constans import SCALES
+from mathchords.functions.characteristics import (
+    dissmeasure_fixed_amp, interval_histogram_with_dissmeasure, interval_histogram_with_dissmeasure_weighted,
+    inversion_from_bass, inversion_to_frequencies, weight_function,
+)
+from mathchords.functions import roughness
+from mathchords.functions.gen_chords import Simula_inversiones, generate_chords
+from mathchords.functions.roughness import (
+    N_MIDI, get_pair_table, midi_frequency, midi_histograms, roughness_histograms,
+)
+
+
+def _reference(chord, weighted):
+    # Implementación original: dissmeasure_fixed_amp par por par, acumulada por intervalo
+    note_sequence = inversion_from_bass(chord)
+    frequencies = inversion_to_frequencies(chord)
+    total = len(note_sequence)
+    dissmeasures = [0] * 11
+    for i in range(total - 1):
+        for j in range(i + 1, total):
+            interval = (note_sequence[j] - note_sequence[i]) % 12
+            if interval > 0:
+                weight = weight_function(i, total) * weight_function(j, total) if weighted else 1
+                dissmeasures[interval - 1] += dissmeasure_fixed_amp([frequencies[i], frequencies[j]], 1) * weight
+    return dissmeasures + [sum(dissmeasures), sum(dissmeasures) / len(dissmeasures)]
+
+
+def _chords(octaves):
+    return Simula_inversiones(generate_chords(SCALES[4], octaves, [1, 3], [1, 4]))
+
+
+@pytest.mark.parametrize("weighted", [False, True])
+def test_kernel_matches_pairwise_loop(weighted):
+    # Octavas 9 y 10: buena parte de las notas queda fuera del rango MIDI (0-127) de la tabla
+    chords = _chords([9, 10])
+    frequencies = [inversion_to_frequencies(chord) for chord in chords]
+    sequences = [inversion_from_bass(chord) for chord in chords]
+    width = max(map(len, sequences))
+    matrix = np.array([row + [0.0] * (width - len(row)) for row in frequencies])
+    padded = np.array([row + [0] * (width - len(row)) for row in sequences])
+    vectors = roughness_histograms(matrix, padded, np.array([len(row) for row in sequences]), weighted)
+    np.testing.assert_allclose(vectors, [_reference(chord, weighted) for chord in chords], rtol=1e-12, atol=1e-15)
+
+
+@pytest.mark.parametrize("func, weighted", [(interval_histogram_with_dissmeasure, False),
+                                            (interval_histogram_with_dissmeasure_weighted, True)])
+def test_extractors_match_pairwise_loop(func, weighted):
+    for i, chord in enumerate(_chords([3, 4, 10])):
+        np.testing.assert_allclose(func(chord, f"chord_{i}")["feature_vector"], _reference(chord, weighted),
+                                   rtol=1e-12, atol=1e-15)
+
+
+def test_pair_table_matches_dissmeasure():
+    table = get_pair_table()
+    assert table.shape == (N_MIDI, N_MIDI)
+    np.testing.assert_array_equal(table, table.T)
+    for a in range(0, N_MIDI, 9):
+        for b in range(a + 1, N_MIDI, 5):
+            expected = dissmeasure_fixed_amp([midi_frequency(a), midi_frequency(b)], 1)
+            assert table[a, b] == pytest.approx(expected, rel=1e-12, abs=1e-15)
+
+
+@pytest.mark.parametrize("fixed_amp", [1, 0.5])
+def test_midi_histograms_match_frequencies(fixed_amp):
+    rng = np.random.default_rng(0)
+    notes = np.sort(rng.integers(20, 100, size=(50, 4)), axis=1)
+    sequence = notes % 12
+    lengths = rng.integers(2, 5, size=50)
+    frequencies = np.vectorize(midi_frequency)(notes)
+    np.testing.assert_allclose(midi_histograms(notes, sequence, lengths, fixed_amp=fixed_amp),
+                               roughness_histograms(frequencies, sequence, lengths, fixed_amp=fixed_amp),
+                               rtol=1e-12, atol=1e-15)
+
+
+def test_pair_table_persists(tmp_path, monkeypatch):
+    path = tmp_path / "pair_table.npy"
+    monkeypatch.setattr(roughness, "_pair_table", None)
+    built = get_pair_table(path)
+    assert path.exists()
+
+    monkeypatch.setattr(roughness, "_pair_table", None)
+    monkeypatch.setattr(roughness, "build_pair_table", lambda: pytest.fail("table was rebuilt"))
+    np.testing.assert_array_equal(get_pair_table(path), built)
@@ -0,0 +1,54 @@
+"""Sharded experiments (mathchords.io.shards)."""
+import pytest
+
+from mathchords.functions.characteristics import interval_vector, process
+
+from mathchords.io import ShardedExperimentReader, ShardedExperimentWriter, load, save
+
+
+def _feature_vectors(results):
+    return {chord_id: list(result["feature_vector"]) for chord_id, result in results.items()}
+
+
+def test_sharded_round_trip(tmp_path, experiment):
+    chords, results = experiment["chords"], experiment["results"]
+    metadata = {key: value for key, value in experiment.items() if key not in ("chords", "results")}
+    writer = ShardedExperimentWriter(tmp_path / "sharded", metadata)
+    ids = list(results)
+    for start in range(0, len(chords), 10):
+        writer.append(chords[start:start + 10], {chord_id: results[chord_id] for chord_id in ids[start:start + 10]})
+
+    # Re-opening the directory resumes it instead of starting over
+    assert ShardedExperimentWriter(tmp_path / "sharded").count == len(chords)
+
+    reader = ShardedExperimentReader(tmp_path / "sharded")
+    assert len(reader) == len(chords)
+    loaded = load(tmp_path / "sharded")
+    assert loaded["chords"] == chords
+    assert _feature_vectors(loaded["results"]) == _feature_vectors(results)
+    assert loaded["experiment_params"] == experiment["experiment_params"]
+
+    part = reader.read_range(5, 25, keys=["feature_vector"])
+    assert part["chords"] == chords[5:25]
+    assert list(part["results"]) == ids[5:25]
+
+    with pytest.raises(ValueError):
+        save(experiment, tmp_path / "sharded")
+
+
+def test_chunks_processed_separately_keep_all_results(tmp_path, experiment):
+    chords = experiment["chords"]
+    writer = ShardedExperimentWriter(tmp_path / "sharded")
+    # Each chunk's results come straight from process(), keyed chord_0.. again
+    for start in (0, 20):
+        chunk = chords[start:start + 20]
+        writer.append(chunk, process({"chords": chunk}, interval_vector)["results"])
+
+    loaded = load(tmp_path / "sharded")
+    assert len(loaded["results"]) == len(loaded["chords"]) == 40
+    expected = process({"chords": chords[:40]}, interval_vector)["results"]
+    assert _feature_vectors(loaded["results"]) == _feature_vectors(expected)
+    assert loaded["results"]["chord_25"]["chord"] == chords[25]
+
+    with pytest.raises(ValueError):
+        writer.append(chords[40:42], {"chord_7": expected["chord_7"], "chord_8": expected["chord_8"]})